@@ -3,6 +3,9 @@
 ChronosArchiver - Intelligent archival system for the Wayback Machine.
 """
 
+from typing import Iterable
+
+from chronos_archiver.dedup import ArchiveDedup
 from chronos_archiver.discovery import WaybackDiscovery
 from chronos_archiver.indexing import ContentIndexer
 from chronos_archiver.ingestion import ContentIngestion
@@ -12,11 +15,17 @@ from chronos_archiver.models import (
     ArchiveStatus,
     ContentAnalysis,
     MediaEmbed,
+    ProcessingStats,
     QueueMessage,
     SearchResult,
 )
+from chronos_archiver.pipeline import StreamingPipeline
 from chronos_archiver.queue_manager import QueueManager
+from chronos_archiver.ratelimit import AdaptiveRateLimiter
+from chronos_archiver.resilience import RetryPolicy
+from chronos_archiver.scheduler import DownloadScheduler
 from chronos_archiver.search import SearchEngine
+from chronos_archiver.session import SharedSession
 from chronos_archiver.tika import TikaExtractor
 from chronos_archiver.transformation import ContentTransformation
 
@@ -33,10 +42,17 @@ __all__ = [
     "SearchEngine",
     "TikaExtractor",
     "QueueManager",
+    "SharedSession",
+    "AdaptiveRateLimiter",
+    "RetryPolicy",
+    "ArchiveDedup",
+    "DownloadScheduler",
+    "StreamingPipeline",
     "ArchiveSnapshot",
     "ArchiveStatus",
     "ContentAnalysis",
     "MediaEmbed",
+    "ProcessingStats",
     "QueueMessage",
     "SearchResult",
     "ChronosArchiver",
@@ -58,17 +74,34 @@ class ChronosArchiver:
         """
         self.config = config
         self.queue_manager = QueueManager(config)
-        self.discovery = WaybackDiscovery(config)
-        self.ingestion = ContentIngestion(config)
+        self.http = SharedSession(config)
+        self.rate_limiter = AdaptiveRateLimiter(config)
+        self.retry_policy = RetryPolicy(config)
+        self.discovery = WaybackDiscovery(
+            config,
+            http=self.http,
+            rate_limiter=self.rate_limiter,
+            retry_policy=self.retry_policy,
+        )
+        self.ingestion = ContentIngestion(
+            config,
+            http=self.http,
+            rate_limiter=self.rate_limiter,
+            retry_policy=self.retry_policy,
+        )
+        self.scheduler = DownloadScheduler(self.ingestion, config)
         self.transformation = ContentTransformation(config)
         self.indexer = ContentIndexer(config)
+        self.dedup = ArchiveDedup(self.indexer, config)
         
         # Advanced features
         self.intelligence = IntelligenceEngine(config)
         self.search = SearchEngine(config)
-        self.tika = TikaExtractor(config)
+        self.tika = TikaExtractor(config, rate_limiter=self.rate_limiter)
 
-    async def archive_url(self, url: str, enable_intelligence: bool = True) -> None:
+    async def archive_url(
+        self, url: str, enable_intelligence: bool = True, priority: str = "normal"
+    ) -> ProcessingStats:
         """Archive a single URL through the complete pipeline.
         
         Arquiva uma URL através do pipeline completo.
@@ -76,49 +109,34 @@ class ChronosArchiver:
         Args:
             url: Wayback Machine URL to archive
             enable_intelligence: Enable intelligence analysis
+            priority: Download priority class ("high", "normal" or "low")
+
+        Returns:
+            Processing statistics for the run
         """
-        # Stage 1: Discovery
-        snapshots = await self.discovery.find_snapshots(url)
-
-        for snapshot in snapshots:
-            # Stage 2: Ingestion
-            content = await self.ingestion.download(snapshot)
-
-            if content:
-                # Optional: Tika extraction for non-HTML content
-                if self.tika.enabled and snapshot.mime_type != "text/html":
-                    tika_result = await self.tika.extract_from_downloaded(content)
-                    if tika_result.get("text"):
-                        # Enhance content with Tika extraction
-                        content.content = tika_result["text"].encode("utf-8")
-                
-                # Stage 3: Transformation
-                transformed = await self.transformation.transform(content)
-
-                if transformed:
-                    # Optional: Intelligence analysis
-                    if enable_intelligence:
-                        analysis = await self.intelligence.analyze(transformed)
-                        
-                        # Index in search engine
-                        await self.search.index_content(analysis)
-                    
-                    # Stage 4: Indexing
-                    await self.indexer.index(transformed)
-
-    async def archive_urls(self, urls: list[str], enable_intelligence: bool = True) -> None:
-        """Archive multiple URLs concurrently.
+        return await self.archive_urls([url], enable_intelligence, priority)
+
+    async def archive_urls(
+        self,
+        urls: Iterable[str],
+        enable_intelligence: bool = True,
+        priority: str = "normal",
+    ) -> ProcessingStats:
+        """Archive multiple URLs through the streaming pipeline.
         
-        Arquiva múltiplas URLs simultaneamente.
+        Arquiva múltiplas URLs pelo pipeline em streaming, com filas limitadas
+        e workers configuráveis por estágio.
 
         Args:
-            urls: List of Wayback Machine URLs to archive
+            urls: Wayback Machine URLs to archive (any iterable, consumed lazily)
             enable_intelligence: Enable intelligence analysis
-        """
-        import asyncio
+            priority: Download priority class ("high", "normal" or "low")
 
-        tasks = [self.archive_url(url, enable_intelligence) for url in urls]
-        await asyncio.gather(*tasks)
+        Returns:
+            Processing statistics for the run
+        """
+        pipeline = StreamingPipeline(self, self.config)
+        return await pipeline.run(urls, enable_intelligence, priority)
 
     async def search_content(self, query: str, **kwargs) -> list:
         """Search archived content.
@@ -148,4 +166,6 @@ class ChronosArchiver:
         Desligar graciosamente o arquivador e todos os workers.
         """
         await self.queue_manager.shutdown()
+        await self.discovery.close()
+        await self.http.close()
         await self.indexer.close()
\ No newline at end of file
@@ -5,7 +5,7 @@ import logging
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
 from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,7 +16,7 @@ from pydantic import BaseModel
 from chronos_archiver import ChronosArchiver
 from chronos_archiver.config import load_config
 from chronos_archiver.indexing import ContentIndexer
-from chronos_archiver.models import ArchiveStatus
+from chronos_archiver.models import ArchiveStatus, SearchResult
 from chronos_archiver.search import SearchEngine
 
 logger = logging.getLogger(__name__)
@@ -59,7 +59,7 @@ class SearchRequest(BaseModel):
 class ArchiveRequest(BaseModel):
     """Archive request model."""
     urls: List[str]
-    priority: str = "normal"
+    priority: Literal["high", "normal", "low"] = "normal"
 
 
 class ArchiveJobResponse(BaseModel):
@@ -264,6 +264,28 @@ async def index():
     return HTMLResponse(content=html)
 
 
+async def search_index(
+    index: ContentIndexer, q: str, limit: int, offset: int, has_videos: Optional[bool] = None
+) -> list[dict]:
+    """Search the database full-text index (fallback when Meilisearch is unavailable)."""
+    hits = await index.search(q, limit=limit + offset, has_videos=has_videos)
+    return [
+        SearchResult(
+            id=str(hit.id),
+            url=hit.snapshot.url,
+            original_url=hit.snapshot.original_url,
+            timestamp=hit.snapshot.timestamp,
+            title=hit.metadata.get("title") or "",
+            snippet=hit.snippet or (hit.text_content or "")[:200],
+            score=hit.score or 0.0,
+            keywords=hit.metadata.get("keywords", []),
+            has_videos=bool(hit.metadata.get("has_videos", False)),
+        ).dict()
+        for hit in hits[offset:]
+        if hit.snapshot is not None
+    ]
+
+
 @app.get("/api/search")
 async def api_search(
     q: str = Query(..., description="Search query"),
@@ -272,8 +294,12 @@ async def api_search(
     limit: int = Query(20, ge=1, le=100, description="Maximum results"),
     offset: int = Query(0, ge=0, description="Result offset"),
 ):
-    """Search archived content."""
-    if not search_engine:
+    """Search archived content.
+
+    Falls back to the database full-text index when Meilisearch is not
+    configured or fails. Topic filters need Meilisearch.
+    """
+    if not search_engine and not indexer:
         raise HTTPException(status_code=503, detail="Search engine not available")
     
     filters = {}
@@ -282,25 +308,39 @@ async def api_search(
     if has_videos is not None:
         filters["has_videos"] = has_videos
     
-    try:
-        results = await search_engine.search(q, filters=filters, limit=limit, offset=offset)
-        
-        return {
-            "query": q,
-            "total": len(results),
-            "limit": limit,
-            "offset": offset,
-            "results": [r.dict() for r in results],
-        }
-    except Exception as e:
-        logger.error(f"Search failed: {e}")
-        return {
-            "query": q,
-            "total": 0,
-            "limit": limit,
-            "offset": offset,
-            "results": [],
-        }
+    results = None
+    if search_engine:
+        try:
+            results = [
+                r.dict()
+                for r in await search_engine.search(
+                    q, filters=filters, limit=limit, offset=offset, raise_errors=True
+                )
+            ]
+        except Exception as e:
+            logger.warning(f"Meilisearch search failed, using the database index: {e}")
+
+    if results is None:
+        if not indexer:
+            raise HTTPException(status_code=503, detail="Search engine not available")
+        if topics:
+            # Topics only exist in the Meilisearch documents
+            raise HTTPException(
+                status_code=503, detail="Topic filters require Meilisearch, which is unavailable"
+            )
+        try:
+            results = await search_index(indexer, q, limit, offset, has_videos)
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            results = []
+
+    return {
+        "query": q,
+        "total": len(results),
+        "limit": limit,
+        "offset": offset,
+        "results": results,
+    }
 
 
 @app.get("/api/facets")
@@ -372,7 +412,7 @@ async def api_archive(request: ArchiveRequest):
             job_ids.append(job_id)
             
             # Start archiving in background
-            asyncio.create_task(process_archive_job(job_id, url))
+            asyncio.create_task(process_archive_job(job_id, url, request.priority))
         
         return {"job_ids": job_ids, "message": f"Started archiving {len(request.urls)} URLs"}
     
@@ -381,7 +421,7 @@ async def api_archive(request: ArchiveRequest):
         raise HTTPException(status_code=500, detail=f"Failed to create archive jobs: {str(e)}")
 
 
-async def process_archive_job(job_id: str, url: str):
+async def process_archive_job(job_id: str, url: str, priority: str = "normal") -> None:
     """Process an archive job and send updates via WebSocket."""
     job = active_jobs[job_id]
     
@@ -402,7 +442,7 @@ async def process_archive_job(job_id: str, url: str):
         
         # Archive the URL
         if archiver:
-            await archiver.archive_url(url)
+            await archiver.archive_url(url, priority=priority)
         else:
             raise Exception("Archiver not available")
         
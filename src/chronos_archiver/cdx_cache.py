@@ -0,0 +1,178 @@
+"""CDX cache - Persistent on-disk cache of CDX query results."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from chronos_archiver.models import ArchiveSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Parameters that only control how results are paged, not which rows match
+PAGING_PARAMS = {"page", "pageSize", "showNumPages", "showResumeKey", "resumeKey", "limit"}
+
+
+class CDXCache:
+    """SQLite-backed cache of CDX rows keyed by the normalized query.
+
+    Fresh entries (younger than ``ttl`` seconds) are served without touching
+    the network. Stale entries are revalidated incrementally: only captures
+    from the newest cached timestamp onwards are requested again.
+    """
+
+    def __init__(self, path: str, ttl: int = 86400) -> None:
+        """Initialize CDX cache.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds before a cached query must be revalidated
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cdx_queries (
+                query_key TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                newest_timestamp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS cdx_rows (
+                query_key TEXT NOT NULL,
+                original TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                mimetype TEXT,
+                statuscode TEXT,
+                digest TEXT,
+                length TEXT,
+                PRIMARY KEY (query_key, original, timestamp)
+            );
+            """
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(params: dict[str, Any]) -> str:
+        """Build a cache key from CDX query parameters.
+
+        Args:
+            params: CDX query parameters
+
+        Returns:
+            Stable hex key for the query
+        """
+        normalized = {
+            name: sorted(value) if isinstance(value, list) else str(value)
+            for name, value in params.items()
+            if name not in PAGING_PARAMS
+        }
+        return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+    def lookup(self, key: str) -> Optional[dict[str, Any]]:
+        """Look up a completed query.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Dict with ``fetched_at``, ``newest_timestamp`` and ``fresh``, or None
+        """
+        row = self.conn.execute(
+            "SELECT fetched_at, newest_timestamp FROM cdx_queries WHERE query_key = ?", (key,)
+        ).fetchone()
+
+        if not row:
+            return None
+
+        fetched_at, newest_timestamp = row
+        return {
+            "fetched_at": fetched_at,
+            "newest_timestamp": newest_timestamp,
+            "fresh": time.time() - fetched_at < self.ttl,
+        }
+
+    def iter_rows(self, key: str) -> Iterator[list[str]]:
+        """Iterate cached rows for a query in CDX order.
+
+        Args:
+            key: Cache key
+
+        Yields:
+            timestamp, original, mimetype, statuscode, digest, length
+        """
+        cursor = self.conn.execute(
+            "SELECT timestamp, original, mimetype, statuscode, digest, length "
+            "FROM cdx_rows WHERE query_key = ? ORDER BY original, timestamp",
+            (key,),
+        )
+        for row in cursor:
+            yield list(row)
+
+    def add(self, key: str, snapshot: ArchiveSnapshot) -> bool:
+        """Store a discovered snapshot.
+
+        Args:
+            key: Cache key
+            snapshot: Snapshot to store
+
+        Returns:
+            True if the row was new, False if it was already cached
+        """
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO cdx_rows "
+            "(query_key, original, timestamp, mimetype, statuscode, digest, length) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                snapshot.original_url,
+                snapshot.timestamp,
+                snapshot.mime_type,
+                str(snapshot.status_code) if snapshot.status_code is not None else None,
+                snapshot.digest,
+                str(snapshot.length) if snapshot.length is not None else None,
+            ),
+        )
+        return cursor.rowcount > 0
+
+    def discard(self, key: str) -> None:
+        """Drop rows left behind by a query that never completed.
+
+        Args:
+            key: Cache key
+        """
+        self.conn.execute("DELETE FROM cdx_rows WHERE query_key = ?", (key,))
+        self.conn.commit()
+
+    def mark_complete(self, key: str, params: dict[str, Any]) -> None:
+        """Record that a query finished, making its rows servable until the TTL expires.
+
+        Args:
+            key: Cache key
+            params: CDX query parameters (stored for inspection)
+        """
+        (newest,) = self.conn.execute(
+            "SELECT MAX(timestamp) FROM cdx_rows WHERE query_key = ?", (key,)
+        ).fetchone()
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cdx_queries (query_key, params, fetched_at, newest_timestamp) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(params, sort_keys=True, default=str), time.time(), newest),
+        )
+        self.flush()
+
+    def flush(self) -> None:
+        """Commit pending rows."""
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Commit and close the cache database."""
+        self.flush()
+        self.conn.close()
@@ -9,6 +9,7 @@ import click
 
 from chronos_archiver import ChronosArchiver
 from chronos_archiver.config import load_config
+from chronos_archiver.indexing import ContentIndexer
 
 
 @click.group()
@@ -22,9 +23,20 @@ def cli() -> None:
 @click.argument("urls", nargs=-1)
 @click.option("--input", "-i", type=click.Path(exists=True), help="File with URLs (one per line)")
 @click.option("--config", "-c", type=click.Path(exists=True), help="Configuration file")
-@click.option("--workers", "-w", default=4, help="Number of workers")
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    help="Concurrent download workers (default: pipeline.ingestion_workers from config)",
+)
 @click.option("--output", "-o", type=click.Path(), help="Output directory")
-def archive(urls: tuple, input: Optional[str], config: Optional[str], workers: int, output: Optional[str]) -> None:
+def archive(
+    urls: tuple,
+    input: Optional[str],
+    config: Optional[str],
+    workers: Optional[int],
+    output: Optional[str],
+) -> None:
     """Archive URLs from the Wayback Machine.
 
     Examples:
@@ -39,6 +51,9 @@ def archive(urls: tuple, input: Optional[str], config: Optional[str], workers: i
     if output:
         config_dict["archive"]["output_dir"] = output
 
+    if workers:
+        config_dict.setdefault("pipeline", {})["ingestion_workers"] = workers
+
     # Collect URLs
     url_list = list(urls)
     if input:
@@ -49,7 +64,8 @@ def archive(urls: tuple, input: Optional[str], config: Optional[str], workers: i
         click.echo("Error: No URLs provided. Use arguments or --input file.", err=True)
         sys.exit(1)
 
-    click.echo(f"Archiving {len(url_list)} URLs with {workers} workers...")
+    workers = config_dict.get("pipeline", {}).get("ingestion_workers", 10)
+    click.echo(f"Archiving {len(url_list)} URLs with {workers} download workers...")
 
     # Run archiver
     archiver = ChronosArchiver(config_dict)
@@ -57,6 +73,7 @@ def archive(urls: tuple, input: Optional[str], config: Optional[str], workers: i
     async def run():
         try:
             await archiver.archive_urls(url_list)
+            await archiver.shutdown()
             click.echo("✓ Archiving complete!")
         except KeyboardInterrupt:
             click.echo("\n⚠ Interrupted by user")
@@ -155,5 +172,121 @@ def validate_config(config: Optional[str]) -> None:
         sys.exit(1)
 
 
+@cli.command()
+@click.argument("output", type=click.Path())
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration file")
+@click.option("--title", default="ChronosArchiver export", help="Collection title")
+def export_wacz(output: str, config: Optional[str], title: str) -> None:
+    """Export WARC-backed pages as a WACZ bundle.
+
+    Examples:
+        chronos export-wacz archive.wacz
+        chronos export-wacz --config custom_config.yaml --title "dar.org.br" dar.wacz
+    """
+    config_dict = load_config(config) if config else load_config()
+    indexer = ContentIndexer(config_dict)
+
+    try:
+        path = indexer.export_wacz(Path(output), title)
+        click.echo(f"✓ Wrote {path}")
+    except Exception as e:
+        click.echo(f"✗ Export failed: {e}", err=True)
+        sys.exit(1)
+    finally:
+        asyncio.run(indexer.close())
+
+
+@cli.command()
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration file")
+@click.option(
+    "--min-age",
+    default=3600,
+    show_default=True,
+    help="Only delete blobs unused for this many seconds",
+)
+@click.option("--dry-run", is_flag=True, help="Report what would be deleted")
+def gc(config: Optional[str], min_age: int, dry_run: bool) -> None:
+    """Delete stored blobs that no archived page references.
+
+    Examples:
+        chronos gc --dry-run
+        chronos gc --min-age 86400
+    """
+    config_dict = load_config(config) if config else load_config()
+    indexer = ContentIndexer(config_dict)
+
+    try:
+        result = indexer.gc(min_age=min_age, dry_run=dry_run)
+        verb = "Would delete" if dry_run else "Deleted"
+        click.echo(f"✓ {verb} {result['deleted']} blobs ({result['freed_bytes']} bytes)")
+    except Exception as e:
+        click.echo(f"✗ Garbage collection failed: {e}", err=True)
+        sys.exit(1)
+    finally:
+        asyncio.run(indexer.close())
+
+
+@cli.command()
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration file")
+@click.option("--batch-size", default=500, show_default=True, help="Pages per transaction")
+@click.option("--keep-files", is_flag=True, help="Keep the original files after packing")
+def repack(config: Optional[str], batch_size: int, keep_files: bool) -> None:
+    """Move pages stored as individual files into pack segments.
+
+    Set indexing.storage_backend to "packs" so new pages are packed too.
+
+    Examples:
+        chronos repack
+        chronos repack --keep-files --batch-size 1000
+    """
+    config_dict = load_config(config) if config else load_config()
+    indexer = ContentIndexer(config_dict)
+
+    try:
+        result = indexer.repack(batch_size=batch_size, delete_files=not keep_files)
+        click.echo(
+            f"✓ Packed {result['pages']} pages from {result['files']} files"
+            + (f" ({result['failed']} failed)" if result["failed"] else "")
+        )
+    except Exception as e:
+        click.echo(f"✗ Repack failed: {e}", err=True)
+        sys.exit(1)
+    finally:
+        asyncio.run(indexer.close())
+
+
+@cli.command()
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration file")
+@click.option("--dry-run", is_flag=True, help="Report what would be deleted")
+def dedupe_captures(config: Optional[str], dry_run: bool) -> None:
+    """Remove duplicate captures from a database created before the unique key.
+
+    Keeps the newest row of each (original_url, timestamp), releases blob
+    references of the others and adds the unique capture key.
+
+    Examples:
+        chronos dedupe-captures --dry-run
+        chronos dedupe-captures
+    """
+    config_dict = load_config(config) if config else load_config()
+    indexer = ContentIndexer(config_dict, allow_duplicate_captures=True)
+
+    try:
+        result = indexer.dedupe_captures(dry_run=dry_run)
+        verb = "Would remove" if dry_run else "Removed"
+        click.echo(f"✓ {verb} {result['duplicates']} duplicate captures")
+        click.echo(f"  Blob references released: {result['blob_refs']} (reclaim with chronos gc)")
+        click.echo(f"  Page files deleted: {result['files']}")
+        click.echo(
+            f"  Orphaned WARC/pack records: {result['orphaned_records']} "
+            f"({result['orphaned_bytes']} bytes)"
+        )
+    except Exception as e:
+        click.echo(f"✗ Deduplication failed: {e}", err=True)
+        sys.exit(1)
+    finally:
+        asyncio.run(indexer.close())
+
+
 if __name__ == "__main__":
     cli()
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""Compression codecs for stored content."""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+import zstandard
+
+from chronos_archiver.utils import ensure_directory
+
+logger = logging.getLogger(__name__)
+
+CODECS = ("gzip", "zstd")
+
+# Cap on the bytes of one page kept as a training sample
+MAX_SAMPLE_SIZE = 128 * 1024
+
+
+class GzipCodec:
+    """Per-page gzip."""
+
+    suffix = ".gz"
+
+    def __init__(self, level: int = 6) -> None:
+        """Initialize gzip codec.
+
+        Args:
+            level: Compression level
+        """
+        self.level = level
+
+    def compress(self, content: bytes, domain: str) -> tuple[bytes, str]:
+        """Compress a page.
+
+        Args:
+            content: Page bytes
+            domain: Site the page belongs to (unused)
+
+        Returns:
+            (compressed bytes, compression label)
+        """
+        return gzip.compress(content, self.level, mtime=0), "gzip"
+
+    def label(self, path: Path) -> str:
+        """Compression label of an already stored file."""
+        return "gzip"
+
+
+class ZstdCodec:
+    """Zstandard with dictionaries trained per domain.
+
+    The first ``train_samples`` pages of a domain are compressed without a
+    dictionary and kept as samples. A dictionary is then trained from them
+    and saved as ``<dict_dir>/<dict_id>.zdict``, and later pages of the
+    domain use it, so shared boilerplate markup costs almost nothing.
+    The label ``zstd:<dict_id>`` is stored per row; the frame header also
+    carries the dictionary ID. Samples of all domains together are capped at
+    ``sample_budget`` bytes; the domains sampled least recently are dropped
+    first.
+    """
+
+    suffix = ".zst"
+
+    def __init__(
+        self,
+        dict_dir: Path,
+        level: int = 3,
+        dict_size: int = 112640,
+        train_samples: int = 200,
+        sample_budget: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Initialize zstd codec.
+
+        Args:
+            dict_dir: Directory holding trained dictionaries
+            level: Compression level
+            dict_size: Target dictionary size in bytes
+            train_samples: Pages per domain to train a dictionary from
+                (0 disables dictionaries)
+            sample_budget: Maximum bytes of training samples kept across domains
+        """
+        self.dict_dir = dict_dir
+        self.level = level
+        self.dict_size = dict_size
+        self.train_samples = train_samples
+        self.sample_budget = sample_budget
+        ensure_directory(self.dict_dir)
+
+        self._manifest_path = self.dict_dir / "domains.json"
+        self._domain_dicts: dict[str, int] = (
+            json.loads(self._manifest_path.read_text()) if self._manifest_path.exists() else {}
+        )
+        # Least recently sampled domain first
+        self._samples: OrderedDict[str, list[bytes]] = OrderedDict()
+        self._sample_bytes = 0
+        self._training_threshold: dict[str, int] = {}
+        self._training: set[str] = set()
+        self._lock = threading.Lock()
+
+    def compress(self, content: bytes, domain: str) -> tuple[bytes, str]:
+        """Compress a page, with the domain's dictionary once it exists.
+
+        Args:
+            content: Page bytes
+            domain: Site the page belongs to
+
+        Returns:
+            (compressed bytes, compression label)
+        """
+        dict_id = self._domain_dicts.get(domain)
+        if dict_id is None and self.train_samples > 0:
+            dict_id = self._add_sample(domain, content)
+
+        if dict_id is None:
+            # ZstdCompressor objects are not thread-safe
+            return zstandard.ZstdCompressor(level=self.level).compress(content), "zstd"
+
+        dictionary = _compression_dict(self.dict_dir / f"{dict_id}.zdict", self.level)
+        compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+        return compressor.compress(content), f"zstd:{dict_id}"
+
+    def label(self, path: Path) -> str:
+        """Compression label of an already stored file.
+
+        Args:
+            path: Stored zstd file
+
+        Returns:
+            Label derived from the frame header
+        """
+        with open(path, "rb") as f:
+            dict_id = zstandard.get_frame_parameters(f.read(18)).dict_id
+        return f"zstd:{dict_id}" if dict_id else "zstd"
+
+    def _add_sample(self, domain: str, content: bytes) -> Optional[int]:
+        """Keep a training sample and train once enough are collected.
+
+        Training runs outside the lock, so other domains keep compressing
+        meanwhile; pages of the domain being trained are compressed without
+        a dictionary until it is ready.
+
+        Args:
+            domain: Site the page belongs to
+            content: Page bytes
+
+        Returns:
+            Dictionary ID if the domain has one now
+        """
+        with self._lock:
+            if domain in self._domain_dicts:
+                return self._domain_dicts[domain]
+            if domain in self._training:
+                return None
+
+            self._store_samples(domain, [content[:MAX_SAMPLE_SIZE]])
+            samples = self._samples.get(domain, [])
+            if len(samples) < self._training_threshold.get(domain, self.train_samples):
+                return None
+
+            del self._samples[domain]
+            self._sample_bytes -= sum(len(sample) for sample in samples)
+            self._training.add(domain)
+
+        training_set: list[Union[bytes, bytearray, memoryview]] = list(samples)
+        try:
+            dictionary = zstandard.train_dictionary(
+                self.dict_size, training_set, level=self.level
+            )
+        except zstandard.ZstdError as e:
+            # Usually too little sample data; try again with twice as many pages
+            with self._lock:
+                self._training.discard(domain)
+                self._training_threshold[domain] = len(samples) * 2
+                self._store_samples(domain, samples)
+            logger.debug(f"Dictionary training for {domain} postponed: {e}")
+            return None
+
+        dict_id = dictionary.dict_id()
+        try:
+            _write_atomic(self.dict_dir / f"{dict_id}.zdict", dictionary.as_bytes())
+            with self._lock:
+                self._domain_dicts[domain] = dict_id
+                _write_atomic(
+                    self._manifest_path, json.dumps(self._domain_dicts, indent=2).encode()
+                )
+        finally:
+            with self._lock:
+                self._training.discard(domain)
+                self._training_threshold.pop(domain, None)
+
+        logger.info(f"Trained zstd dictionary {dict_id} for {domain} from {len(samples)} pages")
+        return dict_id
+
+    def _store_samples(self, domain: str, samples: list[bytes]) -> None:
+        """Add samples for a domain, evicting others to stay within the budget.
+
+        Must be called with the lock held.
+
+        Args:
+            domain: Site the samples belong to
+            samples: Page bytes to keep
+        """
+        kept = self._samples.setdefault(domain, [])
+        self._samples.move_to_end(domain)
+        kept.extend(samples)
+        self._sample_bytes += sum(len(sample) for sample in samples)
+
+        while self._sample_bytes > self.sample_budget:
+            oldest = next(iter(self._samples))
+            if oldest == domain:
+                # This domain alone fills the budget; drop its oldest pages
+                if len(kept) <= 1:
+                    break
+                self._sample_bytes -= len(kept.pop(0))
+                continue
+
+            evicted = self._samples.pop(oldest)
+            self._sample_bytes -= sum(len(sample) for sample in evicted)
+            self._training_threshold.pop(oldest, None)
+            logger.debug(f"Dropped {len(evicted)} zstd training samples of {oldest}")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file via write-then-rename so a crash never leaves it partial."""
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=256)
+def _load_dict(path: Path) -> zstandard.ZstdCompressionDict:
+    """Load a dictionary file (cached)."""
+    return zstandard.ZstdCompressionDict(path.read_bytes())
+
+
+@lru_cache(maxsize=256)
+def _compression_dict(path: Path, level: int) -> zstandard.ZstdCompressionDict:
+    """Load a dictionary prepared for compression at ``level`` (cached)."""
+    dictionary = zstandard.ZstdCompressionDict(path.read_bytes())
+    dictionary.precompute_compress(level=level)
+    return dictionary
+
+
+def create_codec(config: dict, output_dir: Path) -> Optional[Union[GzipCodec, ZstdCodec]]:
+    """Create the codec selected by ``indexing.compression``.
+
+    Args:
+        config: Configuration dictionary
+        output_dir: Archive output directory
+
+    Returns:
+        Codec, or None if ``compress_content`` is off
+    """
+    indexing_config = config.get("indexing", {})
+    if not indexing_config.get("compress_content", True):
+        return None
+
+    codec = indexing_config.get("compression", "gzip")
+    if codec == "gzip":
+        return GzipCodec(indexing_config.get("compression_level", 6))
+    if codec == "zstd":
+        return ZstdCodec(
+            output_dir / "dictionaries",
+            level=indexing_config.get("zstd_level", 3),
+            dict_size=indexing_config.get("zstd_dict_size", 112640),
+            train_samples=indexing_config.get("zstd_train_samples", 200),
+            sample_budget=indexing_config.get("zstd_sample_budget", 64 * 1024 * 1024),
+        )
+    raise ValueError(f"Invalid compression {codec!r}, expected one of {CODECS}")
+
+
+def decompress(data: bytes, compression: Optional[str], dict_dir: Path) -> bytes:
+    """Decompress stored content.
+
+    Args:
+        data: Stored bytes
+        compression: Compression label ("gzip", "zstd", "zstd:<dict_id>") or None
+        dict_dir: Directory holding trained dictionaries
+
+    Returns:
+        Page bytes
+    """
+    if not compression:
+        return data
+    if compression == "gzip":
+        return gzip.decompress(data)
+
+    # The frame header names the dictionary, also for rows without a label
+    dict_id = zstandard.get_frame_parameters(data).dict_id
+    if dict_id:
+        dictionary = _load_dict(dict_dir / f"{dict_id}.zdict")
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+    else:
+        decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data)
@@ -39,10 +39,36 @@ class ProcessingConfig(BaseModel):
     retry_attempts: int = 3
     retry_delay: int = 5
     retry_backoff: int = 2
+    retry_max_delay: int = 60
+    retry_budget_ratio: float = 0.1
+    retry_budget_reserve: int = 10
+    circuit_failure_threshold: int = 5
+    circuit_recovery_timeout: int = 30
     requests_per_second: int = 5
+    min_requests_per_second: float = 0.5
+    max_requests_per_second: float = 50.0
+    rate_increase: float = 1.0
+    rate_decrease_factor: float = 0.5
+    latency_threshold: float = 3.0
     concurrent_requests: int = 10
+    max_requests_per_host: int = 4
     request_timeout: int = 30
     download_timeout: int = 300
+    connection_pool_size: int = 100
+    connections_per_host: int = 10
+    keepalive_timeout: int = 30
+    dns_cache_ttl: int = 300
+
+
+class PipelineConfig(BaseModel):
+    """Streaming pipeline configuration."""
+
+    queue_size: int = 100
+    discovery_workers: int = 4
+    ingestion_workers: int = 10
+    transformation_workers: int = 4
+    intelligence_workers: int = 2
+    indexing_workers: int = 8
 
 
 class DatabaseConfig(BaseModel):
@@ -52,6 +78,12 @@ class DatabaseConfig(BaseModel):
     sqlite_path: str = "./archive/chronos.db"
     pool_size: int = 5
     max_overflow: int = 10
+    sqlite_wal: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout: int = 5000
+    sqlite_cache_size: int = -65536
+    sqlite_mmap_size: int = 268435456
+    sqlite_temp_store: str = "MEMORY"
 
 
 class DiscoveryConfig(BaseModel):
@@ -60,12 +92,24 @@ class DiscoveryConfig(BaseModel):
     cdx_api_url: str = "https://web.archive.org/cdx/search/cdx"
     cdx_params: dict[str, str] = Field(
         default_factory=lambda: {
-            "output": "json",
             "fl": "timestamp,original,mimetype,statuscode,digest,length",
         }
     )
     filter_status_codes: list[int] = Field(default_factory=lambda: [200, 301, 302])
     deduplicate_snapshots: bool = True
+    pagination: str = "pages"  # pages, resume_key or none
+    page_size: Optional[int] = None
+    page_concurrency: int = 4
+    resume_key_limit: int = 10000
+    server_side_filters: bool = True
+    sample_period: Optional[str] = None  # day, month or year
+    from_timestamp: Optional[str] = None
+    to_timestamp: Optional[str] = None
+    crawl_scope: str = "host"  # host, domain or prefix
+    crawl_concurrency: int = 8
+    cache_enabled: bool = False
+    cache_path: str = "./archive/cdx_cache.db"
+    cache_ttl: int = 86400
 
 
 class IngestionConfig(BaseModel):
@@ -76,6 +120,21 @@ class IngestionConfig(BaseModel):
     follow_redirects: bool = True
     validate_mime_type: bool = True
     validate_content_hash: bool = True
+    fetch_mode: str = "raw"
+    streaming: bool = True
+    chunk_size: int = 65536
+    spool_threshold: int = 1048576
+    spool_dir: Optional[str] = None
+
+
+class DedupConfig(BaseModel):
+    """Skip-if-archived gate configuration."""
+
+    enabled: bool = True
+    match_digest: bool = True
+    batch_size: int = 100
+    expected_items: int = 1_000_000
+    false_positive_rate: float = 0.01
 
 
 class TransformationConfig(BaseModel):
@@ -93,12 +152,26 @@ class TransformationConfig(BaseModel):
 class IndexingConfig(BaseModel):
     """Indexing stage configuration."""
 
+    schema_profile: str = "full"
     enable_full_text_search: bool = True
+    fts_language: str = "portuguese"
+    fts_tokenizer: str = "unicode61 remove_diacritics 2"
     index_fields: list[str] = Field(
         default_factory=lambda: ["url", "title", "timestamp", "content", "metadata"]
     )
     compress_content: bool = True
+    compression: str = "gzip"
     compression_level: int = 6
+    zstd_level: int = 3
+    zstd_dict_size: int = 112640
+    zstd_train_samples: int = 200
+    zstd_sample_budget: int = 67108864
+    storage_backend: str = "files"
+    warc_max_size: int = 1073741824
+    warc_prefix: str = "chronos"
+    pack_segment_size: int = 268435456
+    write_batch_size: int = 100
+    write_flush_interval: float = 0.05
 
 
 class LoggingConfig(BaseModel):
@@ -119,9 +192,11 @@ class ChronosConfig(BaseModel):
     archive: ArchiveConfig = Field(default_factory=ArchiveConfig)
     queue: QueueConfig = Field(default_factory=QueueConfig)
     processing: ProcessingConfig = Field(default_factory=ProcessingConfig)
+    pipeline: PipelineConfig = Field(default_factory=PipelineConfig)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     discovery: DiscoveryConfig = Field(default_factory=DiscoveryConfig)
     ingestion: IngestionConfig = Field(default_factory=IngestionConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
     transformation: TransformationConfig = Field(default_factory=TransformationConfig)
     indexing: IndexingConfig = Field(default_factory=IndexingConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
@@ -0,0 +1,192 @@
+"""Deduplication - Skip captures that are already archived."""
+
+import asyncio
+import hashlib
+import logging
+import math
+from typing import Any, Iterable, Optional
+
+from chronos_archiver.models import ArchiveSnapshot, ArchiveStatus
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys.
+
+    Answers "definitely not seen" or "possibly seen"; false positives occur
+    at roughly ``false_positive_rate`` once ``expected_items`` keys are added.
+    """
+
+    def __init__(self, expected_items: int = 1_000_000, false_positive_rate: float = 0.01) -> None:
+        """Initialize Bloom filter.
+
+        Args:
+            expected_items: Number of keys the filter is sized for
+            false_positive_rate: Target false positive rate at that size
+        """
+        expected_items = max(1, expected_items)
+        self.num_bits = max(
+            8, int(-expected_items * math.log(false_positive_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / expected_items * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        """Compute bit positions for a key (Kirsch-Mitzenmacher double hashing)."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        """Add a key to the filter.
+
+        Args:
+            key: Key to add
+        """
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class ArchiveDedup:
+    """Pre-ingestion gate that drops captures already in the index.
+
+    A Bloom filter seeded from the index answers most lookups in memory:
+    captures it has never seen go straight to download. Possible hits are
+    confirmed with one batched database query per batch.
+    """
+
+    def __init__(self, indexer: Any, config: Optional[dict] = None) -> None:
+        """Initialize deduplication gate.
+
+        Args:
+            indexer: ContentIndexer whose database is checked
+            config: Configuration dictionary
+        """
+        self.indexer = indexer
+        self.config = config or {}
+        dedup_config = self.config.get("dedup", {})
+
+        self.enabled = dedup_config.get("enabled", True)
+        self.match_digest = dedup_config.get("match_digest", True)
+        self.batch_size = dedup_config.get("batch_size", 100)
+
+        self.bloom = BloomFilter(
+            dedup_config.get("expected_items", 1_000_000),
+            dedup_config.get("false_positive_rate", 0.01),
+        )
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    @staticmethod
+    def capture_key(original_url: str, timestamp: str) -> str:
+        """Build the Bloom key for a URL/timestamp pair."""
+        return f"u:{timestamp}:{original_url}"
+
+    @staticmethod
+    def digest_key(original_url: str, digest: str) -> str:
+        """Build the Bloom key for a URL's content digest."""
+        return f"d:{digest}:{original_url}"
+
+    async def filter(self, snapshots: list[ArchiveSnapshot]) -> list[ArchiveSnapshot]:
+        """Drop snapshots that are already archived.
+
+        A snapshot is dropped if its capture is stored, or (with
+        ``match_digest``) if the same URL is stored with the same digest.
+        Identical content under another URL is not a match; redirect stubs
+        and error pages often share digests across URLs. Dropped snapshots
+        are marked SKIPPED.
+
+        Args:
+            snapshots: Batch of discovered snapshots
+
+        Returns:
+            Snapshots that still need to be downloaded, in input order
+        """
+        if not self.enabled or not snapshots:
+            return snapshots
+
+        await self._ensure_loaded()
+
+        candidates = [s for s in snapshots if self._maybe_archived(s)]
+        if not candidates:
+            return snapshots
+
+        digests = (
+            {(s.original_url, s.digest) for s in candidates if s.digest}
+            if self.match_digest
+            else set()
+        )
+        captures = {(s.original_url, s.timestamp) for s in candidates}
+        known_digests, known_captures = await asyncio.to_thread(
+            self.indexer.find_archived, digests, captures
+        )
+
+        fresh = []
+        for snapshot in snapshots:
+            if (snapshot.original_url, snapshot.timestamp) in known_captures or (
+                self.match_digest and (snapshot.original_url, snapshot.digest) in known_digests
+            ):
+                snapshot.status = ArchiveStatus.SKIPPED
+                logger.debug(f"Already archived, skipping: {snapshot.url}")
+            else:
+                fresh.append(snapshot)
+
+        if len(fresh) < len(snapshots):
+            logger.info(f"Skipped {len(snapshots) - len(fresh)} already archived captures")
+
+        return fresh
+
+    def add(self, snapshot: ArchiveSnapshot) -> None:
+        """Record a newly archived snapshot.
+
+        Args:
+            snapshot: Snapshot that was just indexed
+        """
+        self.bloom.add(self.capture_key(snapshot.original_url, snapshot.timestamp))
+        if snapshot.digest:
+            self.bloom.add(self.digest_key(snapshot.original_url, snapshot.digest))
+
+    def _maybe_archived(self, snapshot: ArchiveSnapshot) -> bool:
+        """Check the Bloom filter for a snapshot.
+
+        Args:
+            snapshot: Snapshot to check
+
+        Returns:
+            False if the snapshot is definitely not archived
+        """
+        if self.capture_key(snapshot.original_url, snapshot.timestamp) in self.bloom:
+            return True
+        return bool(
+            self.match_digest
+            and snapshot.digest
+            and self.digest_key(snapshot.original_url, snapshot.digest) in self.bloom
+        )
+
+    async def _ensure_loaded(self) -> None:
+        """Seed the Bloom filter from the index on first use."""
+        if self._loaded:
+            return
+
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            await asyncio.to_thread(self._load)
+            self._loaded = True
+
+    def _load(self) -> None:
+        """Add every indexed capture to the Bloom filter (runs in a worker thread)."""
+        for original_url, timestamp, digest in self.indexer.iter_archived_keys():
+            self.bloom.add(self.capture_key(original_url, timestamp))
+            if digest:
+                self.bloom.add(self.digest_key(original_url, digest))
+
+        logger.info(f"Loaded {self.bloom.count} archived keys into dedup filter")
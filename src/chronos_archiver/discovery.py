@@ -2,50 +2,108 @@
 
 import asyncio
 import logging
-from typing import Any, Optional
-from urllib.parse import quote, urlparse
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urljoin, urlparse
 
 import aiohttp
 
+from chronos_archiver.cdx_cache import CDXCache
+from chronos_archiver.ingestion import ContentIngestion
 from chronos_archiver.models import ArchiveSnapshot, ArchiveStatus
-from chronos_archiver.utils import normalize_url, parse_wayback_url
+from chronos_archiver.ratelimit import AdaptiveRateLimiter
+from chronos_archiver.resilience import RetryPolicy, is_retryable
+from chronos_archiver.session import SharedSession
+from chronos_archiver.transformation import ContentTransformation
+from chronos_archiver.utils import parse_wayback_url, surt_key, url_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Fields every CDX row must provide, in the order used by the parsers
+CDX_FIELDS = ["timestamp", "original", "mimetype", "statuscode", "digest", "length"]
+
+# Links rewritten relative to the archive root, e.g. /20090430060114/http://...
+ARCHIVE_RELATIVE_LINK = re.compile(r"^/\d{14}(?:[a-z]{2}_)?/(https?://.+)$")
+
+# Timestamp prefix length for "one capture per URL per period" sampling
+SAMPLE_PERIODS = {"year": 4, "month": 6, "day": 8}
+
 
 class WaybackDiscovery:
     """Discover archived URLs using the Wayback Machine CDX API."""
 
-    def __init__(self, config: Optional[dict] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[dict] = None,
+        http: Optional[SharedSession] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
         """Initialize discovery module.
 
         Args:
             config: Configuration dictionary
+            http: Shared HTTP session (a private one is created if omitted)
+            rate_limiter: Shared rate limiter (a private one is created if omitted)
+            retry_policy: Shared retry policy and circuit breakers (a private
+                one is created if omitted)
         """
         self.config = config or {}
+        self._owns_http = http is None
+        self.http = http or SharedSession(self.config)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(self.config)
+        self.retry_policy = retry_policy or RetryPolicy(self.config)
+        self.breaker = self.retry_policy.breaker("cdx")
         discovery_config = self.config.get("discovery", {})
 
         self.cdx_api_url = discovery_config.get(
             "cdx_api_url", "https://web.archive.org/cdx/search/cdx"
         )
-        self.cdx_params = discovery_config.get(
-            "cdx_params",
-            {
-                "output": "json",
-                "fl": "timestamp,original,mimetype,statuscode,digest,length",
-            },
-        )
+        self.cdx_params = discovery_config.get("cdx_params", {"fl": ",".join(CDX_FIELDS)})
         self.filter_status_codes = discovery_config.get("filter_status_codes", [200, 301, 302])
         self.deduplicate = discovery_config.get("deduplicate_snapshots", True)
+        self.pagination = discovery_config.get("pagination", "pages")
+        self.page_size = discovery_config.get("page_size")
+        self.page_concurrency = discovery_config.get("page_concurrency", 4)
+        self.resume_key_limit = discovery_config.get("resume_key_limit", 10000)
+        self.server_side_filters = discovery_config.get("server_side_filters", True)
+        self.sample_period = discovery_config.get("sample_period")
+        if self.sample_period and self.sample_period not in SAMPLE_PERIODS:
+            raise ValueError(
+                f"Invalid sample_period {self.sample_period!r}, "
+                f"expected one of: {', '.join(SAMPLE_PERIODS)}"
+            )
+        self.from_timestamp = discovery_config.get("from_timestamp")
+        self.to_timestamp = discovery_config.get("to_timestamp")
+
+        archive_config = self.config.get("archive", {})
+        self.allowed_mime_types = archive_config.get("allowed_mime_types", [])
+
+        self.crawl_scope = discovery_config.get("crawl_scope", "host")
+        self.crawl_concurrency = discovery_config.get("crawl_concurrency", 8)
+
+        # Persistent CDX cache
+        self.cache = None
+        if discovery_config.get("cache_enabled", False):
+            self.cache = CDXCache(
+                discovery_config.get("cache_path", "./archive/cdx_cache.db"),
+                ttl=discovery_config.get("cache_ttl", 86400),
+            )
 
         processing_config = self.config.get("processing", {})
         self.timeout = aiohttp.ClientTimeout(total=processing_config.get("request_timeout", 30))
 
-    async def find_snapshots(self, url: str) -> list[ArchiveSnapshot]:
+    async def find_snapshots(
+        self, url: str, match_type: Optional[str] = None
+    ) -> list[ArchiveSnapshot]:
         """Find all snapshots for a given URL or URL pattern.
 
         Args:
             url: URL or Wayback Machine URL to find snapshots for
+            match_type: CDX matchType (default: prefix for URLs ending in '/')
 
         Returns:
             List of discovered snapshots
@@ -54,64 +112,480 @@ class WaybackDiscovery:
             >>> discovery = WaybackDiscovery()
             >>> snapshots = await discovery.find_snapshots('http://www.dar.org.br/')
         """
+        return [snapshot async for snapshot in self.iter_snapshots(url, match_type)]
+
+    async def iter_snapshots(
+        self, url: str, match_type: Optional[str] = None
+    ) -> AsyncIterator[ArchiveSnapshot]:
+        """Stream snapshots for a given URL as CDX pages arrive.
+
+        Args:
+            url: URL or Wayback Machine URL to find snapshots for
+            match_type: CDX matchType (default: prefix for URLs ending in '/')
+
+        Yields:
+            Discovered snapshots
+
+        Example:
+            >>> async for snapshot in discovery.iter_snapshots('http://www.dar.org.br/'):
+            ...     print(snapshot.timestamp)
+        """
         # Parse if it's a Wayback URL
         parsed = parse_wayback_url(url)
         if parsed:
             # Single snapshot
-            return [await self._create_snapshot_from_wayback_url(url)]
+            yield await self._create_snapshot_from_wayback_url(url)
         else:
             # Query CDX API for all snapshots
-            return await self._query_cdx_api(url)
+            async for snapshot in self._query_cdx_api(url, match_type):
+                yield snapshot
 
-    async def _query_cdx_api(self, url: str) -> list[ArchiveSnapshot]:
-        """Query CDX API for snapshots.
+    async def _query_cdx_api(
+        self, url: str, match_type: Optional[str] = None
+    ) -> AsyncIterator[ArchiveSnapshot]:
+        """Query CDX API for snapshots, page by page.
 
         Args:
             url: Original URL to search for
+            match_type: CDX matchType (default: prefix for URLs ending in '/')
 
-        Returns:
-            List of snapshots found
+        Yields:
+            Snapshots found
         """
         logger.info(f"Querying CDX API for: {url}")
 
+        params = self._build_cdx_params(url, match_type)
+        seen_digests: set[str] = set()
+        state: dict[str, Any] = {}
+        found = 0
+
+        cache = self.cache
+        cache_key = None
+        if cache:
+            cache_key = cache.make_key(params)
+            entry = cache.lookup(cache_key)
+
+            if entry:
+                for fields in cache.iter_rows(cache_key):
+                    snapshot = self._snapshot_from_fields(fields, seen_digests)
+                    if snapshot:
+                        found += 1
+                        yield snapshot
+
+                if entry["fresh"]:
+                    logger.info(f"Found {found} cached snapshots for {url}")
+                    return
+
+                # Revalidate: only ask for captures since the newest one we have
+                if entry["newest_timestamp"]:
+                    params = {**params, "from": entry["newest_timestamp"]}
+                    logger.info(f"Revalidating CDX cache for {url} from {params['from']}")
+            else:
+                # Rows from an interrupted run were never served as cached; refetch them
+                cache.discard(cache_key)
+
+        if self.pagination == "resume_key":
+            snapshots = self._iter_resume_key_pages(params, seen_digests)
+        elif self.pagination == "pages":
+            snapshots = self._iter_numbered_pages(params, seen_digests, state)
+        else:
+            snapshots = self._iter_cdx_request(params, seen_digests)
+
+        try:
+            async for snapshot in snapshots:
+                if cache and cache_key and not cache.add(cache_key, snapshot):
+                    # Already served from the cache
+                    continue
+                found += 1
+                yield snapshot
+
+            if cache and cache_key and not state.get("incomplete"):
+                cache.mark_complete(cache_key, params)
+
+        except aiohttp.ClientError as e:
+            logger.error(f"CDX API request failed for {url}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error querying CDX API: {e}")
+        finally:
+            if cache and cache_key:
+                cache.flush()
+
+        logger.info(f"Found {found} snapshots for {url}")
+
+    def _build_cdx_params(self, url: str, match_type: Optional[str] = None) -> dict[str, Any]:
+        """Build CDX query parameters, pushing filters down to the server.
+
+        Status codes, MIME types, date ranges, digest deduplication and the
+        sampling period are translated into ``filter``, ``from``/``to`` and
+        ``collapse`` so only needed rows cross the wire.
+
+        Args:
+            url: Original URL to search for
+            match_type: CDX matchType (default: prefix for URLs ending in '/')
+
+        Returns:
+            Query parameters (``filter``/``collapse`` may hold lists)
+        """
         # Prepare query parameters
-        params = self.cdx_params.copy()
+        params: dict[str, Any] = self.cdx_params.copy()
         params["url"] = url
 
         # Add wildcard for subdirectories if needed
-        if url.endswith("/"):
+        if match_type:
+            params["matchType"] = match_type
+        elif url.endswith("/"):
             params["matchType"] = "prefix"
 
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        if self.from_timestamp:
+            params["from"] = str(self.from_timestamp)
+        if self.to_timestamp:
+            params["to"] = str(self.to_timestamp)
+
+        if not self.server_side_filters:
+            return params
+
+        filters = []
+        if self.filter_status_codes:
+            codes = "|".join(str(code) for code in self.filter_status_codes)
+            filters.append(f"statuscode:({codes})")
+        if self.allowed_mime_types:
+            mime_types = "|".join(re.escape(mime) for mime in self.allowed_mime_types)
+            filters.append(f"mimetype:({mime_types})")
+
+        # Rows are sorted by URL then timestamp, so collapsing on a timestamp
+        # prefix keeps one capture per URL per period
+        collapse = []
+        if self.sample_period:
+            collapse.append(f"timestamp:{SAMPLE_PERIODS[self.sample_period]}")
+        if self.deduplicate:
+            # Only adjacent duplicates collapse server-side; the parsers catch the rest
+            collapse.append("digest")
+
+        if filters:
+            params["filter"] = filters
+        if collapse:
+            params["collapse"] = collapse
+
+        return params
+
+    @asynccontextmanager
+    async def _cdx_get(self, params: dict[str, Any]) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a rate-limited CDX request and report its outcome.
+
+        Outcomes feed both the rate limiter and the CDX circuit breaker; while
+        the circuit is open the request fails immediately.
+
+        Args:
+            params: CDX query parameters
+
+        Yields:
+            Successful response
+        """
+        self.breaker.before_call()
+
+        async with self.rate_limiter:
+            session = self.http.get()
+            started = time.monotonic()
             try:
-                async with session.get(self.cdx_api_url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
+                async with session.get(
+                    self.cdx_api_url, params=params, timeout=self.timeout
+                ) as response:
+                    try:
+                        response.raise_for_status()
+                    except aiohttp.ClientResponseError as e:
+                        retry_after = e.headers.get("Retry-After") if e.headers else None
+                        self.rate_limiter.record_failure(e.status, retry_after)
+                        if is_retryable(e):
+                            self.breaker.record_failure()
+                        else:
+                            self.breaker.record_success()
+                        raise
+
+                    self.rate_limiter.record_success(time.monotonic() - started)
+                    self.breaker.record_success()
+                    yield response
+
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                self.rate_limiter.record_failure()
+                self.breaker.record_failure()
+                raise
+
+    async def _iter_cdx_request(
+        self,
+        params: dict[str, Any],
+        seen_digests: set[str],
+        state: Optional[dict[str, str]] = None,
+    ) -> AsyncIterator[ArchiveSnapshot]:
+        """Perform one CDX request and yield the snapshots that pass the filters.
+
+        Plain-text responses are parsed line by line as they arrive; JSON
+        responses (``output=json``) are decoded in one piece.
 
-                    # Parse CDX response
-                    snapshots = self._parse_cdx_response(data)
+        Args:
+            params: CDX query parameters
+            seen_digests: Digests already emitted (shared across pages of one query)
+            state: Receives ``resume_key`` when the server sends one
 
-                    logger.info(f"Found {len(snapshots)} snapshots for {url}")
-                    return snapshots
+        Yields:
+            Snapshots from this response
+        """
+        async with self._cdx_get(params) as response:
+            if params.get("output") == "json":
+                data = await response.json()
+
+                # A resume key is sent as an empty row followed by a single-column row
+                if len(data) >= 2 and data[-2] == [] and len(data[-1]) == 1:
+                    if state is not None:
+                        state["resume_key"] = data[-1][0]
+                    data = data[:-2]
+
+                for snapshot in self._parse_cdx_response(data, seen_digests):
+                    yield snapshot
+            else:
+                fields = params.get("fl", ",".join(CDX_FIELDS)).split(",")
+                async for snapshot in self._parse_cdx_stream(
+                    response.content, fields, seen_digests, state
+                ):
+                    yield snapshot
+
+    async def _collect_cdx_page(
+        self,
+        params: dict[str, Any],
+        seen_digests: set[str],
+        state: Optional[dict[str, str]] = None,
+    ) -> list[ArchiveSnapshot]:
+        """Fetch one CDX page and keep only the snapshots that survive filtering.
+
+        The page is fetched whole under the retry policy and only then merged
+        into ``seen_digests``, so a failed attempt leaves no trace.
 
-            except aiohttp.ClientError as e:
-                logger.error(f"CDX API request failed for {url}: {e}")
-                return []
+        Args:
+            params: CDX query parameters
+            seen_digests: Digests already emitted (shared across pages of one query)
+            state: Receives ``resume_key`` from the successful attempt
+
+        Returns:
+            Snapshots from this page
+        """
+
+        async def fetch_page() -> tuple[list[ArchiveSnapshot], dict[str, str]]:
+            page_digests: set[str] = set()
+            page_state: dict[str, str] = {}
+            page = [s async for s in self._iter_cdx_request(params, page_digests, page_state)]
+            return page, page_state
+
+        page, page_state = await self.retry_policy.call(fetch_page)
+        if state is not None:
+            state.update(page_state)
+
+        snapshots = []
+        for snapshot in page:
+            digest = snapshot.digest or ""
+            if self.deduplicate and digest in seen_digests:
+                continue
+            seen_digests.add(digest)
+            snapshots.append(snapshot)
+
+        return snapshots
+
+    async def _query_num_pages(self, params: dict[str, Any]) -> int:
+        """Ask the CDX server how many pages a query spans.
+
+        Args:
+            params: CDX query parameters
+
+        Returns:
+            Number of pages (1 if the server cannot tell)
+        """
+        count_params = {**params, "showNumPages": "true"}
+        count_params.pop("output", None)
+
+        async def fetch_count() -> int:
+            async with self._cdx_get(count_params) as response:
+                return max(1, int((await response.text()).strip()))
+
+        try:
+            return await self.retry_policy.call(fetch_count)
+        except Exception as e:
+            logger.debug(f"Could not determine CDX page count, using a single page: {e}")
+            return 1
+
+    async def _iter_numbered_pages(
+        self,
+        params: dict[str, Any],
+        seen_digests: set[str],
+        state: Optional[dict[str, Any]] = None,
+    ) -> AsyncIterator[ArchiveSnapshot]:
+        """Fetch CDX pages concurrently with ``page=N``, yielding each as it completes.
+
+        At most ``page_concurrency`` pages are in flight, so memory stays bounded
+        even when the consumer is slower than the network.
+
+        Args:
+            params: CDX query parameters
+            seen_digests: Digests already emitted
+            state: Receives ``incomplete`` when a page could not be fetched
+
+        Yields:
+            Snapshots from every page
+        """
+        if self.page_size:
+            params = {**params, "pageSize": str(self.page_size)}
+
+        num_pages = await self._query_num_pages(params)
+        if num_pages == 1:
+            for snapshot in await self._collect_cdx_page(params, seen_digests):
+                yield snapshot
+            return
+
+        logger.info(f"CDX query spans {num_pages} pages")
+
+        page_numbers = iter(range(num_pages))
+        in_flight: set[asyncio.Task] = set()
+
+        try:
+            while True:
+                while len(in_flight) < self.page_concurrency:
+                    page = next(page_numbers, None)
+                    if page is None:
+                        break
+                    in_flight.add(
+                        asyncio.ensure_future(
+                            self._collect_cdx_page({**params, "page": str(page)}, seen_digests)
+                        )
+                    )
+
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        page_snapshots = task.result()
+                    except Exception as e:
+                        logger.error(f"CDX page request failed: {e}")
+                        if state is not None:
+                            state["incomplete"] = True
+                        continue
+                    for snapshot in page_snapshots:
+                        yield snapshot
+
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _iter_resume_key_pages(
+        self, params: dict[str, Any], seen_digests: set[str]
+    ) -> AsyncIterator[ArchiveSnapshot]:
+        """Fetch CDX rows sequentially with ``showResumeKey``/``resumeKey``.
+
+        Each batch is bounded by ``resume_key_limit`` and fetched under the
+        retry policy, so a transient error retries only the current batch.
+
+        Args:
+            params: CDX query parameters
+            seen_digests: Digests already emitted
+
+        Yields:
+            Snapshots from every batch
+        """
+        params = {**params, "limit": str(self.resume_key_limit), "showResumeKey": "true"}
+
+        while True:
+            state: dict[str, str] = {}
+            for snapshot in await self._collect_cdx_page(params, seen_digests, state):
+                yield snapshot
+
+            resume_key = state.get("resume_key")
+            if not resume_key:
+                break
+
+            params = {**params, "resumeKey": resume_key}
+
+    async def _parse_cdx_stream(
+        self,
+        stream: aiohttp.StreamReader,
+        fields: list[str],
+        seen_digests: set[str],
+        state: Optional[dict[str, str]] = None,
+    ) -> AsyncIterator[ArchiveSnapshot]:
+        """Parse a space-delimited CDX text response line by line.
+
+        Status code and digest are checked on the raw bytes, so rows that are
+        filtered out never get decoded or turned into model objects.
+
+        Args:
+            stream: Response body stream
+            fields: Field names in ``fl`` order
+            seen_digests: Digests already emitted (shared across pages of one query)
+            state: Receives ``resume_key`` when the server sends one
+
+        Yields:
+            Snapshots that pass the filters
+        """
+        try:
+            positions = [fields.index(name) for name in CDX_FIELDS]
+        except ValueError:
+            raise ValueError(f"CDX 'fl' must include all of: {', '.join(CDX_FIELDS)}") from None
+
+        status_pos = positions[3]
+        digest_pos = positions[4]
+        width = max(positions) + 1
+        allowed_status = {str(code).encode() for code in self.filter_status_codes}
+        expect_resume_key = False
+
+        async for line in stream:
+            raw = line.split()
+
+            # A resume key is sent after an empty line
+            if not raw:
+                expect_resume_key = True
+                continue
+            if expect_resume_key:
+                if state is not None:
+                    state["resume_key"] = line.strip().decode("utf-8")
+                continue
+
+            if len(raw) < width:
+                continue
+
+            statuscode = raw[status_pos]
+            if not statuscode.isdigit():
+                continue
+            if allowed_status and statuscode not in allowed_status:
+                continue
+
+            if self.deduplicate and raw[digest_pos].decode("ascii", "replace") in seen_digests:
+                continue
+
+            try:
+                snapshot = self._snapshot_from_fields(
+                    [raw[pos].decode("utf-8", "replace") for pos in positions], seen_digests
+                )
             except Exception as e:
-                logger.error(f"Unexpected error querying CDX API: {e}")
-                return []
+                logger.warning(f"Failed to parse CDX line {line!r}: {e}")
+                continue
+
+            if snapshot:
+                yield snapshot
 
-    def _parse_cdx_response(self, data: list[Any]) -> list[ArchiveSnapshot]:
+    def _parse_cdx_response(
+        self, data: list[Any], seen_digests: Optional[set[str]] = None
+    ) -> list[ArchiveSnapshot]:
         """Parse CDX JSON response into ArchiveSnapshot objects.
 
         Args:
             data: CDX API JSON response
+            seen_digests: Digests already emitted (shared across pages of one query)
 
         Returns:
             List of parsed snapshots
         """
         snapshots = []
-        seen_digests = set()
+        if seen_digests is None:
+            seen_digests = set()
 
         # Skip header row if present
         rows = data[1:] if data and isinstance(data[0], list) and data[0][0] == "timestamp" else data
@@ -121,43 +595,57 @@ class WaybackDiscovery:
                 if len(row) < 6:
                     continue
 
-                timestamp, original, mimetype, statuscode, digest, length = row[:6]
+                snapshot = self._snapshot_from_fields(row[:6], seen_digests)
+                if snapshot:
+                    snapshots.append(snapshot)
 
-                # Filter by status code
-                try:
-                    status_int = int(statuscode)
-                    if self.filter_status_codes and status_int not in self.filter_status_codes:
-                        continue
-                except ValueError:
-                    continue
+            except Exception as e:
+                logger.warning(f"Failed to parse CDX row {row}: {e}")
+                continue
 
-                # Deduplicate by digest
-                if self.deduplicate and digest in seen_digests:
-                    continue
+        return snapshots
 
-                seen_digests.add(digest)
+    def _snapshot_from_fields(
+        self, fields: list[str], seen_digests: set[str]
+    ) -> Optional[ArchiveSnapshot]:
+        """Filter one CDX row and build its snapshot.
 
-                # Build Wayback URL
-                wayback_url = f"https://web.archive.org/web/{timestamp}/{original}"
+        Args:
+            fields: timestamp, original, mimetype, statuscode, digest, length
+            seen_digests: Digests already emitted
 
-                snapshot = ArchiveSnapshot(
-                    url=wayback_url,
-                    original_url=original,
-                    timestamp=timestamp,
-                    mime_type=mimetype,
-                    status_code=status_int,
-                    digest=digest,
-                    length=int(length) if length and length.isdigit() else None,
-                    status=ArchiveStatus.DISCOVERED,
-                )
+        Returns:
+            Snapshot, or None if the row is filtered out
+        """
+        timestamp, original, mimetype, statuscode, digest, length = fields
 
-                snapshots.append(snapshot)
+        # Filter by status code
+        try:
+            status_int = int(statuscode)
+        except ValueError:
+            return None
+        if self.filter_status_codes and status_int not in self.filter_status_codes:
+            return None
 
-            except Exception as e:
-                logger.warning(f"Failed to parse CDX row {row}: {e}")
-                continue
+        # Deduplicate by digest
+        if self.deduplicate and digest in seen_digests:
+            return None
 
-        return snapshots
+        seen_digests.add(digest)
+
+        # Build Wayback URL
+        wayback_url = f"https://web.archive.org/web/{timestamp}/{original}"
+
+        return ArchiveSnapshot(
+            url=wayback_url,
+            original_url=original,
+            timestamp=timestamp,
+            mime_type=mimetype,
+            status_code=status_int,
+            digest=digest,
+            length=int(length) if length and length.isdigit() else None,
+            status=ArchiveStatus.DISCOVERED,
+        )
 
     async def _create_snapshot_from_wayback_url(self, wayback_url: str) -> ArchiveSnapshot:
         """Create a snapshot object from a Wayback Machine URL.
@@ -179,40 +667,172 @@ class WaybackDiscovery:
             status=ArchiveStatus.DISCOVERED,
         )
 
-    async def discover_site(self, base_url: str, max_depth: int = 3) -> list[ArchiveSnapshot]:
+    async def discover_site(
+        self,
+        base_url: str,
+        max_depth: int = 3,
+        ingestion: Optional[ContentIngestion] = None,
+        transformation: Optional[ContentTransformation] = None,
+    ) -> list[ArchiveSnapshot]:
         """Discover all pages from a site by crawling links.
 
+        Crawls breadth-first: for every frontier URL the captures are looked
+        up in the CDX index, the latest HTML capture is downloaded and its
+        links are fed back into the frontier when they are in scope.
+
         Args:
             base_url: Base URL to start discovery from
             max_depth: Maximum crawl depth
+            ingestion: Ingestion stage used to fetch pages (shares this session if omitted)
+            transformation: Transformation stage used to extract links
 
         Returns:
             List of all discovered snapshots
         """
         logger.info(f"Starting site discovery for: {base_url}")
 
-        all_snapshots = []
-        visited_urls = set()
-        queue = [(base_url, 0)]
-
-        while queue:
-            url, depth = queue.pop(0)
+        ingestion = ingestion or ContentIngestion(
+            self.config,
+            http=self.http,
+            rate_limiter=self.rate_limiter,
+            retry_policy=self.retry_policy,
+        )
+        transformation = transformation or ContentTransformation(self.config)
+
+        all_snapshots: list[ArchiveSnapshot] = []
+        # 64-bit hashes of SURT keys keep the visited set small on large sites
+        visited = {url_fingerprint(base_url)}
+        frontier: deque[tuple[str, int]] = deque([(base_url, 0)])
+
+        while frontier:
+            batch = [frontier.popleft() for _ in range(min(self.crawl_concurrency, len(frontier)))]
+            results = await asyncio.gather(
+                *(
+                    self._crawl_page(url, depth < max_depth, ingestion, transformation)
+                    for url, depth in batch
+                ),
+                return_exceptions=True,
+            )
+
+            for (url, depth), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Crawl failed for {url}: {result}")
+                    continue
 
-            if depth > max_depth or normalize_url(url) in visited_urls:
-                continue
+                snapshots, links = result
+                all_snapshots.extend(snapshots)
 
-            visited_urls.add(normalize_url(url))
+                for link in links:
+                    if not self._in_crawl_scope(link, base_url):
+                        continue
 
-            # Find snapshots for this URL
-            snapshots = await self.find_snapshots(url)
-            all_snapshots.extend(snapshots)
+                    fingerprint = url_fingerprint(link)
+                    if fingerprint in visited:
+                        continue
 
-            # TODO: Extract links from snapshots and add to queue
-            # This would require downloading and parsing content
+                    visited.add(fingerprint)
+                    frontier.append((link, depth + 1))
 
-        logger.info(f"Site discovery complete: {len(all_snapshots)} snapshots found")
+        logger.info(
+            f"Site discovery complete: {len(all_snapshots)} snapshots found "
+            f"across {len(visited)} URLs"
+        )
         return all_snapshots
 
+    async def _crawl_page(
+        self,
+        url: str,
+        follow_links: bool,
+        ingestion: ContentIngestion,
+        transformation: ContentTransformation,
+    ) -> tuple[list[ArchiveSnapshot], list[str]]:
+        """Find the captures of one URL and extract its outgoing links.
+
+        Args:
+            url: Original URL to crawl
+            follow_links: Whether links should be extracted
+            ingestion: Ingestion stage
+            transformation: Transformation stage
+
+        Returns:
+            Snapshots of the URL and the original URLs it links to
+        """
+        snapshots = await self.find_snapshots(url, match_type="exact")
+
+        if not follow_links:
+            return snapshots, []
+
+        html_snapshots = [s for s in snapshots if s.mime_type in (None, "text/html")]
+        if not html_snapshots:
+            return snapshots, []
+
+        # Work on a copy so the returned snapshot keeps its DISCOVERED status
+        source = html_snapshots[-1].model_copy()
+        downloaded = await ingestion.download(source)
+        if not downloaded:
+            return snapshots, []
+
+        try:
+            transformed = await transformation.transform(downloaded)
+        finally:
+            downloaded.release()
+
+        if not transformed:
+            return snapshots, []
+
+        links = []
+        for link in transformed.links:
+            original = self._original_link(link, source.original_url)
+            if original:
+                links.append(original)
+
+        return snapshots, links
+
+    def _original_link(self, link: str, page_url: str) -> Optional[str]:
+        """Map a (possibly rewritten) link back to its original URL.
+
+        Args:
+            link: Link as found in transformed content
+            page_url: Original URL of the page the link came from
+
+        Returns:
+            Absolute original URL without fragment, or None if not crawlable
+        """
+        if link.startswith(("#", "data:", "javascript:", "mailto:")):
+            return None
+
+        parsed = parse_wayback_url(link)
+        if parsed:
+            link = parsed["original_url"]
+        else:
+            # Archive-relative links produced by the transformation stage
+            match = ARCHIVE_RELATIVE_LINK.match(link)
+            link = match.group(1) if match else urljoin(page_url, link)
+
+        link = link.split("#", 1)[0]
+        if not link.startswith(("http://", "https://")):
+            return None
+        return link
+
+    def _in_crawl_scope(self, url: str, base_url: str) -> bool:
+        """Check whether a URL falls inside the crawl scope.
+
+        Args:
+            url: Candidate URL
+            base_url: URL the crawl started from
+
+        Returns:
+            True if the URL should be crawled
+        """
+        host = (urlparse(url).hostname or "").removeprefix("www.")
+        base_host = (urlparse(base_url).hostname or "").removeprefix("www.")
+
+        if self.crawl_scope == "domain":
+            return host == base_host or host.endswith("." + base_host)
+        if self.crawl_scope == "prefix":
+            return surt_key(url).startswith(surt_key(base_url))
+        return host == base_host
+
     async def batch_discover(self, urls: list[str]) -> list[ArchiveSnapshot]:
         """Discover snapshots for multiple URLs concurrently.
 
@@ -232,4 +852,12 @@ class WaybackDiscovery:
             elif isinstance(result, Exception):
                 logger.error(f"Discovery failed: {result}")
 
-        return all_snapshots
\ No newline at end of file
+        return all_snapshots
+
+    async def close(self) -> None:
+        """Close the CDX cache and the HTTP session if it is owned by this instance."""
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        if self._owns_http:
+            await self.http.close()
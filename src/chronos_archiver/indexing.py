@@ -1,30 +1,121 @@
 """Indexing module - Stage 4: Store and index content."""
 
-import gzip
+import asyncio
 import json
 import logging
+import os
+import re
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import urlparse
 
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
     Column,
     DateTime,
+    Index,
     Integer,
     String,
     Text,
     create_engine,
     event,
+    func,
+    inspect,
+    select,
+    text,
 )
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from chronos_archiver.models import ArchiveStatus, IndexedContent, TransformedContent
-from chronos_archiver.utils import ensure_directory, format_timestamp, sanitize_filename
+from chronos_archiver.models import (
+    ArchiveSnapshot,
+    ArchiveStatus,
+    IndexedContent,
+    TransformedContent,
+)
+from chronos_archiver.compression import create_codec
+from chronos_archiver.storage import (
+    PackStorage,
+    StoredLocation,
+    create_storage,
+    read_stored,
+)
+from chronos_archiver.utils import ensure_directory, extract_domain
+from chronos_archiver.warc import write_wacz
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# "full" keeps page text and the metadata dict in the database; "lean" keeps
+# only typed columns and leaves bulk text to content storage and Meilisearch
+SCHEMA_PROFILES = ("full", "lean")
+
+# Suffix of blobs gc has renamed aside while it re-checks their references
+GC_SUFFIX = ".gc"
+
+# External-content FTS5 table over archived_pages, kept in sync by triggers
+SQLITE_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS archived_pages_fts USING fts5(
+        title, text_content, original_url,
+        content='archived_pages', content_rowid='id', tokenize='{tokenizer}'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS archived_pages_fts_ai AFTER INSERT ON archived_pages BEGIN
+        INSERT INTO archived_pages_fts(rowid, title, text_content, original_url)
+        VALUES (new.id, new.title, new.text_content, new.original_url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS archived_pages_fts_ad AFTER DELETE ON archived_pages BEGIN
+        INSERT INTO archived_pages_fts(archived_pages_fts, rowid, title, text_content, original_url)
+        VALUES ('delete', old.id, old.title, old.text_content, old.original_url);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS archived_pages_fts_au AFTER UPDATE ON archived_pages BEGIN
+        INSERT INTO archived_pages_fts(archived_pages_fts, rowid, title, text_content, original_url)
+        VALUES ('delete', old.id, old.title, old.text_content, old.original_url);
+        INSERT INTO archived_pages_fts(rowid, title, text_content, original_url)
+        VALUES (new.id, new.title, new.text_content, new.original_url);
+    END""",
+)
+
+# Stored tsvector (title > text > URL) with a GIN index
+POSTGRES_FTS_DDL = (
+    """ALTER TABLE archived_pages ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{language}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{language}', coalesce(text_content, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(original_url, '')), 'C')
+    ) STORED""",
+    """CREATE INDEX IF NOT EXISTS ix_archived_pages_search_vector
+    ON archived_pages USING GIN (search_vector)""",
+)
+
+SQLITE_FTS_QUERY = """
+    SELECT archived_pages_fts.rowid AS id,
+           snippet(archived_pages_fts, -1, '<mark>', '</mark>', '...', 32) AS snippet,
+           -bm25(archived_pages_fts, 10.0, 1.0, 2.0) AS score
+    FROM archived_pages_fts
+    JOIN archived_pages ON archived_pages.id = archived_pages_fts.rowid
+    WHERE archived_pages_fts MATCH :query
+      AND (:has_videos IS NULL OR archived_pages.has_videos = :has_videos)
+    ORDER BY bm25(archived_pages_fts, 10.0, 1.0, 2.0)
+    LIMIT :limit
+"""
+
+POSTGRES_FTS_QUERY = """
+    SELECT id,
+           ts_headline(CAST(:language AS regconfig), coalesce(text_content, ''), q,
+                       'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15') AS snippet,
+           ts_rank_cd(search_vector, q) AS score
+    FROM archived_pages, websearch_to_tsquery(CAST(:language AS regconfig), :query) AS q
+    WHERE search_vector @@ q
+      AND (CAST(:has_videos AS boolean) IS NULL OR has_videos = :has_videos)
+    ORDER BY score DESC
+    LIMIT :limit
+"""
+
 
 class ArchivedPage(Base):
     """Database model for archived pages."""
@@ -39,20 +130,160 @@ class ArchivedPage(Base):
     status_code = Column(Integer)
     digest = Column(String(64), index=True)
     title = Column(String(500))
-    text_content = Column(Text)
-    metadata_json = Column(Text)
+    host = Column(String(255), index=True)
+    language = Column(String(16), index=True)
+    word_count = Column(Integer)
+    has_videos = Column(Boolean, index=True)
+    text_content = Column(Text)  # NULL in the lean schema profile
+    metadata_json = Column(Text)  # NULL in the lean schema profile
     file_path = Column(String(1024))
+    record_offset = Column(BigInteger)
+    record_length = Column(BigInteger)
+    compression = Column(String(32))
     indexed_at = Column(DateTime, nullable=False)
 
+    # One row per capture; re-indexing a capture updates it in place
+    __table_args__ = (
+        Index("ux_archived_pages_capture", "original_url", "timestamp", unique=True),
+    )
+
+
+class ContentBlob(Base):
+    """Reference count of a content-addressed blob (``storage_backend: blobs``)."""
+
+    __tablename__ = "content_blobs"
+
+    file_path = Column(String(1024), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+
+class BatchWriter:
+    """Write-behind batcher for database rows.
+
+    Rows submitted by concurrent callers are collected and written by
+    ``write_rows`` in one transaction once ``batch_size`` rows are waiting or
+    ``flush_interval`` seconds have passed since the first one. Each caller
+    gets back the ID assigned to its row. If a batch fails, its rows are
+    retried one by one so a single bad row only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        write_rows: Callable[[list[dict[str, Any]]], list[int]],
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+    ) -> None:
+        """Initialize batch writer.
+
+        Args:
+            write_rows: Blocking function inserting rows in one transaction
+                and returning their IDs in order
+            batch_size: Rows per transaction
+            flush_interval: Maximum seconds a row waits for its batch to fill
+        """
+        self.write_rows = write_rows
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self._pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+        self._write_lock = asyncio.Lock()
+
+    async def submit(self, row: dict[str, Any]) -> int:
+        """Queue a row and wait until it is committed.
+
+        Args:
+            row: Column values
+
+        Returns:
+            Assigned database ID
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[int] = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._start_flush)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Write all queued rows and wait for in-flight batches."""
+        self._start_flush()
+        while self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _start_flush(self) -> None:
+        """Hand the queued rows to a background flush task."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        """Write one batch and resolve its callers' futures.
+
+        Args:
+            batch: (row, future) pairs
+        """
+        results: list[tuple[asyncio.Future, Optional[int], Optional[Exception]]]
+
+        # One writer at a time keeps batches in submission order
+        async with self._write_lock:
+            try:
+                ids = await asyncio.to_thread(self.write_rows, [row for row, _ in batch])
+                results = [(future, page_id, None) for (_, future), page_id in zip(batch, ids)]
+            except Exception as e:
+                if len(batch) == 1:
+                    results = [(batch[0][1], None, e)]
+                else:
+                    logger.warning(f"Batch insert of {len(batch)} rows failed, retrying rows: {e}")
+                    results = []
+                    for row, future in batch:
+                        try:
+                            (page_id,) = await asyncio.to_thread(self.write_rows, [row])
+                            results.append((future, page_id, None))
+                        except Exception as row_error:
+                            results.append((future, None, row_error))
+
+        for future, result_id, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result_id)
+
+
+class DuplicateCapturesError(RuntimeError):
+    """Raised when duplicate captures block the unique (original_url, timestamp) key."""
+
 
 class ContentIndexer:
     """Index and store archived content."""
 
-    def __init__(self, config: Optional[dict] = None) -> None:
+    def __init__(
+        self, config: Optional[dict] = None, allow_duplicate_captures: bool = False
+    ) -> None:
         """Initialize indexing module.
 
         Args:
             config: Configuration dictionary
+            allow_duplicate_captures: Open a database whose duplicate captures
+                block the unique capture key (see ``dedupe_captures``)
+
+        Raises:
+            DuplicateCapturesError: If duplicates block the key and
+                ``allow_duplicate_captures`` is False
         """
         self.config = config or {}
         db_config = self.config.get("database", {})
@@ -62,6 +293,16 @@ class ContentIndexer:
         self.output_dir = Path(archive_config.get("output_dir", "./archive"))
         self.compress = indexing_config.get("compress_content", True)
         self.compression_level = indexing_config.get("compression_level", 6)
+        self.write_batch_size = indexing_config.get("write_batch_size", 100)
+        self.write_flush_interval = indexing_config.get("write_flush_interval", 0.05)
+        self.schema_profile = indexing_config.get("schema_profile", "full")
+        if self.schema_profile not in SCHEMA_PROFILES:
+            raise ValueError(
+                f"Invalid schema_profile {self.schema_profile!r}, expected one of {SCHEMA_PROFILES}"
+            )
+        self.enable_full_text_search = indexing_config.get("enable_full_text_search", True)
+        self.fts_language = indexing_config.get("fts_language", "portuguese")
+        self.fts_tokenizer = indexing_config.get("fts_tokenizer", "unicode61 remove_diacritics 2")
 
         # Set up database
         db_type = db_config.get("type", "sqlite")
@@ -73,13 +314,249 @@ class ContentIndexer:
             # PostgreSQL or other
             db_url = db_config.get("postgresql_url", "sqlite:///chronos.db")
 
-        self.engine = create_engine(db_url, echo=False)
+        self.engine = create_engine(
+            db_url,
+            echo=False,
+            pool_size=db_config.get("pool_size", 5),
+            max_overflow=db_config.get("max_overflow", 10),
+            pool_pre_ping=True,
+        )
+        if self.engine.dialect.name == "sqlite":
+            self.sqlite_pragmas = {
+                "journal_mode": "WAL" if db_config.get("sqlite_wal", True) else "DELETE",
+                "synchronous": db_config.get("sqlite_synchronous", "NORMAL"),
+                "busy_timeout": db_config.get("sqlite_busy_timeout", 5000),
+                "cache_size": db_config.get("sqlite_cache_size", -65536),
+                "mmap_size": db_config.get("sqlite_mmap_size", 268435456),
+                "temp_store": db_config.get("sqlite_temp_store", "MEMORY"),
+            }
+            event.listen(self.engine, "connect", self._configure_sqlite)
         Base.metadata.create_all(self.engine)
+        self._add_missing_columns(allow_duplicate_captures)
+        self.full_text_backend = (
+            self._setup_full_text_search() if self.enable_full_text_search else None
+        )
         self.Session = sessionmaker(bind=self.engine)
+        self.writer = BatchWriter(
+            self._insert_rows, self.write_batch_size, self.write_flush_interval
+        )
 
         # Create output directories
         ensure_directory(self.output_dir)
-        ensure_directory(self.output_dir / "content")
+        self.storage = create_storage(self.config, self.output_dir)
+
+    def _configure_sqlite(self, dbapi_connection: Any, connection_record: Any) -> None:
+        """Apply the SQLite performance pragmas to a new connection.
+
+        WAL lets readers (API queries) run alongside the writer, and
+        busy_timeout makes writers wait instead of failing with
+        "database is locked".
+
+        Args:
+            dbapi_connection: Raw sqlite3 connection
+            connection_record: Pool connection record (unused)
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.sqlite_pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    def _add_missing_columns(self, allow_duplicate_captures: bool = False) -> None:
+        """Add columns and indexes introduced after a database was created.
+
+        Args:
+            allow_duplicate_captures: Leave the unique capture key out instead
+                of failing when duplicate captures block it
+        """
+        table = ArchivedPage.__table__
+        inspector = inspect(self.engine)
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+
+        with self.engine.begin() as conn:
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    conn.execute(
+                        text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                    )
+                    logger.info(f"Added column {table.name}.{column.name}")
+
+            skip = set()
+            if "ux_archived_pages_capture" not in existing_indexes:
+                # Databases from before the unique capture key may hold duplicates
+                duplicates = len(self._find_duplicate_captures(conn))
+                if duplicates and not allow_duplicate_captures:
+                    raise DuplicateCapturesError(
+                        f"{duplicates} duplicate captures block the unique "
+                        "(original_url, timestamp) key; review them with "
+                        "'chronos dedupe-captures --dry-run' and remove them with "
+                        "'chronos dedupe-captures'"
+                    )
+                if duplicates:
+                    logger.warning(
+                        f"{duplicates} duplicate captures; unique capture key not created"
+                    )
+                    skip.add("ux_archived_pages_capture")
+
+            # Indexes on columns added above (create_all skips existing tables)
+            for index in table.indexes:
+                if index.name not in skip:
+                    index.create(conn, checkfirst=True)
+
+    @staticmethod
+    def _find_duplicate_captures(conn: Any) -> list[Any]:
+        """Find all but the newest row of each (original_url, timestamp).
+
+        Args:
+            conn: Open connection
+
+        Returns:
+            Rows of (id, file_path, record_offset, record_length)
+        """
+        pages = ArchivedPage.__table__
+        newest = select(func.max(pages.c.id)).group_by(pages.c.original_url, pages.c.timestamp)
+        return conn.execute(
+            select(
+                pages.c.id, pages.c.file_path, pages.c.record_offset, pages.c.record_length
+            ).where(pages.c.id.not_in(newest))
+        ).all()
+
+    def dedupe_captures(self, dry_run: bool = False) -> dict[str, int]:
+        """Delete all but the newest row of each capture and add the unique key.
+
+        Blob references of deleted rows are released (``gc`` reclaims the
+        blobs) and page files no remaining row uses are deleted. Records in
+        WARC and pack segments cannot be removed from the append-only
+        segments; they are reported as orphaned.
+
+        Args:
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Counts of duplicate rows, released blob references, deleted files,
+            and orphaned segment records and bytes
+        """
+        pages = ArchivedPage.__table__
+        blobs = ContentBlob.__table__
+        report = {
+            "duplicates": 0,
+            "blob_refs": 0,
+            "files": 0,
+            "orphaned_records": 0,
+            "orphaned_bytes": 0,
+        }
+        stale_files: set[str] = set()
+
+        with self.engine.begin() as conn:
+            duplicates = self._find_duplicate_captures(conn)
+            report["duplicates"] = len(duplicates)
+
+            ids = {row.id for row in duplicates}
+            paths = {row.file_path for row in duplicates if row.file_path}
+            kept_files: set[str] = set()
+            kept_records: set[tuple[str, int]] = set()
+            blob_paths: set[str] = set()
+            ordered_paths = sorted(paths)
+            for start in range(0, len(ordered_paths), 500):
+                chunk = ordered_paths[start : start + 500]
+                for file_path, record_offset, page_id in conn.execute(
+                    select(pages.c.file_path, pages.c.record_offset, pages.c.id).where(
+                        pages.c.file_path.in_(chunk)
+                    )
+                ):
+                    if page_id in ids:
+                        continue
+                    if record_offset is None:
+                        kept_files.add(file_path)
+                    else:
+                        kept_records.add((file_path, record_offset))
+                blob_paths.update(
+                    path
+                    for (path,) in conn.execute(
+                        select(blobs.c.file_path).where(blobs.c.file_path.in_(chunk))
+                    )
+                )
+
+            refs: dict[str, int] = {}
+            orphaned_records: set[tuple[str, int]] = set()
+            for row in duplicates:
+                if not row.file_path:
+                    continue
+                if row.file_path in blob_paths:
+                    refs[row.file_path] = refs.get(row.file_path, 0) - 1
+                elif row.record_offset is not None:
+                    if (row.file_path, row.record_offset) not in kept_records:
+                        orphaned_records.add((row.file_path, row.record_offset))
+                        report["orphaned_bytes"] += row.record_length or 0
+                elif row.file_path not in kept_files:
+                    stale_files.add(row.file_path)
+
+            report["blob_refs"] = -sum(refs.values())
+            report["files"] = len(stale_files)
+            report["orphaned_records"] = len(orphaned_records)
+
+            if not dry_run:
+                for path, delta in refs.items():
+                    conn.execute(
+                        blobs.update()
+                        .where(blobs.c.file_path == path)
+                        .values(ref_count=blobs.c.ref_count + delta)
+                    )
+                ordered = sorted(ids)
+                for start in range(0, len(ordered), 500):
+                    conn.execute(pages.delete().where(pages.c.id.in_(ordered[start : start + 500])))
+                for index in ArchivedPage.__table__.indexes:
+                    if index.name == "ux_archived_pages_capture":
+                        index.create(conn, checkfirst=True)
+
+        if not dry_run:
+            for relative in stale_files:
+                (self.output_dir / relative).unlink(missing_ok=True)
+
+        logger.info(
+            f"{'Would remove' if dry_run else 'Removed'} {report['duplicates']} duplicate captures "
+            f"({report['orphaned_records']} orphaned segment records)"
+        )
+        return report
+
+    def _setup_full_text_search(self) -> Optional[str]:
+        """Create the full-text index for the database dialect.
+
+        Returns:
+            "fts5", "tsvector", or None if unsupported (search falls back to LIKE)
+        """
+        dialect = self.engine.dialect.name
+
+        try:
+            if dialect == "sqlite":
+                is_new = not inspect(self.engine).has_table("archived_pages_fts")
+                with self.engine.begin() as conn:
+                    for statement in SQLITE_FTS_DDL:
+                        conn.exec_driver_sql(
+                            statement.replace("{tokenizer}", self.fts_tokenizer.replace("'", ""))
+                        )
+                    if is_new:
+                        # Index rows stored before the FTS table existed
+                        conn.exec_driver_sql(
+                            "INSERT INTO archived_pages_fts(archived_pages_fts) VALUES ('rebuild')"
+                        )
+                return "fts5"
+
+            if dialect == "postgresql":
+                if not re.fullmatch(r"\w+", self.fts_language):
+                    raise ValueError(f"Invalid fts_language {self.fts_language!r}")
+                with self.engine.begin() as conn:
+                    for statement in POSTGRES_FTS_DDL:
+                        conn.exec_driver_sql(statement.replace("{language}", self.fts_language))
+                return "tsvector"
+
+        except OperationalError as e:
+            logger.warning(f"Full-text index unavailable, using LIKE search: {e}")
+
+        return None
 
     async def index(self, transformed: TransformedContent) -> Optional[IndexedContent]:
         """Index transformed content.
@@ -98,11 +575,11 @@ class ContentIndexer:
         logger.info(f"Indexing: {transformed.snapshot.url}")
 
         try:
-            # Store content to file
-            file_path = await self._store_content(transformed)
+            # Store content to the storage backend
+            location = await self._store_content(transformed)
 
-            # Save to database
-            indexed_id = self._save_to_database(transformed, file_path)
+            # Save to database (batched with concurrent pages)
+            indexed_id = await self._save_to_database(transformed, location)
 
             transformed.snapshot.status = ArchiveStatus.INDEXED
             logger.info(f"Indexed successfully: {transformed.snapshot.url}")
@@ -120,113 +597,642 @@ class ContentIndexer:
             logger.error(f"Indexing failed for {transformed.snapshot.url}: {e}")
             return None
 
-    async def _store_content(self, transformed: TransformedContent) -> str:
-        """Store content to filesystem.
+    async def _store_content(self, transformed: TransformedContent) -> StoredLocation:
+        """Store content with the configured storage backend.
 
         Args:
             transformed: Transformed content
 
         Returns:
-            Relative file path
+            Stored location
         """
-        # Create directory structure: content/YYYY/MM/DD/
-        timestamp_dt = format_timestamp(transformed.snapshot.timestamp)
-        date_dir = self.output_dir / "content" / timestamp_dt.strftime("%Y/%m/%d")
-        ensure_directory(date_dir)
-
-        # Generate filename from URL and timestamp
-        filename = sanitize_filename(
-            f"{transformed.snapshot.timestamp}_{transformed.snapshot.original_url.split('://')[-1].replace('/', '_')}.html"
-        )
-
-        if self.compress:
-            filename += ".gz"
+        # Compression and file writes run off the event loop
+        return await asyncio.to_thread(self._write_content, transformed)
 
-        file_path = date_dir / filename
+    def _write_content(self, transformed: TransformedContent) -> StoredLocation:
+        """Encode and write content (runs in a worker thread).
 
-        # Write content
-        content_bytes = transformed.content.encode("utf-8")
-        if self.compress:
-            with gzip.open(file_path, "wb", compresslevel=self.compression_level) as f:
-                f.write(content_bytes)
-        else:
-            with open(file_path, "wb") as f:
-                f.write(content_bytes)
+        Args:
+            transformed: Transformed content
 
-        # Return relative path
-        return str(file_path.relative_to(self.output_dir))
+        Returns:
+            Stored location
+        """
+        return self.storage.write(transformed, transformed.content.encode("utf-8"))
 
-    def _save_to_database(self, transformed: TransformedContent, file_path: str) -> int:
+    async def _save_to_database(
+        self, transformed: TransformedContent, location: StoredLocation
+    ) -> int:
         """Save metadata to database.
 
         Args:
             transformed: Transformed content
-            file_path: Path to stored file
+            location: Stored location returned by the storage backend
 
         Returns:
             Database ID
         """
+        metadata = transformed.metadata
+        text_content = transformed.text_content
+        title = metadata.get("title")
+        language = metadata.get("language")
+        lean = self.schema_profile == "lean"
+
+        return await self.writer.submit(
+            {
+                "url": transformed.snapshot.url,
+                "original_url": transformed.snapshot.original_url,
+                "timestamp": transformed.snapshot.timestamp,
+                "mime_type": transformed.snapshot.mime_type,
+                "status_code": transformed.snapshot.status_code,
+                "digest": transformed.snapshot.digest,
+                "title": title[:500] if title else None,
+                "host": (urlparse(transformed.snapshot.original_url).hostname or "")[:255],
+                "language": language[:16].lower() if language else None,
+                "word_count": metadata.get(
+                    "word_count", len(text_content.split()) if text_content else 0
+                ),
+                "has_videos": bool(metadata.get("has_videos", False)),
+                "text_content": None if lean else text_content,
+                "metadata_json": None if lean else json.dumps(metadata),
+                "file_path": location.file_path,
+                "record_offset": location.record_offset,
+                "record_length": location.record_length,
+                "compression": location.compression,
+                "indexed_at": transformed.transformed_at,
+            }
+        )
+
+    def _insert_rows(self, rows: list[dict[str, Any]]) -> list[int]:
+        """Upsert rows in a single transaction.
+
+        Rows are keyed by capture (original_url, timestamp). Indexing a
+        capture again, e.g. from a redelivered queue message, updates its
+        row in place and returns the existing ID.
+
+        Args:
+            rows: Column values per page
+
+        Returns:
+            Database IDs in row order
+        """
+        # Content must be durable before rows point at it: one fsync per batch
+        self.storage.sync()
+
+        # A batch can hold the same capture twice; the last submission wins
+        captures = {(row["original_url"], row["timestamp"]): row for row in rows}
+
+        statement = self._dialect_insert(ArchivedPage)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ArchivedPage.original_url, ArchivedPage.timestamp],
+            set_={
+                name: statement.excluded[name]
+                for name in rows[0]
+                if name not in ("original_url", "timestamp")
+            },
+        ).returning(ArchivedPage.id, ArchivedPage.original_url, ArchivedPage.timestamp)
+
+        with self.Session.begin() as session:
+            refs: dict[str, int] = {}
+            if self.storage.content_addressed:
+                # Rows being replaced release the blob they pointed at
+                for file_path in self._blob_paths(session, set(captures)):
+                    refs[file_path] = refs.get(file_path, 0) - 1
+                for row in captures.values():
+                    refs[row["file_path"]] = refs.get(row["file_path"], 0) + 1
+
+            ids = {
+                (original_url, timestamp): page_id
+                for page_id, original_url, timestamp in session.execute(
+                    statement, list(captures.values())
+                )
+            }
+
+            refs = {path: delta for path, delta in refs.items() if delta}
+            if refs:
+                self._add_blob_refs(session, refs)
+
+        return [ids[(row["original_url"], row["timestamp"])] for row in rows]
+
+    def _blob_paths(self, session: Any, captures: set[tuple[str, str]]) -> list[str]:
+        """Reference-counted blobs that stored captures point at.
+
+        Args:
+            session: Open session
+            captures: (original_url, timestamp) pairs
+
+        Returns:
+            Blob paths, one per stored capture
+        """
+        rows = session.execute(
+            select(ArchivedPage.original_url, ArchivedPage.timestamp, ArchivedPage.file_path)
+            .join(ContentBlob, ContentBlob.file_path == ArchivedPage.file_path)
+            .where(
+                ArchivedPage.original_url.in_({url for url, _ in captures}),
+                ArchivedPage.timestamp.in_({timestamp for _, timestamp in captures}),
+            )
+        )
+        return [file_path for url, timestamp, file_path in rows if (url, timestamp) in captures]
+
+    def _dialect_insert(self, model: Any) -> Any:
+        """INSERT construct with ON CONFLICT support for the database dialect.
+
+        Args:
+            model: Mapped class to insert into
+
+        Returns:
+            Insert statement
+        """
+        if self.engine.dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
+
+    def _add_blob_refs(self, session: Any, refs: dict[str, int]) -> None:
+        """Adjust blob reference counts in the current transaction.
+
+        Args:
+            session: Open session
+            refs: Blob path -> reference count delta
+        """
+        statement = self._dialect_insert(ContentBlob).values(
+            [{"file_path": path, "ref_count": delta} for path, delta in refs.items()]
+        )
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[ContentBlob.file_path],
+                set_={"ref_count": ContentBlob.ref_count + statement.excluded.ref_count},
+            )
+        )
+
+    def find_archived(
+        self, digests: set[tuple[str, str]], captures: set[tuple[str, str]]
+    ) -> tuple[set[tuple[str, str]], set[tuple[str, str]]]:
+        """Look up which URL digests and captures are already stored.
+
+        Args:
+            digests: (original_url, digest) pairs to check
+            captures: (original_url, timestamp) pairs to check
+
+        Returns:
+            Tuple of (stored URL digests, stored captures)
+        """
         session = self.Session()
         try:
-            page = ArchivedPage(
-                url=transformed.snapshot.url,
-                original_url=transformed.snapshot.original_url,
-                timestamp=transformed.snapshot.timestamp,
-                mime_type=transformed.snapshot.mime_type,
-                status_code=transformed.snapshot.status_code,
-                digest=transformed.snapshot.digest,
-                title=transformed.metadata.get("title"),
-                text_content=transformed.text_content,
-                metadata_json=json.dumps(transformed.metadata),
-                file_path=file_path,
-                indexed_at=transformed.transformed_at,
+            known_digests: set[tuple[str, str]] = set()
+            if digests:
+                rows = session.query(ArchivedPage.original_url, ArchivedPage.digest).filter(
+                    ArchivedPage.original_url.in_({url for url, _ in digests}),
+                    ArchivedPage.digest.in_({digest for _, digest in digests}),
+                )
+                known_digests = {(url, digest) for url, digest in rows} & digests
+
+            known_captures: set[tuple[str, str]] = set()
+            if captures:
+                rows = session.query(ArchivedPage.original_url, ArchivedPage.timestamp).filter(
+                    ArchivedPage.original_url.in_({url for url, _ in captures}),
+                    ArchivedPage.timestamp.in_({timestamp for _, timestamp in captures}),
+                )
+                known_captures = {(url, timestamp) for url, timestamp in rows} & captures
+
+            return known_digests, known_captures
+
+        finally:
+            session.close()
+
+    def iter_archived_keys(self) -> Iterator[tuple[str, str, Optional[str]]]:
+        """Iterate over every stored capture.
+
+        Yields:
+            (original_url, timestamp, digest) tuples
+        """
+        session = self.Session()
+        try:
+            rows = session.query(
+                ArchivedPage.original_url, ArchivedPage.timestamp, ArchivedPage.digest
+            ).yield_per(10000)
+            for original_url, timestamp, digest in rows:
+                yield original_url, timestamp, digest
+
+        finally:
+            session.close()
+
+    def read_content(self, page_id: int) -> Optional[str]:
+        """Read the stored content of an archived page.
+
+        WARC-backed pages are read with a single seek to their record.
+
+        Args:
+            page_id: Database ID
+
+        Returns:
+            Page content or None if the page does not exist
+        """
+        session = self.Session()
+        try:
+            page = session.get(ArchivedPage, page_id)
+            if page is None or not page.file_path:
+                return None
+            location = StoredLocation(
+                page.file_path, page.record_offset, page.record_length, page.compression
             )
+        finally:
+            session.close()
+
+        return read_stored(self.output_dir, location).decode("utf-8", errors="replace")
+
+    def delete_page(self, page_id: int) -> bool:
+        """Delete an archived page, releasing its blob reference.
+
+        Unreferenced blobs are removed by :meth:`gc`.
+
+        Args:
+            page_id: Database ID
+
+        Returns:
+            True if the page existed
+        """
+        with self.Session.begin() as session:
+            page = session.get(ArchivedPage, page_id)
+            if page is None:
+                return False
+
+            blob_path = page.file_path
+            session.delete(page)
+            if blob_path and session.get(ContentBlob, blob_path) is not None:
+                self._add_blob_refs(session, {blob_path: -1})
+            return True
+
+    def gc(self, min_age: float = 3600, dry_run: bool = False) -> dict[str, int]:
+        """Delete blobs that no archived page references.
+
+        Blobs whose reference count dropped to zero and orphaned blob files
+        (e.g. from a crash before the database commit) are removed once
+        they are older than ``min_age`` seconds. Each candidate is first
+        renamed aside, then its reference count and mtime are checked
+        again: a blob a running archive job reused in the meantime (its
+        mtime was touched or its count went up) is restored, and a job that
+        looks for it after the rename writes a fresh copy instead.
+
+        Args:
+            min_age: Minimum seconds since a blob was last written or reused
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Counts of deleted blobs and freed bytes
+        """
+        blob_dir = self.output_dir / "blobs"
+        cutoff = time.time() - min_age
+        files = [p for p in blob_dir.rglob("*") if p.is_file()] if blob_dir.exists() else []
+
+        # Put back blobs a crashed gc left renamed aside
+        for trash in [p for p in files if p.suffix == GC_SUFFIX]:
+            files.remove(trash)
+            original = trash.with_suffix("")
+            if not dry_run and not original.exists():
+                os.replace(trash, original)
+                files.append(original)
+
+        with self.Session() as session:
+            referenced = {
+                path
+                for (path,) in session.query(ContentBlob.file_path).filter(
+                    ContentBlob.ref_count > 0
+                )
+            }
+
+        deleted, freed = 0, 0
+        for path in files:
+            relative = str(path.relative_to(self.output_dir))
+            if relative in referenced:
+                continue
+
+            stat = path.stat()
+            if stat.st_mtime > cutoff:
+                continue
+
+            if dry_run:
+                deleted += 1
+                freed += stat.st_size
+                continue
+
+            trash = path.with_name(path.name + GC_SUFFIX)
+            try:
+                os.replace(path, trash)
+            except FileNotFoundError:
+                continue
+
+            with self.Session.begin() as session:
+                reused = session.query(ContentBlob.file_path).filter(
+                    ContentBlob.file_path == relative, ContentBlob.ref_count > 0
+                ).first()
+                if reused or trash.stat().st_mtime > cutoff:
+                    os.replace(trash, path)
+                    continue
+
+                session.query(ContentBlob).filter(
+                    ContentBlob.file_path == relative, ContentBlob.ref_count <= 0
+                ).delete(synchronize_session=False)
+                trash.unlink()
+                deleted += 1
+                freed += stat.st_size
+
+        action = "Would delete" if dry_run else "Deleted"
+        logger.info(f"{action} {deleted} unreferenced blobs ({freed} bytes)")
+        return {"deleted": deleted, "freed_bytes": freed}
+
+    def repack(self, batch_size: int = 500, delete_files: bool = True) -> dict[str, int]:
+        """Move pages stored as individual files (files/blobs backends) into packs.
 
-            session.add(page)
-            session.commit()
-            page_id = page.id
-            return page_id
+        Rows are rewritten batch by batch; each batch's packs are fsynced
+        before the batch commits. Old files are deleted at the end, once no
+        row points at them.
+
+        Args:
+            batch_size: Rows per transaction
+            delete_files: Delete migrated files and empty directories
+
+        Returns:
+            Counts of migrated pages, packed files and failures
+        """
+        indexing_config = self.config.get("indexing", {})
+        packer = (
+            self.storage
+            if isinstance(self.storage, PackStorage)
+            else PackStorage(
+                self.output_dir,
+                create_codec(self.config, self.output_dir),
+                indexing_config.get("pack_segment_size", 256 * 1024 * 1024),
+            )
+        )
+
+        # Shared blobs are packed once, even when their rows are in different batches
+        packed_blobs: dict[str, StoredLocation] = {}
+        migrated_paths: set[str] = set()
+        migrated, failed, last_id = 0, 0, 0
+
+        try:
+            while True:
+                with self.Session.begin() as session:
+                    pages = (
+                        session.query(ArchivedPage)
+                        .filter(
+                            ArchivedPage.id > last_id,
+                            ArchivedPage.record_offset.is_(None),
+                            ArchivedPage.file_path.isnot(None),
+                        )
+                        .order_by(ArchivedPage.id)
+                        .limit(batch_size)
+                        .all()
+                    )
+                    if not pages:
+                        break
+
+                    batch: dict[str, StoredLocation] = {}
+                    released: dict[str, int] = {}
+                    for page in pages:
+                        last_id = page.id
+                        location = packed_blobs.get(page.file_path) or batch.get(page.file_path)
+                        if location is None:
+                            old = StoredLocation(page.file_path, compression=page.compression)
+                            try:
+                                content = read_stored(self.output_dir, old)
+                            except OSError as e:
+                                logger.warning(f"Cannot repack page {page.id}: {e}")
+                                failed += 1
+                                continue
+                            location = packer.append(content, extract_domain(page.original_url))
+                            batch[page.file_path] = location
+
+                        if page.file_path.startswith("blobs/"):
+                            released[page.file_path] = released.get(page.file_path, 0) - 1
+                        (
+                            page.file_path,
+                            page.record_offset,
+                            page.record_length,
+                            page.compression,
+                        ) = location
+                        migrated += 1
+
+                    packer.sync()
+                    # Rows of a shared blob in later batches still hold references
+                    if released:
+                        self._add_blob_refs(session, released)
+
+                migrated_paths.update(batch)
+                packed_blobs.update(
+                    (path, location)
+                    for path, location in batch.items()
+                    if path.startswith("blobs/")
+                )
+                logger.info(f"Repacked {migrated} pages")
 
+        finally:
+            if packer is not self.storage:
+                packer.close()
+
+        # A file is only dropped once no row points at it (an interrupted
+        # run or a live job may still reference it)
+        unused = sorted(migrated_paths)
+        for start in range(0, len(unused), 500):
+            chunk = unused[start : start + 500]
+            with self.Session.begin() as session:
+                referenced = {
+                    path
+                    for (path,) in session.query(ArchivedPage.file_path).filter(
+                        ArchivedPage.file_path.in_(chunk)
+                    )
+                }
+                referenced.update(
+                    path
+                    for (path,) in session.query(ContentBlob.file_path).filter(
+                        ContentBlob.file_path.in_(chunk), ContentBlob.ref_count > 0
+                    )
+                )
+                stale = [path for path in chunk if path not in referenced]
+                session.query(ContentBlob).filter(ContentBlob.file_path.in_(stale)).delete(
+                    synchronize_session=False
+                )
+
+            if delete_files:
+                for relative in stale:
+                    (self.output_dir / relative).unlink(missing_ok=True)
+
+        if delete_files:
+            for root in ("content", "blobs"):
+                self._remove_empty_dirs(self.output_dir / root)
+
+        return {"pages": migrated, "files": len(migrated_paths), "failed": failed}
+
+    @staticmethod
+    def _remove_empty_dirs(root: Path) -> None:
+        """Remove empty directories below ``root`` (bottom-up)."""
+        if not root.exists():
+            return
+        for directory in sorted((p for p in root.rglob("*") if p.is_dir()), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+
+    def export_wacz(self, output_path: Path, title: str = "ChronosArchiver export") -> Path:
+        """Export WARC-backed pages as a WACZ bundle.
+
+        Args:
+            output_path: WACZ file to create
+            title: Collection title
+
+        Returns:
+            Path of the written WACZ file
+
+        Raises:
+            ValueError: If no page is stored in a WARC file
+        """
+        session = self.Session()
+        try:
+            rows = (
+                session.query(ArchivedPage)
+                .filter(
+                    ArchivedPage.record_offset.isnot(None),
+                    ArchivedPage.file_path.like("warcs/%"),
+                )
+                .order_by(ArchivedPage.id)
+                .yield_per(10000)
+            )
+            entries = [
+                {
+                    "url": page.original_url,
+                    "timestamp": page.timestamp,
+                    "mime": "text/html",
+                    "status": page.status_code,
+                    "title": page.title,
+                    "filename": page.file_path,
+                    "offset": page.record_offset,
+                    "length": page.record_length,
+                }
+                for page in rows
+            ]
         finally:
             session.close()
 
-    async def search(self, query: str, limit: int = 100) -> list[IndexedContent]:
+        if not entries:
+            raise ValueError(
+                "No WARC-backed pages to export; set indexing.storage_backend to 'warc'"
+            )
+
+        return write_wacz(output_path, self.output_dir, entries, title)
+
+    async def search(
+        self, query: str, limit: int = 100, has_videos: Optional[bool] = None
+    ) -> list[IndexedContent]:
         """Search indexed content.
 
         Args:
             query: Search query
             limit: Maximum results
+            has_videos: Only return pages with (True) or without (False) videos
 
         Returns:
             List of matching indexed content
         """
+        return await asyncio.to_thread(self._search, query, limit, has_videos)
+
+    def _search(
+        self, query: str, limit: int, has_videos: Optional[bool] = None
+    ) -> list[IndexedContent]:
+        """Run a search query (runs in a worker thread).
+
+        Uses the ranked full-text index when available, LIKE scans otherwise.
+
+        Args:
+            query: Search query
+            limit: Maximum results
+            has_videos: Only return pages with (True) or without (False) videos
+
+        Returns:
+            List of matching indexed content, best match first
+        """
         session = self.Session()
         try:
-            results = (
-                session.query(ArchivedPage)
-                .filter(
-                    (ArchivedPage.text_content.contains(query))
-                    | (ArchivedPage.title.contains(query))
-                    | (ArchivedPage.original_url.contains(query))
-                )
-                .limit(limit)
-                .all()
-            )
+            if self.full_text_backend:
+                if self.full_text_backend == "fts5":
+                    # Quote each term so user input is never parsed as FTS5 syntax
+                    terms = re.findall(r"\w+", query)
+                    if not terms:
+                        return []
+                    statement = text(SQLITE_FTS_QUERY)
+                    params = {"query": " ".join(f'"{t}"' for t in terms), "limit": limit}
+                else:
+                    statement = text(POSTGRES_FTS_QUERY)
+                    params = {"query": query, "language": self.fts_language, "limit": limit}
+                params["has_videos"] = has_videos
 
-            return [
-                IndexedContent(
-                    id=r.id,
-                    snapshot=None,  # Reconstruct if needed
-                    content="",
-                    text_content=r.text_content,
-                    metadata=json.loads(r.metadata_json) if r.metadata_json else {},
-                )
-                for r in results
-            ]
+                hits = session.execute(statement, params).all()
+                pages = {
+                    page.id: page
+                    for page in session.query(ArchivedPage).filter(
+                        ArchivedPage.id.in_([hit.id for hit in hits])
+                    )
+                }
+                return [
+                    self._to_indexed(pages[hit.id], hit.snippet, hit.score)
+                    for hit in hits
+                    if hit.id in pages
+                ]
+
+            results = session.query(ArchivedPage).filter(
+                (ArchivedPage.text_content.contains(query))
+                | (ArchivedPage.title.contains(query))
+                | (ArchivedPage.original_url.contains(query))
+            )
+            if has_videos is not None:
+                results = results.filter(ArchivedPage.has_videos == has_videos)
+            results = results.limit(limit).all()
+            return [self._to_indexed(r) for r in results]
 
         finally:
             session.close()
 
+    @staticmethod
+    def _to_indexed(
+        page: ArchivedPage, snippet: Optional[str] = None, score: Optional[float] = None
+    ) -> IndexedContent:
+        """Convert a database row to a search result.
+
+        Args:
+            page: Database row
+            snippet: Highlighted snippet from the full-text index
+            score: Relevance score (higher is better)
+
+        Returns:
+            Indexed content without the stored page body
+        """
+        return IndexedContent(
+            id=page.id,
+            snapshot=ArchiveSnapshot(
+                url=page.url,
+                original_url=page.original_url,
+                timestamp=page.timestamp,
+                mime_type=page.mime_type,
+                status_code=page.status_code,
+                digest=page.digest,
+                status=ArchiveStatus.INDEXED,
+            ),
+            content="",
+            text_content=page.text_content,
+            metadata=(
+                json.loads(page.metadata_json)
+                if page.metadata_json
+                else {
+                    "title": page.title,
+                    "language": page.language,
+                    "word_count": page.word_count,
+                    "has_videos": page.has_videos,
+                }
+            ),
+            snippet=snippet,
+            score=score,
+        )
+
     async def close(self) -> None:
-        """Close database connections."""
-        self.engine.dispose()
\ No newline at end of file
+        """Flush pending rows, then close the storage backend and database connections."""
+        await self.writer.flush()
+        await asyncio.to_thread(self.storage.close)
+        await asyncio.to_thread(self.engine.dispose)
@@ -1,35 +1,109 @@
 """Ingestion module - Stage 2: Download content from Wayback Machine."""
 
 import asyncio
+import hashlib
 import logging
-from typing import Optional
+import os
+import tempfile
+import time
+import zlib
+from collections import deque
+from typing import IO, AsyncIterable, AsyncIterator, Iterable, Optional, Union
 
 import aiohttp
-from asyncio_throttle import Throttler
 
 from chronos_archiver.models import ArchiveSnapshot, ArchiveStatus, DownloadedContent
-from chronos_archiver.utils import calculate_hash, retry_on_exception
+from chronos_archiver.ratelimit import AdaptiveRateLimiter
+from chronos_archiver.resilience import RetryPolicy, is_retryable
+from chronos_archiver.session import SharedSession
+from chronos_archiver.utils import build_wayback_url, cdx_digest, detect_encoding
 
 logger = logging.getLogger(__name__)
 
+FETCH_MODES = ("raw", "replay")
+
+# Bytes from the start of a body used to detect a missing charset
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Content-Encodings undone after hashing when a capture's digest is validated
+DECODABLE_ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "x-gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+class _ContentDecoder:
+    """Incrementally undo a gzip or deflate Content-Encoding."""
+
+    def __init__(self, content_encoding: Optional[str]) -> None:
+        """Initialize decoder.
+
+        Args:
+            content_encoding: Content-Encoding response header
+
+        Raises:
+            ValueError: For encodings other than gzip, deflate and identity
+        """
+        name = (content_encoding or "identity").strip().lower()
+        if name != "identity" and name not in DECODABLE_ENCODINGS:
+            raise ValueError(f"Unsupported Content-Encoding {content_encoding!r}")
+        self._zlib = zlib.decompressobj(DECODABLE_ENCODINGS[name]) if name != "identity" else None
+
+    def decode(self, data: bytes) -> bytes:
+        """Decode the next chunk."""
+        return self._zlib.decompress(data) if self._zlib else data
+
+    def flush(self) -> bytes:
+        """Return any remaining decoded bytes."""
+        return self._zlib.flush() if self._zlib else b""
+
 
 class ContentIngestion:
     """Download and validate content from the Wayback Machine."""
 
-    def __init__(self, config: Optional[dict] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[dict] = None,
+        http: Optional[SharedSession] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
         """Initialize ingestion module.
 
         Args:
             config: Configuration dictionary
+            http: Shared HTTP session (a private one is created if omitted)
+            rate_limiter: Shared rate limiter (a private one is created if omitted)
+            retry_policy: Shared retry policy and circuit breakers (a private
+                one is created if omitted)
         """
         self.config = config or {}
+        self._owns_http = http is None
+        self.http = http or SharedSession(self.config)
         ingestion_config = self.config.get("ingestion", {})
         archive_config = self.config.get("archive", {})
         processing_config = self.config.get("processing", {})
 
         self.wayback_url = ingestion_config.get("wayback_url", "https://web.archive.org/web")
+
+        # "raw" fetches {timestamp}id_/{original} captures without the Wayback
+        # toolbar and link rewriting; "replay" downloads snapshot.url as served
+        self.fetch_mode = ingestion_config.get("fetch_mode", "raw")
+        if self.fetch_mode not in FETCH_MODES:
+            raise ValueError(
+                f"Invalid fetch_mode {self.fetch_mode!r}, expected one of {FETCH_MODES}"
+            )
         self.verify_ssl = ingestion_config.get("verify_ssl", True)
         self.validate_hash = ingestion_config.get("validate_content_hash", True)
+        self.digests_checked = 0
+        self.digest_mismatches = 0
+
+        # Streaming: bodies above spool_threshold go to a temp file instead of RAM
+        self.streaming = ingestion_config.get("streaming", True)
+        self.chunk_size = ingestion_config.get("chunk_size", 64 * 1024)
+        self.spool_threshold = ingestion_config.get("spool_threshold", 1024 * 1024)
+        self.spool_dir = ingestion_config.get("spool_dir")
 
         self.user_agent = archive_config.get("user_agent", "ChronosArchiver/1.0")
         self.max_file_size = archive_config.get("max_file_size", 100) * 1024 * 1024  # MB to bytes
@@ -37,13 +111,11 @@ class ContentIngestion:
         self.timeout = aiohttp.ClientTimeout(
             total=processing_config.get("download_timeout", 300)
         )
-        self.max_retries = processing_config.get("retry_attempts", 3)
-        self.retry_delay = processing_config.get("retry_delay", 5)
 
-        # Rate limiting
-        self.throttler = Throttler(
-            rate_limit=processing_config.get("requests_per_second", 5)
-        )
+        # Adaptive rate limiting, retries and circuit breaking
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(self.config)
+        self.retry_policy = retry_policy or RetryPolicy(self.config)
+        self.breaker = self.retry_policy.breaker("wayback")
 
     async def download(self, snapshot: ArchiveSnapshot) -> Optional[DownloadedContent]:
         """Download content for a snapshot.
@@ -72,9 +144,8 @@ class ContentIngestion:
             logger.error(f"Download failed for {snapshot.url}: {e}")
             return None
 
-    @retry_on_exception(max_attempts=3, delay=5.0, backoff=2.0)
     async def _download_with_retry(self, snapshot: ArchiveSnapshot) -> Optional[DownloadedContent]:
-        """Download with retry logic.
+        """Download, retrying transient errors under the shared retry policy.
 
         Args:
             snapshot: Snapshot to download
@@ -82,8 +153,31 @@ class ContentIngestion:
         Returns:
             Downloaded content
         """
-        async with self.throttler:
-            return await self._perform_download(snapshot)
+        return await self.retry_policy.call(self._attempt_download, snapshot)
+
+    async def _attempt_download(self, snapshot: ArchiveSnapshot) -> Optional[DownloadedContent]:
+        """Make one rate-limited, circuit-checked download attempt.
+
+        Args:
+            snapshot: Snapshot to download
+
+        Returns:
+            Downloaded content
+        """
+        # Fail fast while the Wayback Machine is known to be down
+        self.breaker.before_call()
+
+        async with self.rate_limiter:
+            try:
+                return await self._perform_download(snapshot)
+            except aiohttp.ClientResponseError:
+                # Status errors were already reported by _perform_download
+                raise
+            except Exception:
+                # Anything else must still settle a half-open probe
+                self.rate_limiter.record_failure()
+                self.breaker.record_failure()
+                raise
 
     async def _perform_download(self, snapshot: ArchiveSnapshot) -> Optional[DownloadedContent]:
         """Perform the actual download.
@@ -94,57 +188,227 @@ class ContentIngestion:
         Returns:
             Downloaded content
         """
-        headers = {"User-Agent": self.user_agent}
+        raw = self.fetch_mode == "raw"
+        validate = raw and self._should_validate(snapshot)
+        url = (
+            build_wayback_url(snapshot.timestamp, snapshot.original_url, "id_", self.wayback_url)
+            if raw
+            else snapshot.url
+        )
+
+        # The CDX digest covers the payload as stored, so validated fetches
+        # hash the bytes before undoing any Content-Encoding
+        request_options: dict = (
+            {"auto_decompress": False, "headers": {"Accept-Encoding": "gzip, deflate"}}
+            if validate
+            else {}
+        )
 
-        connector = aiohttp.TCPConnector(ssl=self.verify_ssl)
-        async with aiohttp.ClientSession(
-            connector=connector, timeout=self.timeout, headers=headers
-        ) as session:
-            async with session.get(snapshot.url) as response:
+        session = self.http.get()
+        started = time.monotonic()
+        async with session.get(url, timeout=self.timeout, **request_options) as response:
+            try:
                 response.raise_for_status()
+            except aiohttp.ClientResponseError as e:
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                self.rate_limiter.record_failure(e.status, retry_after)
+                # A 404 still means the upstream is up
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                raise
+
+            self.rate_limiter.record_success(time.monotonic() - started)
+            self.breaker.record_success()
+
+            # Check content length
+            content_length = response.headers.get("Content-Length")
+            if content_length and int(content_length) > self.max_file_size:
+                logger.warning(
+                    f"File too large ({content_length} bytes), skipping: {snapshot.url}"
+                )
+                snapshot.status = ArchiveStatus.SKIPPED
+                return None
+
+            decoder = (
+                _ContentDecoder(response.headers.get("Content-Encoding")) if validate else None
+            )
 
-                # Check content length
-                content_length = response.headers.get("Content-Length")
-                if content_length and int(content_length) > self.max_file_size:
+            if self.streaming:
+                body = await self._stream_body(response, snapshot, decoder)
+                if body is None:
+                    return None
+                content, content_path, digest, head = body
+                # Detection is CPU-bound; keep it off the event loop
+                encoding = response.charset or await asyncio.to_thread(detect_encoding, head)
+            else:
+                content = await response.read()
+                digest = cdx_digest(hashlib.sha1(content).digest())
+                if decoder:
+                    content = decoder.decode(content) + decoder.flush()
+                if len(content) > self.max_file_size:
                     logger.warning(
-                        f"File too large ({content_length} bytes), skipping: {snapshot.url}"
+                        f"Downloaded content too large ({len(content)} bytes), skipping"
                     )
                     snapshot.status = ArchiveStatus.SKIPPED
                     return None
+                content_path = None
+                encoding = response.charset or await asyncio.to_thread(
+                    detect_encoding, content[:ENCODING_SAMPLE_SIZE]
+                )
 
-                # Download content
-                content = await response.read()
+            digest_valid = None
+            if validate:
+                digest_valid = self._check_digest(snapshot, digest)
+
+            # Create downloaded content object
+            return DownloadedContent(
+                snapshot=snapshot,
+                content=content,
+                content_path=content_path,
+                digest=digest,
+                digest_valid=digest_valid,
+                raw_capture=raw,
+                headers=dict(response.headers),
+                encoding=encoding,
+            )
+
+    async def _stream_body(
+        self,
+        response: aiohttp.ClientResponse,
+        snapshot: ArchiveSnapshot,
+        decoder: Optional["_ContentDecoder"] = None,
+    ) -> Optional[tuple[bytes, Optional[str], str, bytes]]:
+        """Read a response body chunk by chunk.
+
+        Small bodies stay in memory; once ``spool_threshold`` is exceeded the
+        rest is written to a temporary file. The SHA-1 is updated per chunk and
+        the download is aborted as soon as ``max_file_size`` is exceeded.
 
-                # Validate size
-                if len(content) > self.max_file_size:
+        Args:
+            response: Response whose body has not been read yet
+            snapshot: Snapshot being downloaded
+            decoder: Content-Encoding decoder for bodies read undecoded; the
+                SHA-1 covers the encoded bytes
+
+        Returns:
+            (content, content_path, CDX digest, first bytes for charset
+            detection), or None if the body was too large
+        """
+        hasher = hashlib.sha1()
+        buffer = bytearray()
+        head = b""
+        spool = None
+        size = 0
+
+        async def chunks() -> AsyncIterator[bytes]:
+            async for wire in response.content.iter_chunked(self.chunk_size):
+                hasher.update(wire)
+                yield decoder.decode(wire) if decoder else wire
+            if decoder:
+                yield decoder.flush()
+
+        try:
+            async for chunk in chunks():
+                size += len(chunk)
+                if size > self.max_file_size:
                     logger.warning(
-                        f"Downloaded content too large ({len(content)} bytes), skipping"
+                        f"Download exceeded {self.max_file_size} bytes, aborting: {snapshot.url}"
                     )
                     snapshot.status = ArchiveStatus.SKIPPED
+                    self._discard_spool(spool)
                     return None
 
-                # Validate hash if digest is available
-                if self.validate_hash and snapshot.digest:
-                    content_hash = calculate_hash(content, "sha1")
-                    if content_hash != snapshot.digest:
-                        logger.warning(
-                            f"Content hash mismatch for {snapshot.url}: "
-                            f"expected {snapshot.digest}, got {content_hash}"
-                        )
-
-                # Create downloaded content object
-                return DownloadedContent(
-                    snapshot=snapshot,
-                    content=content,
-                    headers=dict(response.headers),
-                    encoding=response.get_encoding(),
-                )
+                if spool is not None:
+                    spool.write(chunk)
+                    continue
+
+                buffer.extend(chunk)
+                if len(buffer) > self.spool_threshold:
+                    spool = tempfile.NamedTemporaryFile(
+                        dir=self.spool_dir, prefix="chronos-", suffix=".part", delete=False
+                    )
+                    spool.write(buffer)
+                    head = bytes(buffer[:ENCODING_SAMPLE_SIZE])
+                    buffer = bytearray()
+
+        except BaseException:
+            self._discard_spool(spool)
+            raise
+
+        if spool is None:
+            content = bytes(buffer)
+            return content, None, cdx_digest(hasher.digest()), content[:ENCODING_SAMPLE_SIZE]
+
+        spool.close()
+        return b"", spool.name, cdx_digest(hasher.digest()), head
+
+    def _should_validate(self, snapshot: ArchiveSnapshot) -> bool:
+        """Check whether a snapshot's CDX digest can be validated.
+
+        The CDX digest is the SHA-1 of the raw capture, so it only matches
+        bytes fetched in ``raw`` mode. Redirects and revisit records are
+        skipped because their payload is not what gets served.
+
+        Args:
+            snapshot: Snapshot to download
+
+        Returns:
+            True if the downloaded bytes should be validated
+        """
+        return bool(
+            self.validate_hash
+            and snapshot.digest
+            and snapshot.status_code in (None, 200)
+            and snapshot.mime_type != "warc/revisit"
+        )
+
+    def _check_digest(self, snapshot: ArchiveSnapshot, digest: str) -> bool:
+        """Compare a computed digest with the CDX digest and count mismatches.
+
+        Args:
+            snapshot: Downloaded snapshot
+            digest: Base32 SHA-1 of the downloaded bytes
+
+        Returns:
+            True if the digests match
+        """
+        self.digests_checked += 1
+        if snapshot.digest and digest == snapshot.digest.upper():
+            return True
+
+        self.digest_mismatches += 1
+        logger.warning(
+            f"Content digest mismatch for {snapshot.url}: "
+            f"expected {snapshot.digest}, got {digest}"
+        )
+        return False
+
+    @staticmethod
+    def _discard_spool(spool: Optional[IO[bytes]]) -> None:
+        """Close and delete a partially written spool file.
+
+        Args:
+            spool: Open temporary file, or None
+        """
+        if spool is None:
+            return
+
+        spool.close()
+        try:
+            os.unlink(spool.name)
+        except FileNotFoundError:
+            pass
 
     async def batch_download(
         self, snapshots: list[ArchiveSnapshot], concurrency: int = 10
     ) -> list[Optional[DownloadedContent]]:
         """Download multiple snapshots concurrently.
 
+        All results are held in memory until the batch finishes; use
+        :meth:`iter_downloads` for large batches.
+
         Args:
             snapshots: List of snapshots to download
             concurrency: Maximum concurrent downloads
@@ -174,6 +438,69 @@ class ContentIngestion:
 
         return downloaded
 
+    async def iter_downloads(
+        self,
+        snapshots: Union[Iterable[ArchiveSnapshot], AsyncIterable[ArchiveSnapshot]],
+        concurrency: int = 10,
+    ) -> AsyncIterator[DownloadedContent]:
+        """Download snapshots concurrently, yielding each result as it completes.
+
+        At most ``concurrency`` downloads are in flight. No new download is
+        started while the consumer is handling a yielded item, so memory stays
+        bounded by ``concurrency`` bodies however many snapshots are passed.
+        Failed or skipped snapshots are not yielded; their status says why.
+
+        Args:
+            snapshots: Snapshots to download (any iterable or async iterable)
+            concurrency: Maximum concurrent downloads
+
+        Yields:
+            Downloaded content, in completion order
+
+        Example:
+            >>> async for content in ingestion.iter_downloads(snapshots, concurrency=5):
+            ...     await process(content)
+        """
+        pending: set[asyncio.Task] = set()
+        # Finished downloads not yet handed to the consumer
+        ready: deque[DownloadedContent] = deque()
+
+        async def drain() -> AsyncIterator[DownloadedContent]:
+            nonlocal pending
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            ready.extend(content for content in (task.result() for task in done) if content)
+            while ready:
+                yield ready.popleft()
+
+        async def source() -> AsyncIterator[ArchiveSnapshot]:
+            if hasattr(snapshots, "__aiter__"):
+                async for snapshot in snapshots:
+                    yield snapshot
+            else:
+                for snapshot in snapshots:
+                    yield snapshot
+
+        try:
+            async for snapshot in source():
+                if len(pending) >= concurrency:
+                    async for content in drain():
+                        yield content
+                pending.add(asyncio.create_task(self.download(snapshot)))
+
+            while pending:
+                async for content in drain():
+                    yield content
+
+        finally:
+            # Consumer stopped early: do not leave downloads running, and drop
+            # the spool files of results it will never see
+            for task in pending:
+                task.cancel()
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            ready.extend(result for result in results if isinstance(result, DownloadedContent))
+            for content in ready:
+                content.release()
+
     def sanitize_content(self, content: bytes) -> bytes:
         """Sanitize downloaded content.
 
@@ -191,4 +518,9 @@ class ContentIngestion:
         # - Fix encoding issues
         # - Normalize line endings
 
-        return sanitized
\ No newline at end of file
+        return sanitized
+
+    async def close(self) -> None:
+        """Close the HTTP session if it is owned by this instance."""
+        if self._owns_http:
+            await self.http.close()
@@ -1,8 +1,10 @@
 """Data models for ChronosArchiver."""
 
+import io
+import os
 from datetime import datetime
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, BinaryIO, Optional
 
 from pydantic import BaseModel, Field
 
@@ -46,11 +48,52 @@ class DownloadedContent(BaseModel):
     """Represents downloaded content from Wayback Machine."""
 
     snapshot: ArchiveSnapshot
-    content: bytes = Field(..., description="Raw downloaded content")
+    content: bytes = Field(b"", description="Raw downloaded content (empty when spooled)")
+    content_path: Optional[str] = Field(
+        None, description="Temporary file holding the content when spooled to disk"
+    )
+    digest: Optional[str] = Field(
+        None, description="Base32 SHA-1 of the content, comparable to the CDX digest"
+    )
+    digest_valid: Optional[bool] = Field(
+        None, description="Whether the digest matched the CDX digest (None if not checked)"
+    )
+    raw_capture: bool = Field(
+        False, description="Fetched with id_ (no Wayback toolbar or link rewriting)"
+    )
     headers: dict[str, str] = Field(default_factory=dict, description="HTTP headers")
     encoding: Optional[str] = Field(None, description="Content encoding")
     downloaded_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @property
+    def size(self) -> int:
+        """Get content size in bytes."""
+        if self.content_path:
+            return os.path.getsize(self.content_path)
+        return len(self.content)
+
+    def open(self) -> BinaryIO:
+        """Open the content for streaming reads."""
+        if self.content_path:
+            return open(self.content_path, "rb")
+        return io.BytesIO(self.content)
+
+    def read_bytes(self) -> bytes:
+        """Load the full content into memory."""
+        if self.content_path:
+            with open(self.content_path, "rb") as f:
+                return f.read()
+        return self.content
+
+    def release(self) -> None:
+        """Delete the spooled temporary file, if any."""
+        if self.content_path:
+            try:
+                os.unlink(self.content_path)
+            except FileNotFoundError:
+                pass
+            self.content_path = None
+
 
 class TransformedContent(BaseModel):
     """Represents transformed content ready for indexing."""
@@ -102,6 +145,8 @@ class IndexedContent(BaseModel):
     content: str = Field(..., description="Stored content")
     text_content: Optional[str] = Field(None, description="Searchable text")
     metadata: dict[str, Any] = Field(default_factory=dict)
+    snippet: Optional[str] = Field(None, description="Highlighted search snippet")
+    score: Optional[float] = Field(None, description="Search relevance score")
     indexed_at: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -144,6 +189,7 @@ class ProcessingStats(BaseModel):
     indexed: int = 0
     failed: int = 0
     skipped: int = 0
+    digest_mismatches: int = 0
     start_time: datetime = Field(default_factory=datetime.utcnow)
     end_time: Optional[datetime] = None
 
@@ -0,0 +1,251 @@
+"""Pipeline module - Streaming, bounded-concurrency stage engine."""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Optional, Union
+
+from chronos_archiver.models import (
+    ArchiveSnapshot,
+    ArchiveStatus,
+    DownloadedContent,
+    ProcessingStats,
+    TransformedContent,
+)
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["discovery", "ingestion", "transformation", "intelligence", "indexing"]
+
+
+class StreamingPipeline:
+    """Run the archive stages as a streaming pipeline.
+
+    Each stage owns a bounded ``asyncio.Queue`` and a pool of workers. Items
+    flow from one stage to the next as soon as they are ready, so downloads
+    overlap with parsing and only ``queue_size`` items per stage are held in
+    memory at any time.
+    """
+
+    def __init__(self, archiver: Any, config: Optional[dict] = None) -> None:
+        """Initialize streaming pipeline.
+
+        Args:
+            archiver: ChronosArchiver providing the stage components
+            config: Configuration dictionary
+        """
+        self.archiver = archiver
+        self.config = config or {}
+        pipeline_config = self.config.get("pipeline", {})
+
+        self.queue_size = pipeline_config.get("queue_size", 100)
+        self.worker_counts = {
+            "discovery": pipeline_config.get("discovery_workers", 4),
+            "ingestion": pipeline_config.get("ingestion_workers", 10),
+            "transformation": pipeline_config.get("transformation_workers", 4),
+            "intelligence": pipeline_config.get("intelligence_workers", 2),
+            "indexing": pipeline_config.get("indexing_workers", 8),
+        }
+
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.workers: list[asyncio.Task] = []
+        self.stats = ProcessingStats()
+        self.enable_intelligence = True
+        self.priority = "normal"
+
+    async def run(
+        self,
+        urls: Union[Iterable[str], AsyncIterable[str]],
+        enable_intelligence: bool = True,
+        priority: str = "normal",
+    ) -> ProcessingStats:
+        """Stream URLs through every pipeline stage.
+
+        Args:
+            urls: URLs to archive (any iterable or async iterable)
+            enable_intelligence: Enable intelligence analysis
+            priority: Download priority class ("high", "normal" or "low")
+
+        Returns:
+            Processing statistics for the run
+        """
+        self.enable_intelligence = enable_intelligence
+        self.priority = priority
+        self.stats = ProcessingStats()
+        self.queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+
+        handlers: dict[str, Callable[[Any], Awaitable[None]]] = {
+            "discovery": self._discover,
+            "ingestion": self._ingest,
+            "transformation": self._transform,
+            "intelligence": self._analyze,
+            "indexing": self._index,
+        }
+
+        for stage in STAGES:
+            for i in range(max(1, self.worker_counts[stage])):
+                self.workers.append(
+                    asyncio.create_task(self._worker(stage, i, handlers[stage]))
+                )
+
+        try:
+            # Feed URLs; put() blocks while the discovery queue is full
+            if hasattr(urls, "__aiter__"):
+                async for url in urls:
+                    await self.queues["discovery"].put(url)
+            else:
+                for url in urls:
+                    await self.queues["discovery"].put(url)
+
+            # Drain stages in order: once a stage is idle, nothing upstream can refill it
+            for stage in STAGES:
+                await self.queues[stage].join()
+
+        finally:
+            await self.stop()
+            self.stats.end_time = datetime.utcnow()
+
+        logger.info(
+            f"Pipeline complete: {self.stats.indexed}/{self.stats.total_snapshots} snapshots "
+            f"indexed, {self.stats.failed} failed, {self.stats.skipped} skipped, "
+            f"{self.stats.digest_mismatches} digest mismatches"
+        )
+        return self.stats
+
+    async def stop(self) -> None:
+        """Cancel all stage workers."""
+        for worker in self.workers:
+            worker.cancel()
+
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def _worker(
+        self, stage: str, worker_id: int, handler: Callable[[Any], Awaitable[None]]
+    ) -> None:
+        """Consume items from a stage queue.
+
+        Args:
+            stage: Stage name
+            worker_id: Worker identifier within the stage
+            handler: Coroutine processing one item
+        """
+        queue = self.queues[stage]
+
+        while True:
+            item = await queue.get()
+            try:
+                await handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(f"{stage} worker {worker_id} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _discover(self, url: str) -> None:
+        """Discovery stage: find snapshots and hand them to ingestion."""
+        dedup = self.archiver.dedup
+        batch: list[ArchiveSnapshot] = []
+
+        # Snapshots are handed downstream while later CDX pages are still loading
+        async for snapshot in self.archiver.discovery.iter_snapshots(url):
+            self.stats.total_snapshots += 1
+            self.stats.discovered += 1
+            batch.append(snapshot)
+
+            if len(batch) >= dedup.batch_size:
+                await self._enqueue_new(batch)
+                batch = []
+
+        await self._enqueue_new(batch)
+
+    async def _enqueue_new(self, snapshots: list[ArchiveSnapshot]) -> None:
+        """Drop already archived snapshots and queue the rest for ingestion.
+
+        Args:
+            snapshots: Batch of discovered snapshots
+        """
+        fresh = await self.archiver.dedup.filter(snapshots)
+        self.stats.skipped += len(snapshots) - len(fresh)
+
+        for snapshot in fresh:
+            await self.queues["ingestion"].put(snapshot)
+
+    async def _ingest(self, snapshot: ArchiveSnapshot) -> None:
+        """Ingestion stage: download content and optional Tika extraction."""
+        content = await self.archiver.scheduler.download(snapshot, self.priority)
+
+        if not content:
+            self._count_dropped(snapshot)
+            return
+
+        self.stats.downloaded += 1
+        if content.digest_valid is False:
+            self.stats.digest_mismatches += 1
+
+        # Optional: Tika extraction for non-HTML content
+        tika = self.archiver.tika
+        if tika.enabled and snapshot.mime_type != "text/html":
+            tika_result = await tika.extract_from_downloaded(content)
+            if tika_result.get("text"):
+                content.content = tika_result["text"].encode("utf-8")
+                content.release()
+
+        await self.queues["transformation"].put(content)
+
+    async def _transform(self, content: DownloadedContent) -> None:
+        """Transformation stage: rewrite and extract content."""
+        try:
+            transformed = await self.archiver.transformation.transform(content)
+        finally:
+            # Spooled downloads are not needed once parsed
+            content.release()
+
+        if not transformed:
+            self._count_dropped(content.snapshot)
+            return
+
+        self.stats.transformed += 1
+        next_stage = "intelligence" if self.enable_intelligence else "indexing"
+        await self.queues[next_stage].put(transformed)
+
+    async def _analyze(self, transformed: TransformedContent) -> None:
+        """Intelligence stage: analyze and index in the search engine."""
+        try:
+            analysis = await self.archiver.intelligence.analyze(transformed)
+            await self.archiver.search.index_content(analysis)
+            self.stats.analyzed += 1
+
+            # Typed database columns for the indexing stage
+            if analysis.languages:
+                transformed.metadata["language"] = analysis.languages[0][0]
+            transformed.metadata["word_count"] = analysis.word_count
+            transformed.metadata["has_videos"] = analysis.has_videos
+        except Exception as e:
+            # Analysis is optional; the page is still archived
+            logger.error(f"Intelligence analysis failed for {transformed.snapshot.url}: {e}")
+
+        await self.queues["indexing"].put(transformed)
+
+    async def _index(self, transformed: TransformedContent) -> None:
+        """Indexing stage: store content and metadata."""
+        indexed = await self.archiver.indexer.index(transformed)
+
+        if indexed:
+            self.stats.indexed += 1
+            self.archiver.dedup.add(transformed.snapshot)
+        else:
+            self._count_dropped(transformed.snapshot)
+
+    def _count_dropped(self, snapshot: ArchiveSnapshot) -> None:
+        """Record a snapshot that left the pipeline early.
+
+        Args:
+            snapshot: Snapshot that was skipped or failed
+        """
+        if snapshot.status == ArchiveStatus.SKIPPED:
+            self.stats.skipped += 1
+        else:
+            self.stats.failed += 1
@@ -0,0 +1,148 @@
+"""Rate limiting - Adaptive AIMD limiter for upstream requests."""
+
+import asyncio
+import email.utils
+import logging
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+# Minimum seconds between two multiplicative decreases
+DECREASE_COOLDOWN = 1.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header.
+
+    Args:
+        value: Header value (delta-seconds or HTTP-date)
+
+    Returns:
+        Seconds to wait, or None if absent/invalid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveRateLimiter:
+    """Additive-increase / multiplicative-decrease request pacer.
+
+    The request rate grows by ``rate_increase`` requests per second for every
+    second of healthy responses and is cut by ``rate_decrease_factor`` on
+    429/503 answers, server errors, timeouts or latency well above the running
+    baseline. ``Retry-After`` pauses every caller until the given time.
+
+    Use as ``async with limiter:`` around a request, then report the outcome
+    with :meth:`record_success` or :meth:`record_failure`.
+    """
+
+    def __init__(self, config: Optional[dict] = None) -> None:
+        """Initialize rate limiter.
+
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config or {}
+        processing_config = self.config.get("processing", {})
+
+        self.min_rate = processing_config.get("min_requests_per_second", 0.5)
+        self.max_rate = processing_config.get("max_requests_per_second", 50.0)
+        self.rate_increase = processing_config.get("rate_increase", 1.0)
+        self.decrease_factor = processing_config.get("rate_decrease_factor", 0.5)
+        self.latency_threshold = processing_config.get("latency_threshold", 3.0)
+
+        # requests_per_second is now the starting rate rather than a fixed cap
+        rate = processing_config.get("requests_per_second", 5)
+        self.rate = float(min(max(rate, self.min_rate), self.max_rate))
+
+        self.latency_baseline: Optional[float] = None
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until the next request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = max(self._next_slot, self._blocked_until) - now
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            self._next_slot = now + 1.0 / self.rate
+
+    async def __aenter__(self) -> "AdaptiveRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    def record_success(self, latency: float) -> None:
+        """Report a healthy response.
+
+        Args:
+            latency: Seconds until the response headers arrived
+        """
+        if self.latency_baseline is None:
+            self.latency_baseline = latency
+        elif latency > self.latency_baseline * self.latency_threshold:
+            self._decrease(f"latency {latency:.2f}s over baseline {self.latency_baseline:.2f}s")
+            return
+        else:
+            # Slow-moving average so a single spike does not shift the baseline
+            self.latency_baseline = 0.9 * self.latency_baseline + 0.1 * latency
+
+        # Additive increase: about ``rate_increase`` rps per second of success
+        self.rate = min(self.max_rate, self.rate + self.rate_increase / self.rate)
+
+    def record_failure(
+        self, status: Optional[int] = None, retry_after: Optional[str] = None
+    ) -> None:
+        """Report a failed request.
+
+        Args:
+            status: HTTP status, or None for timeouts/connection errors
+            retry_after: Retry-After header value, if any
+        """
+        if status is not None and status < 500 and status not in THROTTLE_STATUSES:
+            # Client errors say nothing about upstream load
+            return
+
+        delay = parse_retry_after(retry_after)
+        if delay:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            logger.warning(f"Upstream asked to retry after {delay:.0f}s, pausing requests")
+
+        self._decrease(f"status {status}" if status else "request error")
+
+    def _decrease(self, reason: str) -> None:
+        """Cut the rate multiplicatively, at most once per cooldown.
+
+        Args:
+            reason: Why the rate is being reduced (for logging)
+        """
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        logger.info(f"Reducing request rate to {self.rate:.2f}/s ({reason})")
@@ -0,0 +1,231 @@
+"""Resilience - Circuit breakers, retry budget and jittered retries for upstream calls."""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying; every other 4xx fails immediately
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the endpoint's circuit is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classify an error as transient (worth retrying) or permanent.
+
+    Args:
+        error: Exception raised by an upstream call
+
+    Returns:
+        True for timeouts, connection errors and 408/425/429/5xx responses
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES or error.status >= 500
+    return isinstance(
+        error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+    )
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one upstream endpoint.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls fail immediately with :class:`CircuitOpenError`. After
+    ``recovery_timeout`` seconds one probe call is let through (half-open);
+    its outcome closes or re-opens the circuit. A probe that never reports
+    back (e.g. cancelled) is replaced after another ``recovery_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0
+    ) -> None:
+        """Initialize circuit breaker.
+
+        Args:
+            name: Endpoint name (for logging)
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to wait before probing an open circuit
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def before_call(self) -> None:
+        """Check that a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is already running
+        """
+        if self.state == self.CLOSED:
+            return
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError(f"Circuit for {self.name} is open")
+            self.state = self.HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, probing")
+
+        now = time.monotonic()
+        if self._probe_in_flight and now - self._probe_started < self.recovery_timeout:
+            raise CircuitOpenError(f"Circuit for {self.name} is half-open, probe in progress")
+        self._probe_in_flight = True
+        self._probe_started = now
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy upstream."""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a transient failure of the upstream."""
+        self.failures += 1
+        self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self.failures} failures"
+                )
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """Caps retries at a fraction of requests.
+
+    Every request deposits ``ratio`` tokens and every retry spends one, so
+    retries stay below ``ratio`` of traffic plus a small ``reserve`` that
+    lets low-volume jobs retry at all. During an outage the budget runs dry
+    and failures surface instead of multiplying load.
+    """
+
+    def __init__(self, ratio: float = 0.1, reserve: int = 10) -> None:
+        """Initialize retry budget.
+
+        Args:
+            ratio: Retries allowed per request
+            reserve: Maximum banked retries
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self.tokens = float(reserve)
+
+    def record_request(self) -> None:
+        """Deposit tokens for a request attempt."""
+        self.tokens = min(float(self.reserve), self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget.
+
+        Returns:
+            True if a retry is allowed
+        """
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RetryPolicy:
+    """Shared retry policy and per-endpoint circuit breakers.
+
+    ``call`` retries transient errors with decorrelated-jitter backoff while
+    the retry budget allows; permanent errors (404, 403, open circuit) are
+    raised at once. HTTP call sites report outcomes to :meth:`breaker`.
+    """
+
+    def __init__(self, config: Optional[dict] = None) -> None:
+        """Initialize retry policy.
+
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config or {}
+        processing_config = self.config.get("processing", {})
+
+        self.max_attempts = max(1, processing_config.get("retry_attempts", 3))
+        self.base_delay = processing_config.get("retry_delay", 5)
+        self.max_delay = processing_config.get("retry_max_delay", 60)
+        self.backoff = processing_config.get("retry_backoff", 2)
+        self.failure_threshold = processing_config.get("circuit_failure_threshold", 5)
+        self.recovery_timeout = processing_config.get("circuit_recovery_timeout", 30)
+
+        self.budget = RetryBudget(
+            processing_config.get("retry_budget_ratio", 0.1),
+            processing_config.get("retry_budget_reserve", 10),
+        )
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get the circuit breaker for an endpoint, creating it on first use.
+
+        Args:
+            endpoint: Endpoint name (e.g. "wayback", "cdx")
+
+        Returns:
+            Circuit breaker shared by every caller of the endpoint
+        """
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(
+                endpoint, self.failure_threshold, self.recovery_timeout
+            )
+        return self.breakers[endpoint]
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Call ``func``, retrying transient failures.
+
+        Args:
+            func: Coroutine function performing one attempt
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            Exception: The last error, once it is permanent, attempts are
+                exhausted or the retry budget is spent
+        """
+        delay = self.base_delay
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self.budget.record_request()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_attempts:
+                    raise
+                if not self.budget.try_spend():
+                    logger.warning(f"Retry budget exhausted, not retrying: {e}")
+                    raise
+
+                # Decorrelated jitter: spreads retries so tasks do not move in lockstep
+                delay = min(self.max_delay, random.uniform(self.base_delay, delay * self.backoff))
+                logger.debug(f"Attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
@@ -0,0 +1,145 @@
+"""Download scheduler - Priority classes and per-host fairness for ingestion."""
+
+import asyncio
+import logging
+from collections import Counter, OrderedDict, deque
+from typing import Optional
+from urllib.parse import urlparse
+
+from chronos_archiver.ingestion import ContentIngestion
+from chronos_archiver.models import ArchiveSnapshot, DownloadedContent
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, highest first. Classes only order downloads that share one
+# scheduler, i.e. one process: API jobs can outrank each other, but a separate
+# CLI run has its own scheduler and does not yield to them.
+PRIORITIES = ("high", "normal", "low")
+
+
+class DownloadScheduler:
+    """Admission control in front of ``ContentIngestion``.
+
+    Callers wait for a slot before downloading. A free slot goes to the
+    highest priority class with waiting work. Within a class, slots rotate
+    round-robin across original hosts. A host already at
+    ``max_requests_per_host`` outstanding downloads is passed over, so one
+    large domain cannot take every slot.
+    """
+
+    def __init__(self, ingestion: ContentIngestion, config: Optional[dict] = None) -> None:
+        """Initialize download scheduler.
+
+        Args:
+            ingestion: ContentIngestion performing the downloads
+            config: Configuration dictionary
+        """
+        self.ingestion = ingestion
+        self.config = config or {}
+        processing_config = self.config.get("processing", {})
+
+        self.max_concurrent = processing_config.get("concurrent_requests", 10)
+        self.max_per_host = processing_config.get("max_requests_per_host", 4)
+
+        # priority -> host -> waiting futures; host order is the round-robin order
+        self._waiting: dict[str, OrderedDict[str, deque[asyncio.Future]]] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        self._active = 0
+        self._active_per_host: Counter[str] = Counter()
+
+    async def download(
+        self, snapshot: ArchiveSnapshot, priority: str = "normal"
+    ) -> Optional[DownloadedContent]:
+        """Download a snapshot once the scheduler grants it a slot.
+
+        Args:
+            snapshot: Snapshot to download
+            priority: Priority class ("high", "normal" or "low")
+
+        Returns:
+            Downloaded content or None if failed
+        """
+        if priority not in self._waiting:
+            raise ValueError(f"Invalid priority {priority!r}, expected one of {PRIORITIES}")
+
+        host = urlparse(snapshot.original_url).hostname or ""
+        granted = asyncio.get_running_loop().create_future()
+        self._waiting[priority].setdefault(host, deque()).append(granted)
+        self._dispatch()
+
+        try:
+            await granted
+        except asyncio.CancelledError:
+            # Granted just before cancellation: give the slot back
+            if granted.done() and not granted.cancelled():
+                self._release(host)
+            raise
+
+        try:
+            return await self.ingestion.download(snapshot)
+        finally:
+            self._release(host)
+
+    @property
+    def pending(self) -> int:
+        """Number of downloads waiting for a slot."""
+        return sum(
+            sum(1 for f in queue if not f.done())
+            for hosts in self._waiting.values()
+            for queue in hosts.values()
+        )
+
+    def _release(self, host: str) -> None:
+        """Free a slot and hand it to the next waiter.
+
+        Args:
+            host: Original host of the finished download
+        """
+        self._active -= 1
+        self._active_per_host[host] -= 1
+        if self._active_per_host[host] <= 0:
+            del self._active_per_host[host]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting downloads."""
+        while self._active < self.max_concurrent:
+            grant = self._next_waiter()
+            if grant is None:
+                return
+
+            host, future = grant
+            self._active += 1
+            self._active_per_host[host] += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional[tuple[str, asyncio.Future]]:
+        """Pick the next waiter by priority, then round-robin over hosts.
+
+        Returns:
+            (host, future) to grant, or None if nothing is eligible
+        """
+        for priority in PRIORITIES:
+            hosts = self._waiting[priority]
+
+            for _ in range(len(hosts)):
+                host, queue = next(iter(hosts.items()))
+                hosts.move_to_end(host)
+
+                # Drop waiters that were cancelled while queued
+                while queue and queue[0].done():
+                    queue.popleft()
+                if not queue:
+                    del hosts[host]
+                    continue
+
+                if self._active_per_host[host] >= self.max_per_host:
+                    continue
+
+                future = queue.popleft()
+                if not queue:
+                    del hosts[host]
+                return host, future
+
+        return None
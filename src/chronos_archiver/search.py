@@ -170,6 +170,7 @@ class SearchEngine:
         filters: Optional[dict[str, Any]] = None,
         limit: int = 20,
         offset: int = 0,
+        raise_errors: bool = False,
     ) -> list[SearchResult]:
         """Search indexed content.
         
@@ -178,6 +179,8 @@ class SearchEngine:
             filters: Optional filters (e.g., {"topics": "religião"})
             limit: Maximum results
             offset: Result offset for pagination
+            raise_errors: Re-raise Meilisearch errors instead of returning
+                no results, so callers can fall back to another index
             
         Returns:
             List of search results
@@ -231,6 +234,8 @@ class SearchEngine:
             
         except Exception as e:
             logger.error(f"Search failed: {e}")
+            if raise_errors:
+                raise
             return []
 
     def _generate_snippet(self, text: str, query: str, max_length: int = 200) -> str:
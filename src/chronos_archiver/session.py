@@ -0,0 +1,72 @@
+"""HTTP session management - Shared, pooled aiohttp session."""
+
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSession:
+    """Lazily created, long-lived aiohttp session with a tuned connection pool.
+
+    One instance is owned by ``ChronosArchiver`` and shared by discovery and
+    ingestion so that connections to web.archive.org are reused instead of
+    paying a TCP+TLS handshake per request.
+    """
+
+    def __init__(self, config: Optional[dict] = None) -> None:
+        """Initialize shared session holder.
+
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config or {}
+        processing_config = self.config.get("processing", {})
+        archive_config = self.config.get("archive", {})
+        ingestion_config = self.config.get("ingestion", {})
+
+        self.user_agent = archive_config.get("user_agent", "ChronosArchiver/1.0")
+        self.verify_ssl = ingestion_config.get("verify_ssl", True)
+
+        self.pool_size = processing_config.get("connection_pool_size", 100)
+        self.connections_per_host = processing_config.get("connections_per_host", 10)
+        self.keepalive_timeout = processing_config.get("keepalive_timeout", 30)
+        self.dns_cache_ttl = processing_config.get("dns_cache_ttl", 300)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def get(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use.
+
+        Must be called from a running event loop.
+
+        Returns:
+            Shared aiohttp ClientSession
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                ssl=self.verify_ssl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers={"User-Agent": self.user_agent}
+            )
+            logger.debug(
+                f"Created HTTP session (pool={self.pool_size}, "
+                f"per_host={self.connections_per_host})"
+            )
+
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and its connection pool."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.debug("Closed HTTP session")
+
+        self._session = None
@@ -0,0 +1,441 @@
+"""Content storage backends for the indexer."""
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional, Union
+
+from chronos_archiver.compression import GzipCodec, ZstdCodec, create_codec, decompress
+from chronos_archiver.models import TransformedContent
+from chronos_archiver.utils import (
+    ensure_directory,
+    extract_domain,
+    format_timestamp,
+    sanitize_filename,
+)
+from chronos_archiver.warc import WARCWriter, read_record
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ("files", "warc", "blobs", "packs")
+
+Codec = Optional[Union[GzipCodec, ZstdCodec]]
+
+
+class StoredLocation(NamedTuple):
+    """Where and how a page was stored."""
+
+    file_path: str  # Relative to the output directory
+    record_offset: Optional[int] = None  # WARC record offset, None for whole files
+    record_length: Optional[int] = None
+    compression: Optional[str] = None  # Codec label, None if stored uncompressed
+
+
+class FileStorage:
+    """One file per page under ``content/YYYY/MM/DD/``."""
+
+    content_addressed = False
+
+    def __init__(self, output_dir: Path, codec: Codec = None) -> None:
+        """Initialize file storage.
+
+        Args:
+            output_dir: Archive output directory
+            codec: Compression codec, None to store plain files
+        """
+        self.output_dir = output_dir
+        self.codec = codec
+        ensure_directory(self.output_dir / "content")
+
+    def write(self, transformed: TransformedContent, content: bytes) -> StoredLocation:
+        """Write one page.
+
+        Args:
+            transformed: Transformed content being stored
+            content: Encoded page content
+
+        Returns:
+            Stored location
+        """
+        # Create directory structure: content/YYYY/MM/DD/
+        timestamp_dt = format_timestamp(transformed.snapshot.timestamp)
+        date_dir = self.output_dir / "content" / timestamp_dt.strftime("%Y/%m/%d")
+        ensure_directory(date_dir)
+
+        # Generate filename from URL and timestamp
+        url_part = transformed.snapshot.original_url.split("://")[-1].replace("/", "_")
+        filename = sanitize_filename(f"{transformed.snapshot.timestamp}_{url_part}.html")
+
+        compression = None
+        if self.codec:
+            filename += self.codec.suffix
+            content, compression = self.codec.compress(
+                content, extract_domain(transformed.snapshot.original_url)
+            )
+
+        file_path = date_dir / filename
+        file_path.write_bytes(content)
+
+        return StoredLocation(str(file_path.relative_to(self.output_dir)), compression=compression)
+
+    def sync(self) -> None:
+        """Nothing buffered; each page is its own file."""
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class WARCStorage:
+    """Pages appended as ``resource`` records to rolling WARC files under ``warcs/``."""
+
+    content_addressed = False
+
+    def __init__(
+        self,
+        output_dir: Path,
+        max_size: int = 1024 * 1024 * 1024,
+        prefix: str = "chronos",
+        compress: bool = True,
+        compression_level: int = 6,
+    ) -> None:
+        """Initialize WARC storage.
+
+        Args:
+            output_dir: Archive output directory
+            max_size: Size at which a new WARC file is started, in bytes
+            prefix: WARC file name prefix
+            compress: Write gzip WARCs
+            compression_level: Gzip level
+        """
+        self.output_dir = output_dir
+        self.writer = WARCWriter(
+            output_dir / "warcs",
+            prefix=prefix,
+            max_size=max_size,
+            compress=compress,
+            compression_level=compression_level,
+        )
+
+    def write(self, transformed: TransformedContent, content: bytes) -> StoredLocation:
+        """Append one page as a WARC record.
+
+        Args:
+            transformed: Transformed content being stored
+            content: Encoded page content
+
+        Returns:
+            Stored location
+        """
+        snapshot = transformed.snapshot
+        path, offset, length = self.writer.write_resource(
+            snapshot.original_url,
+            content,
+            "text/html; charset=utf-8",
+            format_timestamp(snapshot.timestamp),
+            {"WARC-Source-URI": snapshot.url},
+        )
+        return StoredLocation(str(path.relative_to(self.output_dir)), offset, length)
+
+    def sync(self) -> None:
+        """Flush written records to disk."""
+        self.writer.sync()
+
+    def close(self) -> None:
+        """Close the open WARC file."""
+        self.writer.close()
+
+
+class BlobStorage:
+    """Content-addressed blobs under ``blobs/ab/cd/<sha256>.html[.gz]``.
+
+    Identical pages (e.g. a homepage unchanged across hundreds of captures)
+    are stored once. The indexer keeps a reference count per blob so
+    ``ContentIndexer.gc`` can delete blobs no page points at.
+    """
+
+    content_addressed = True
+
+    def __init__(self, output_dir: Path, codec: Codec = None) -> None:
+        """Initialize blob storage.
+
+        Args:
+            output_dir: Archive output directory
+            codec: Compression codec, None to store plain blobs
+        """
+        self.output_dir = output_dir
+        self.codec = codec
+        ensure_directory(self.output_dir / "blobs")
+
+    def write(self, transformed: TransformedContent, content: bytes) -> StoredLocation:
+        """Store a page unless an identical blob already exists.
+
+        Args:
+            transformed: Transformed content being stored
+            content: Encoded page content
+
+        Returns:
+            Stored location of the (possibly shared) blob
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        suffix = ".html" + (self.codec.suffix if self.codec else "")
+        relative = Path("blobs") / digest[:2] / digest[2:4] / f"{digest}{suffix}"
+        path = self.output_dir / relative
+
+        try:
+            # Refresh mtime so a concurrent gc treats the blob as recently used
+            os.utime(path)
+            compression = self.codec.label(path) if self.codec else None
+        except FileNotFoundError:
+            pass  # New, or just moved aside by gc: write a fresh copy
+        else:
+            logger.debug(f"Blob {digest[:12]} already stored")
+            return StoredLocation(str(relative), compression=compression)
+
+        ensure_directory(path.parent)
+        data, compression = content, None
+        if self.codec:
+            data, compression = self.codec.compress(
+                content, extract_domain(transformed.snapshot.original_url)
+            )
+
+        # Write-then-rename so readers never see a partial blob
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        return StoredLocation(str(relative), compression=compression)
+
+    def sync(self) -> None:
+        """Nothing buffered; each blob is its own file."""
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class PackStorage:
+    """Pages appended to fixed-size segment files under ``packs/``.
+
+    Each page is compressed on its own and appended to the open segment;
+    the database row holds its offset and length, so there is one file per
+    ``segment_size`` bytes instead of one per capture. Appends are only
+    flushed to disk by :meth:`sync`, which the indexer calls once per
+    database batch before committing it.
+    """
+
+    content_addressed = False
+
+    def __init__(
+        self, output_dir: Path, codec: Codec = None, segment_size: int = 256 * 1024 * 1024
+    ) -> None:
+        """Initialize pack storage.
+
+        Args:
+            output_dir: Archive output directory
+            codec: Compression codec, None to store plain pages
+            segment_size: Size at which a new segment is started, in bytes
+        """
+        self.output_dir = output_dir
+        self.codec = codec
+        self.segment_size = segment_size
+        self.pack_dir = output_dir / "packs"
+        ensure_directory(self.pack_dir)
+
+        self._file: Optional[BinaryIO] = None
+        self._path: Optional[Path] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def write(self, transformed: TransformedContent, content: bytes) -> StoredLocation:
+        """Append one page to the open segment.
+
+        Args:
+            transformed: Transformed content being stored
+            content: Encoded page content
+
+        Returns:
+            Stored location
+        """
+        return self.append(content, extract_domain(transformed.snapshot.original_url))
+
+    def append(self, content: bytes, domain: str) -> StoredLocation:
+        """Compress and append page bytes.
+
+        Args:
+            content: Page bytes
+            domain: Site the page belongs to (selects the zstd dictionary)
+
+        Returns:
+            Stored location
+        """
+        compression = None
+        if self.codec:
+            content, compression = self.codec.compress(content, domain)
+
+        with self._lock:
+            file, path = self._file, self._path
+            if file is None or path is None or (
+                file.tell() > 0 and file.tell() + len(content) > self.segment_size
+            ):
+                file, path = self._roll()
+
+            offset = file.tell()
+            file.write(content)
+            self._dirty = True
+            return StoredLocation(
+                str(path.relative_to(self.output_dir)), offset, len(content), compression
+            )
+
+    def sync(self) -> None:
+        """Flush and fsync appended pages."""
+        with self._lock:
+            if self._file and self._dirty:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def close(self) -> None:
+        """Sync and close the open segment."""
+        self.sync()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _roll(self) -> tuple[BinaryIO, Path]:
+        """Sync and close the open segment and create the next one.
+
+        Returns:
+            (new segment file, its path)
+        """
+        if self._file:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+        serial = max(
+            (int(p.stem.split("-")[-1]) for p in self.pack_dir.glob("segment-*.pack")), default=0
+        )
+        while True:
+            serial += 1
+            path = self.pack_dir / f"segment-{serial:08d}.pack"
+            try:
+                # Exclusive create: another process may be writing packs too
+                file = open(path, "xb")
+                break
+            except FileExistsError:
+                continue
+
+        self._file, self._path = file, path
+        self._dirty = False
+        logger.info(f"Started pack segment {path.name}")
+        return file, path
+
+
+class _PackReader:
+    """Cached read-only memory maps of pack segments."""
+
+    def __init__(self, max_open: int = 64) -> None:
+        self.max_open = max_open
+        self._maps: OrderedDict[Path, mmap.mmap] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, path: Path, offset: int, length: int) -> bytes:
+        """Read a byte range from a segment.
+
+        Args:
+            path: Segment file
+            offset: Start offset
+            length: Number of bytes
+
+        Returns:
+            The bytes
+        """
+        with self._lock:
+            mapped = self._maps.get(path)
+            if mapped is None or offset + length > len(mapped):
+                # Unmapped, or the open segment has grown since it was mapped
+                if mapped is not None:
+                    mapped.close()
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[path] = mapped
+                while len(self._maps) > self.max_open:
+                    self._maps.popitem(last=False)[1].close()
+
+            self._maps.move_to_end(path)
+            return mapped[offset : offset + length]
+
+
+_pack_reader = _PackReader()
+
+
+def create_storage(
+    config: dict, output_dir: Path
+) -> "FileStorage | WARCStorage | BlobStorage | PackStorage":
+    """Create the storage backend selected by ``indexing.storage_backend``.
+
+    Args:
+        config: Configuration dictionary
+        output_dir: Archive output directory
+
+    Returns:
+        Storage backend
+    """
+    indexing_config = config.get("indexing", {})
+    backend = indexing_config.get("storage_backend", "files")
+
+    if backend == "files":
+        return FileStorage(output_dir, create_codec(config, output_dir))
+    if backend == "blobs":
+        return BlobStorage(output_dir, create_codec(config, output_dir))
+    if backend == "packs":
+        return PackStorage(
+            output_dir,
+            create_codec(config, output_dir),
+            indexing_config.get("pack_segment_size", 256 * 1024 * 1024),
+        )
+    if backend == "warc":
+        # WARC records are always gzip members, the format readers expect
+        return WARCStorage(
+            output_dir,
+            max_size=indexing_config.get("warc_max_size", 1024 * 1024 * 1024),
+            prefix=indexing_config.get("warc_prefix", "chronos"),
+            compress=indexing_config.get("compress_content", True),
+            compression_level=indexing_config.get("compression_level", 6),
+        )
+    raise ValueError(f"Invalid storage_backend {backend!r}, expected one of {STORAGE_BACKENDS}")
+
+
+def read_stored(output_dir: Path, location: StoredLocation) -> bytes:
+    """Read stored page content from any backend.
+
+    Args:
+        output_dir: Archive output directory
+        location: Stored location
+
+    Returns:
+        Page content bytes
+    """
+    path = output_dir / location.file_path
+    dict_dir = output_dir / "dictionaries"
+
+    if path.suffix == ".pack":
+        if location.record_offset is None or location.record_length is None:
+            raise ValueError(f"Pack location without offset/length: {location.file_path}")
+        data = _pack_reader.read(path, location.record_offset, location.record_length)
+        return decompress(data, location.compression, dict_dir)
+
+    if location.record_offset is not None and location.record_length is not None:
+        _, block = read_record(path, location.record_offset, location.record_length)
+        return block
+
+    compression = location.compression
+    if compression is None:
+        # Rows written before the compression column existed
+        compression = {".gz": "gzip", ".zst": "zstd"}.get(path.suffix)
+    return decompress(path.read_bytes(), compression, dict_dir)
@@ -1,13 +1,15 @@
 """Apache Tika integration for advanced text and metadata extraction."""
 
+import asyncio
 import logging
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 import requests
 from tika import parser as tika_parser
 from tika import detector as tika_detector
 
 from chronos_archiver.models import DownloadedContent
+from chronos_archiver.ratelimit import AdaptiveRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -22,14 +24,20 @@ class TikaExtractor:
     - MIME type detection
     """
 
-    def __init__(self, config: Optional[dict] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[dict] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+    ) -> None:
         """Initialize Tika extractor.
         
         Args:
             config: Configuration dictionary
+            rate_limiter: Shared rate limiter (a private one is created if omitted)
         """
         self.config = config or {}
         tika_config = self.config.get("tika", {})
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(self.config)
         
         self.enabled = tika_config.get("enabled", True)
         self.tika_server_url = tika_config.get("server_url", "http://localhost:9998")
@@ -60,9 +68,36 @@ class TikaExtractor:
         if not self.enabled:
             return {"text": "", "metadata": {}}
         
+        return self._extract(lambda: tika_parser.from_buffer(content))
+
+    def extract_file(self, path: str) -> dict[str, Any]:
+        """Extract text and metadata from a file on disk using Tika.
+
+        The file is streamed to the Tika server instead of being loaded into memory.
+
+        Args:
+            path: Path to the content file
+
+        Returns:
+            Dictionary with extracted text and metadata
+        """
+        if not self.enabled:
+            return {"text": "", "metadata": {}}
+
+        return self._extract(lambda: tika_parser.from_file(path))
+
+    def _extract(self, parse: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        """Run a Tika parse and normalize its result.
+
+        Args:
+            parse: Callable performing the Tika request
+
+        Returns:
+            Dictionary with extracted text and metadata
+        """
         try:
             # Parse with Tika
-            parsed = tika_parser.from_buffer(content)
+            parsed = parse()
             
             text = parsed.get("content", "").strip() if parsed.get("content") else ""
             metadata = parsed.get("metadata", {})
@@ -121,7 +156,13 @@ class TikaExtractor:
         Returns:
             Extraction results
         """
-        return self.extract_text(
-            downloaded.content,
-            mime_type=downloaded.snapshot.mime_type,
-        )
\ No newline at end of file
+        # Tika parsing is blocking; run it off the event loop at the shared pace
+        async with self.rate_limiter:
+            if downloaded.content_path:
+                return await asyncio.to_thread(self.extract_file, downloaded.content_path)
+
+            return await asyncio.to_thread(
+                self.extract_text,
+                downloaded.content,
+                mime_type=downloaded.snapshot.mime_type,
+            )
@@ -1,5 +1,6 @@
 """Transformation module - Stage 3: Transform and enrich content."""
 
+import asyncio
 import logging
 import re
 from typing import Optional
@@ -8,10 +9,29 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 
 from chronos_archiver.models import ArchiveStatus, DownloadedContent, TransformedContent
-from chronos_archiver.utils import build_wayback_url, parse_wayback_url
+from chronos_archiver.utils import build_wayback_url
 
 logger = logging.getLogger(__name__)
 
+# Markup the Wayback Machine injects into replayed (non-id_) pages
+WAYBACK_INJECTIONS = [
+    # Playback scripts and styles at the top of <head>
+    re.compile(
+        r"<script[^>]*(?:archive\.org/includes/analytics\.js|/_static/js/)[^>]*>"
+        r".*?<!-- End Wayback Rewrite JS Include -->",
+        re.DOTALL | re.IGNORECASE,
+    ),
+    re.compile(
+        r"<!-- BEGIN WAYBACK TOOLBAR INSERT -->.*?<!-- END WAYBACK TOOLBAR INSERT -->",
+        re.DOTALL,
+    ),
+    # Capture/playback timing comment appended after </html>
+    re.compile(r"<!--\s*FILE ARCHIVED ON .*?-->", re.DOTALL),
+]
+
+# Links rewritten by Wayback replay, absolute or relative to the archive root
+REPLAY_URL = re.compile(r"^(?:(?:https?:)?//web\.archive\.org)?/web/\d{1,14}(?:[a-z]{2}_)?/(.+)$")
+
 
 class ContentTransformation:
     """Transform content for local archiving."""
@@ -48,16 +68,29 @@ class ContentTransformation:
         downloaded.snapshot.status = ArchiveStatus.TRANSFORMING
         logger.info(f"Transforming: {downloaded.snapshot.url}")
 
+        # Parsing is CPU-bound; keep it off the event loop so downloads keep flowing
+        return await asyncio.to_thread(self._transform_sync, downloaded)
+
+    def _transform_sync(self, downloaded: DownloadedContent) -> Optional[TransformedContent]:
+        """Decode, parse and transform content (runs in a worker thread).
+
+        Args:
+            downloaded: Downloaded content
+
+        Returns:
+            Transformed content or None if failed
+        """
         try:
             # Decode content
             encoding = downloaded.encoding or "utf-8"
+            raw = downloaded.read_bytes()
             try:
-                html = downloaded.content.decode(encoding)
+                html = raw.decode(encoding)
             except UnicodeDecodeError:
                 # Fallback encodings
                 for fallback in ["utf-8", "latin-1", "cp1252"]:
                     try:
-                        html = downloaded.content.decode(fallback)
+                        html = raw.decode(fallback)
                         break
                     except UnicodeDecodeError:
                         continue
@@ -65,6 +98,10 @@ class ContentTransformation:
                     logger.error(f"Failed to decode content: {downloaded.snapshot.url}")
                     return None
 
+            # Replayed pages carry the Wayback toolbar; drop it before parsing
+            if not downloaded.raw_capture:
+                html = self._strip_wayback(html)
+
             # Parse HTML
             soup = BeautifulSoup(html, "lxml")
 
@@ -155,9 +192,10 @@ class ContentTransformation:
         if url.startswith(("#", "data:", "javascript:", "mailto:")):
             return None
 
-        # Skip already rewritten Wayback URLs
-        if "web.archive.org" in url:
-            return url
+        # Undo Wayback replay rewriting, then rewrite like any other link
+        replay = REPLAY_URL.match(url)
+        if replay:
+            url = replay.group(1)
 
         # Convert relative to absolute
         if not url.startswith(("http://", "https://")):
@@ -171,6 +209,19 @@ class ContentTransformation:
         else:
             return build_wayback_url(snapshot.timestamp, url)
 
+    def _strip_wayback(self, html: str) -> str:
+        """Remove markup injected by Wayback replay.
+
+        Args:
+            html: Replayed HTML
+
+        Returns:
+            HTML without the Wayback toolbar and playback scripts
+        """
+        for pattern in WAYBACK_INJECTIONS:
+            html = pattern.sub("", html)
+        return html
+
     def _rewrite_css_urls(self, css: str, snapshot) -> str:
         """Rewrite URLs in CSS.
 
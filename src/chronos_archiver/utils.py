@@ -1,5 +1,6 @@
 """Utility functions for ChronosArchiver."""
 
+import base64
 import hashlib
 import logging
 import re
@@ -8,6 +9,8 @@ from pathlib import Path
 from typing import Optional
 from urllib.parse import urljoin, urlparse
 
+import charset_normalizer
+
 
 def setup_logging(config: dict) -> logging.Logger:
     """Set up logging configuration.
@@ -76,18 +79,24 @@ def parse_wayback_url(url: str) -> Optional[dict]:
     return None
 
 
-def build_wayback_url(timestamp: str, original_url: str, modifier: str = "") -> str:
+def build_wayback_url(
+    timestamp: str,
+    original_url: str,
+    modifier: str = "",
+    base: str = "https://web.archive.org/web",
+) -> str:
     """Build a Wayback Machine URL.
 
     Args:
         timestamp: Timestamp in YYYYMMDDhhmmss format
         original_url: Original URL to archive
         modifier: Optional modifier (e.g., 'id_', 'if_')
+        base: Wayback Machine base URL
 
     Returns:
         Complete Wayback Machine URL
     """
-    base = "https://web.archive.org/web"
+    base = base.rstrip("/")
     return f"{base}/{timestamp}{modifier}/{original_url}"
 
 
@@ -123,6 +132,47 @@ def extract_domain(url: str) -> str:
     return parsed.netloc
 
 
+def surt_key(url: str) -> str:
+    """Build a SURT-style canonical key for a URL.
+
+    Args:
+        url: URL to canonicalize
+
+    Returns:
+        SURT key (reversed host, path and query)
+
+    Example:
+        >>> surt_key('http://www.dar.org.br/sobre/')
+        'br,org,dar)/sobre'
+    """
+    parsed = urlparse(url.strip().lower())
+    host = parsed.hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+
+    path = parsed.path.rstrip("/") or "/"
+    if not path.startswith("/"):
+        path = "/" + path
+
+    key = ",".join(reversed(host.split("."))) + ")" + path
+    if parsed.query:
+        key += "?" + parsed.query
+    return key
+
+
+def url_fingerprint(url: str) -> int:
+    """Hash a URL's SURT key to a compact 64-bit integer.
+
+    Args:
+        url: URL to fingerprint
+
+    Returns:
+        64-bit fingerprint, suitable for large visited sets
+    """
+    digest = hashlib.blake2b(surt_key(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
 def is_valid_url(url: str) -> bool:
     """Check if URL is valid.
 
@@ -154,6 +204,35 @@ def calculate_hash(content: bytes, algorithm: str = "sha256") -> str:
     return hasher.hexdigest()
 
 
+def cdx_digest(sha1_digest: bytes) -> str:
+    """Encode a raw SHA-1 digest the way CDX indexes store it.
+
+    Args:
+        sha1_digest: Raw 20-byte SHA-1 digest (``hashlib.sha1().digest()``)
+
+    Returns:
+        Base32 digest string, comparable to the CDX ``digest`` field
+
+    Example:
+        >>> cdx_digest(hashlib.sha1(b"").digest())
+        '3I42H3S6NNFQ2MSVX7XZKYAYSCX5QBYJ'
+    """
+    return base64.b32encode(sha1_digest).decode("ascii")
+
+
+def detect_encoding(sample: bytes) -> Optional[str]:
+    """Guess the character encoding of a body without a declared charset.
+
+    Args:
+        sample: First bytes of the body
+
+    Returns:
+        Python codec name, or None if the bytes do not look like text
+    """
+    match = charset_normalizer.from_bytes(sample).best()
+    return match.encoding if match else None
+
+
 def format_timestamp(timestamp: str) -> datetime:
     """Convert Wayback timestamp to datetime.
 
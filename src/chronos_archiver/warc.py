@@ -0,0 +1,344 @@
+"""WARC writing/reading and WACZ packaging."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional
+
+from chronos_archiver.utils import cdx_digest, ensure_directory, format_timestamp, surt_key
+
+logger = logging.getLogger(__name__)
+
+WARC_VERSION = "WARC/1.1"
+WACZ_VERSION = "1.1.1"
+
+
+def _warc_date(dt: datetime) -> str:
+    """Format a datetime as a WARC-Date (UTC, second precision)."""
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build_record(headers: dict[str, str], block: bytes) -> bytes:
+    """Serialize one WARC record.
+
+    Args:
+        headers: WARC named fields (Content-Length is added)
+        block: Record block
+
+    Returns:
+        Record bytes, including the trailing CRLF CRLF
+    """
+    lines = [WARC_VERSION]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append(f"Content-Length: {len(block)}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+    return head + block + b"\r\n\r\n"
+
+
+def parse_record(data: bytes) -> tuple[dict[str, str], bytes]:
+    """Parse one uncompressed WARC record.
+
+    Args:
+        data: Record bytes
+
+    Returns:
+        (headers, block)
+    """
+    head, _, rest = data.partition(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("utf-8").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+
+    length = int(headers.get("Content-Length", len(rest)))
+    return headers, rest[:length]
+
+
+def read_record(path: Path, offset: int, length: int) -> tuple[dict[str, str], bytes]:
+    """Read a single record by seeking straight to it.
+
+    Args:
+        path: WARC file
+        offset: Byte offset of the record (gzip member) in the file
+        length: Byte length of the record
+
+    Returns:
+        (headers, block)
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+
+    if path.name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return parse_record(data)
+
+
+class WARCWriter:
+    """Append-only writer for rolling WARC files.
+
+    Each record is written as its own gzip member, so any record can be read
+    with one seek and one read. A new file is started once the current one
+    would exceed ``max_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str = "chronos",
+        max_size: int = 1024 * 1024 * 1024,
+        compress: bool = True,
+        compression_level: int = 6,
+    ) -> None:
+        """Initialize WARC writer.
+
+        Args:
+            directory: Directory holding the WARC files
+            prefix: File name prefix
+            max_size: Target maximum size of one WARC file in bytes
+            compress: Write ``.warc.gz`` (per-record gzip) instead of ``.warc``
+            compression_level: Gzip level
+        """
+        self.directory = Path(directory)
+        ensure_directory(self.directory)
+        self.prefix = prefix
+        self.max_size = max_size
+        self.compress = compress
+        self.compression_level = compression_level
+
+        self._file: Optional[BinaryIO] = None
+        self._path: Optional[Path] = None
+        self._serial = 0
+        self._lock = threading.Lock()
+
+    def write_resource(
+        self,
+        target_uri: str,
+        content: bytes,
+        content_type: str,
+        date: datetime,
+        extra_headers: Optional[dict[str, str]] = None,
+    ) -> tuple[Path, int, int]:
+        """Append a ``resource`` record.
+
+        Args:
+            target_uri: Original URL of the content
+            content: Record payload
+            content_type: MIME type of the payload
+            date: Capture date
+            extra_headers: Additional WARC named fields
+
+        Returns:
+            (WARC file path, record offset, record length)
+        """
+        digest = f"sha1:{cdx_digest(hashlib.sha1(content).digest())}"
+        headers = {
+            "WARC-Type": "resource",
+            "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+            "WARC-Date": _warc_date(date),
+            "WARC-Target-URI": target_uri,
+            "WARC-Block-Digest": digest,
+            "WARC-Payload-Digest": digest,
+            "Content-Type": content_type,
+            **(extra_headers or {}),
+        }
+        return self._append(build_record(headers, content))
+
+    def sync(self) -> None:
+        """Fsync the current WARC file."""
+        with self._lock:
+            if self._file:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Sync and close the current WARC file."""
+        with self._lock:
+            if self._file:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def _append(self, record: bytes) -> tuple[Path, int, int]:
+        """Append a serialized record, rolling over to a new file if needed."""
+        data = gzip.compress(record, self.compression_level) if self.compress else record
+
+        with self._lock:
+            file, path = self._file, self._path
+            if file is None or path is None or (
+                file.tell() > 0 and file.tell() + len(data) > self.max_size
+            ):
+                file, path = self._roll()
+
+            offset = file.tell()
+            file.write(data)
+            file.flush()
+            return path, offset, len(data)
+
+    def _roll(self) -> tuple[BinaryIO, Path]:
+        """Sync and close the current file and start a new one with a warcinfo record.
+
+        Returns:
+            (new file, its path)
+        """
+        if self._file:
+            # Records already handed out may be committed by the next sync()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+        self._serial += 1
+        stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        suffix = ".warc.gz" if self.compress else ".warc"
+        path = self.directory / f"{self.prefix}-{stamp}-{self._serial:05d}{suffix}"
+        file = open(path, "ab")
+        self._file, self._path = file, path
+        logger.info(f"Started WARC file {path.name}")
+
+        info = b"software: ChronosArchiver\r\nformat: WARC File Format 1.1\r\n"
+        record = build_record(
+            {
+                "WARC-Type": "warcinfo",
+                "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+                "WARC-Date": _warc_date(datetime.utcnow()),
+                "WARC-Filename": path.name,
+                "Content-Type": "application/warc-fields",
+            },
+            info,
+        )
+        file.write(gzip.compress(record, self.compression_level) if self.compress else record)
+        return file, path
+
+
+def _sha256_file(path: Path) -> str:
+    """Hash a file in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def write_wacz(
+    output_path: Path,
+    warc_dir: Path,
+    entries: Iterable[dict[str, Any]],
+    title: str = "ChronosArchiver export",
+) -> Path:
+    """Package WARC files and their index into a WACZ bundle.
+
+    Index digests are computed from the payload stored in each record, so
+    they match what a replay tool reads from the bundled WARCs.
+
+    Args:
+        output_path: WACZ file to create
+        warc_dir: Directory the entry ``filename`` values are relative to
+        entries: Indexed records with ``url``, ``timestamp``, ``mime``,
+            ``status``, ``filename``, ``offset``, ``length`` and optional
+            ``title``
+        title: Collection title
+
+    Returns:
+        Path of the written WACZ file
+    """
+    output_path = Path(output_path)
+    cdx_lines = []
+    pages = [json.dumps({"format": "json-pages-1.0", "id": "pages", "title": "All Pages"})]
+    warc_files: set[str] = set()
+
+    for entry in entries:
+        warc_files.add(entry["filename"])
+        _, payload = read_record(
+            Path(warc_dir) / entry["filename"], entry["offset"], entry["length"]
+        )
+        cdx_lines.append(
+            f"{surt_key(entry['url'])} {entry['timestamp']} "
+            + json.dumps(
+                {
+                    "url": entry["url"],
+                    "mime": entry.get("mime") or "text/html",
+                    "status": str(entry.get("status") or 200),
+                    "digest": cdx_digest(hashlib.sha1(payload).digest()),
+                    "length": str(entry["length"]),
+                    "offset": str(entry["offset"]),
+                    "filename": Path(entry["filename"]).name,
+                }
+            )
+        )
+        pages.append(
+            json.dumps(
+                {
+                    "id": uuid.uuid4().hex,
+                    "url": entry["url"],
+                    "ts": format_timestamp(entry["timestamp"]).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "title": entry.get("title") or "",
+                }
+            )
+        )
+
+    cdx_lines.sort()
+    index_bytes = ("\n".join(cdx_lines) + "\n").encode("utf-8")
+    pages_bytes = ("\n".join(pages) + "\n").encode("utf-8")
+    resources = []
+
+    ensure_directory(output_path.parent)
+    # WARCs are already compressed; store everything so records stay seekable
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED) as wacz:
+        for name in sorted(warc_files):
+            path = Path(warc_dir) / name
+            arcname = f"archive/{path.name}"
+            wacz.write(path, arcname)
+            resources.append(
+                {
+                    "name": path.name,
+                    "path": arcname,
+                    "hash": f"sha256:{_sha256_file(path)}",
+                    "bytes": path.stat().st_size,
+                }
+            )
+
+        for arcname, data in (
+            ("indexes/index.cdx", index_bytes),
+            ("pages/pages.jsonl", pages_bytes),
+        ):
+            wacz.writestr(arcname, data)
+            resources.append(
+                {
+                    "name": Path(arcname).name,
+                    "path": arcname,
+                    "hash": f"sha256:{hashlib.sha256(data).hexdigest()}",
+                    "bytes": len(data),
+                }
+            )
+
+        datapackage = json.dumps(
+            {
+                "profile": "data-package",
+                "wacz_version": WACZ_VERSION,
+                "title": title,
+                "created": _warc_date(datetime.utcnow()),
+                "software": "ChronosArchiver",
+                "resources": resources,
+            },
+            indent=2,
+        ).encode("utf-8")
+        wacz.writestr("datapackage.json", datapackage)
+        wacz.writestr(
+            "datapackage-digest.json",
+            json.dumps(
+                {
+                    "path": "datapackage.json",
+                    "hash": f"sha256:{hashlib.sha256(datapackage).hexdigest()}",
+                }
+            ),
+        )
+
+    logger.info(f"Wrote WACZ with {len(cdx_lines)} records to {output_path}")
+    return output_path
@@ -11,6 +11,8 @@ from chronos_archiver.indexing import ContentIndexer
 from chronos_archiver.models import ArchiveStatus
 from unittest.mock import patch, AsyncMock, MagicMock
 
+from ..test_ingestion import mock_body
+
 
 class TestPipelineIntegration:
     """Test the complete 4-stage pipeline."""
@@ -18,8 +20,17 @@ class TestPipelineIntegration:
     @pytest.mark.asyncio
     async def test_complete_pipeline(self, test_config, sample_snapshot, sample_html_content, cdx_api_response):
         """Test complete pipeline from discovery to indexing."""
+        test_config["discovery"]["cdx_params"] = {
+            "output": "json",
+            "fl": "timestamp,original,mimetype,statuscode,digest,length",
+        }
         # Mock external calls
         with patch('aiohttp.ClientSession.get') as mock_get:
+            # Mock CDX page count response
+            mock_count_response = AsyncMock()
+            mock_count_response.text = AsyncMock(return_value="1\n")
+            mock_count_response.raise_for_status = MagicMock()
+
             # Mock CDX API response
             mock_cdx_response = AsyncMock()
             mock_cdx_response.json = AsyncMock(return_value=cdx_api_response)
@@ -27,13 +38,13 @@ class TestPipelineIntegration:
             
             # Mock content download
             mock_content_response = AsyncMock()
-            mock_content_response.read = AsyncMock(return_value=sample_html_content)
+            mock_body(mock_content_response, sample_html_content)
             mock_content_response.headers = {"Content-Type": "text/html"}
-            mock_content_response.get_encoding = MagicMock(return_value="utf-8")
             mock_content_response.raise_for_status = MagicMock()
             
             # Alternate between CDX and content responses
             mock_get.return_value.__aenter__.side_effect = [
+                mock_count_response,
                 mock_cdx_response,
                 mock_content_response,
             ]
@@ -90,9 +101,8 @@ class TestPipelineIntegration:
         """Test batch processing through pipeline."""
         with patch('aiohttp.ClientSession.get') as mock_get:
             mock_response = AsyncMock()
-            mock_response.read = AsyncMock(return_value=sample_html_content)
+            mock_body(mock_response, sample_html_content)
             mock_response.headers = {"Content-Type": "text/html"}
-            mock_response.get_encoding = MagicMock(return_value="utf-8")
             mock_response.raise_for_status = MagicMock()
             mock_get.return_value.__aenter__.return_value = mock_response
             
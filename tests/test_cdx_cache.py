@@ -0,0 +1,139 @@
+"""Tests for CDX cache module."""
+
+import aiohttp
+import pytest
+from chronos_archiver.cdx_cache import CDXCache
+from chronos_archiver.discovery import WaybackDiscovery
+
+
+def cdx_rows(discovery, *rows):
+    """Build an _iter_cdx_request replacement that records its params."""
+    calls = []
+
+    async def iter_cdx_request(params, seen_digests, state=None):
+        calls.append(dict(params))
+        for snapshot in discovery._parse_cdx_response(list(rows), seen_digests):
+            yield snapshot
+
+    return iter_cdx_request, calls
+
+
+def failing_cdx_rows(discovery, *rows):
+    """Build an _iter_cdx_request replacement that fails after yielding rows."""
+
+    async def iter_cdx_request(params, seen_digests, state=None):
+        for snapshot in discovery._parse_cdx_response(list(rows), seen_digests):
+            yield snapshot
+        raise aiohttp.ClientError("connection reset")
+
+    return iter_cdx_request
+
+
+ROW_2009 = ["20090430060114", "http://www.dar.org.br/", "text/html", "200", "ABC123", "5000"]
+ROW_2012 = ["20120302052501", "http://www.dar.org.br/", "text/html", "200", "DEF456", "6500"]
+ROW_2015 = ["20150406103050", "http://www.dar.org.br/", "text/html", "200", "GHI789", "7200"]
+
+
+class TestCDXCache:
+    """Test CDXCache class."""
+
+    def test_make_key_ignores_paging(self):
+        """Test that paging parameters do not change the cache key."""
+        params = {"url": "http://www.dar.org.br/", "filter": ["statuscode:(200)"]}
+
+        assert CDXCache.make_key(params) == CDXCache.make_key({**params, "page": "3"})
+        assert CDXCache.make_key(params) != CDXCache.make_key({**params, "to": "2010"})
+
+    def test_add_and_lookup(self, tmp_path, sample_snapshots):
+        """Test storing rows and marking a query complete."""
+        cache = CDXCache(str(tmp_path / "cdx.db"), ttl=3600)
+
+        try:
+            assert cache.lookup("key") is None
+            assert cache.add("key", sample_snapshots[0]) is True
+            assert cache.add("key", sample_snapshots[0]) is False
+            cache.add("key", sample_snapshots[1])
+            cache.mark_complete("key", {"url": "http://www.dar.org.br/"})
+
+            entry = cache.lookup("key")
+            assert entry["fresh"] is True
+            assert entry["newest_timestamp"] == "20120302052501"
+            assert [row[0] for row in cache.iter_rows("key")] == [
+                "20090430060114",
+                "20120302052501",
+            ]
+        finally:
+            cache.close()
+
+    @pytest.mark.asyncio
+    async def test_fresh_cache_skips_network(self, test_config, tmp_path):
+        """Test that a fresh cached query is served without a CDX request."""
+        test_config["discovery"].update(
+            {"cache_enabled": True, "cache_path": str(tmp_path / "cdx.db"), "pagination": "none"}
+        )
+        discovery = WaybackDiscovery(test_config)
+        discovery._iter_cdx_request, calls = cdx_rows(discovery, ROW_2009, ROW_2012)
+
+        try:
+            first = await discovery.find_snapshots("http://www.dar.org.br/")
+            second = await discovery.find_snapshots("http://www.dar.org.br/")
+        finally:
+            await discovery.close()
+
+        assert len(calls) == 1
+        assert [s.timestamp for s in second] == [s.timestamp for s in first]
+
+    @pytest.mark.asyncio
+    async def test_stale_cache_revalidates_incrementally(self, test_config, tmp_path):
+        """Test that stale entries only ask for newer captures."""
+        test_config["discovery"].update(
+            {
+                "cache_enabled": True,
+                "cache_path": str(tmp_path / "cdx.db"),
+                "cache_ttl": 0,
+                "pagination": "none",
+            }
+        )
+        discovery = WaybackDiscovery(test_config)
+
+        try:
+            discovery._iter_cdx_request, _ = cdx_rows(discovery, ROW_2009, ROW_2012)
+            await discovery.find_snapshots("http://www.dar.org.br/")
+
+            discovery._iter_cdx_request, calls = cdx_rows(discovery, ROW_2012, ROW_2015)
+            snapshots = await discovery.find_snapshots("http://www.dar.org.br/")
+        finally:
+            await discovery.close()
+
+        assert calls[0]["from"] == "20120302052501"
+        assert [s.timestamp for s in snapshots] == [
+            "20090430060114",
+            "20120302052501",
+            "20150406103050",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_interrupted_query_is_refetched(self, test_config, tmp_path):
+        """Test that rows cached by a failed run are served again on the rerun."""
+        test_config["discovery"].update(
+            {"cache_enabled": True, "cache_path": str(tmp_path / "cdx.db"), "pagination": "none"}
+        )
+        discovery = WaybackDiscovery(test_config)
+
+        try:
+            discovery._iter_cdx_request = failing_cdx_rows(discovery, ROW_2009, ROW_2012)
+            first = await discovery.find_snapshots("http://www.dar.org.br/")
+
+            discovery._iter_cdx_request, calls = cdx_rows(discovery, ROW_2009, ROW_2012, ROW_2015)
+            second = await discovery.find_snapshots("http://www.dar.org.br/")
+        finally:
+            await discovery.close()
+
+        assert [s.timestamp for s in first] == ["20090430060114", "20120302052501"]
+        assert len(calls) == 1
+        assert "from" not in calls[0]
+        assert [s.timestamp for s in second] == [
+            "20090430060114",
+            "20120302052501",
+            "20150406103050",
+        ]
@@ -0,0 +1,140 @@
+"""Tests for compression codecs."""
+
+import gzip
+
+import pytest
+import zstandard
+from chronos_archiver.compression import GzipCodec, ZstdCodec, create_codec, decompress
+from chronos_archiver.indexing import ArchivedPage, ContentIndexer
+
+
+def site_page(i):
+    """Page sharing a site's boilerplate with a little unique content."""
+    nav = "".join(f'<li><a href="/secao/{n}">Seção {n}</a></li>' for n in range(40))
+    return (
+        f"<!DOCTYPE html><html><head><title>DAR - Página {i}</title>"
+        f'<link href="/css/style.css" rel="stylesheet"/></head><body>'
+        f"<header><h1>Diocese Anglicana do Recife</h1><ul>{nav}</ul></header>"
+        f"<main><p>Notícia número {i}: conteúdo {i * 7919 % 1000} da diocese.</p></main>"
+        f"<footer>Rua Exemplo, {i % 9} - Recife - PE - Brasil</footer></body></html>"
+    ).encode("utf-8")
+
+
+class TestZstdCodec:
+    """Test ZstdCodec class."""
+
+    def test_trains_dictionary_per_domain(self, tmp_path):
+        """Test that a dictionary is trained after enough samples and reused."""
+        codec = ZstdCodec(tmp_path, dict_size=8192, train_samples=50)
+
+        labels = [codec.compress(site_page(i), "www.dar.org.br")[1] for i in range(60)]
+
+        assert labels[0] == "zstd"
+        assert labels[-1].startswith("zstd:")
+        assert len(set(labels[50:])) == 1
+        assert list(tmp_path.glob("*.zdict"))
+        assert codec.compress(site_page(1), "other.example")[1] == "zstd"
+
+        # A new codec picks up the trained dictionary
+        reloaded = ZstdCodec(tmp_path, dict_size=8192, train_samples=50)
+        assert reloaded.compress(site_page(99), "www.dar.org.br")[1] == labels[-1]
+
+    def test_dictionary_beats_gzip(self, tmp_path):
+        """Test that dictionary compression is much smaller than per-page gzip."""
+        codec = ZstdCodec(tmp_path, dict_size=8192, train_samples=50)
+        for i in range(50):
+            codec.compress(site_page(i), "www.dar.org.br")
+
+        page = site_page(1234)
+        data, label = codec.compress(page, "www.dar.org.br")
+        gzipped, _ = GzipCodec(6).compress(page, "www.dar.org.br")
+
+        assert len(data) * 2 < len(gzipped)
+        assert decompress(data, label, tmp_path) == page
+
+    def test_samples_stay_within_budget(self, tmp_path):
+        """Test that samples of many small domains are evicted to fit the budget."""
+        page = site_page(0)
+        codec = ZstdCodec(tmp_path, train_samples=50, sample_budget=len(page) * 10)
+
+        for i in range(100):
+            codec.compress(page, f"site{i}.example")
+
+        assert codec._sample_bytes <= len(page) * 10
+        assert list(codec._samples) == [f"site{i}.example" for i in range(90, 100)]
+
+    def test_training_runs_outside_lock(self, tmp_path, monkeypatch):
+        """Test that other domains can compress while a dictionary trains."""
+        codec = ZstdCodec(tmp_path, dict_size=8192, train_samples=50)
+        train_dictionary = zstandard.train_dictionary
+        held = []
+
+        def checking_train(*args, **kwargs):
+            held.append(codec._lock.locked())
+            return train_dictionary(*args, **kwargs)
+
+        monkeypatch.setattr(zstandard, "train_dictionary", checking_train)
+        for i in range(50):
+            codec.compress(site_page(i), "www.dar.org.br")
+
+        assert held == [False]
+        assert sorted(p.suffix for p in tmp_path.iterdir()) == [".json", ".zdict"]
+
+    def test_roundtrip_without_dictionary(self, tmp_path):
+        """Test decompression of plain zstd and gzip frames."""
+        codec = ZstdCodec(tmp_path, train_samples=0)
+
+        data, label = codec.compress(b"<html></html>", "example.com")
+
+        assert label == "zstd"
+        assert decompress(data, label, tmp_path) == b"<html></html>"
+        assert decompress(gzip.compress(b"x"), "gzip", tmp_path) == b"x"
+        assert decompress(b"x", None, tmp_path) == b"x"
+
+    def test_create_codec(self, tmp_path):
+        """Test codec selection from configuration."""
+        assert create_codec({"indexing": {"compress_content": False}}, tmp_path) is None
+        assert isinstance(create_codec({}, tmp_path), GzipCodec)
+        assert isinstance(create_codec({"indexing": {"compression": "zstd"}}, tmp_path), ZstdCodec)
+
+        with pytest.raises(ValueError):
+            create_codec({"indexing": {"compression": "lzma"}}, tmp_path)
+
+
+class TestZstdIndexer:
+    """Test ContentIndexer with zstd compression."""
+
+    @pytest.mark.asyncio
+    async def test_rows_record_compression(self, test_config, sample_transformed_content, tmp_path):
+        """Test that rows record the codec and read back through the dictionary."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"].update(
+            {
+                "compress_content": True,
+                "compression": "zstd",
+                "zstd_dict_size": 8192,
+                "zstd_train_samples": 50,
+                "write_flush_interval": 0,
+            }
+        )
+        indexer = ContentIndexer(test_config)
+
+        try:
+            pages = []
+            for i in range(55):
+                snapshot = sample_transformed_content.snapshot.model_copy(
+                    update={"timestamp": f"2009043006{i:04d}"}
+                )
+                page = sample_transformed_content.model_copy(
+                    update={"snapshot": snapshot, "content": site_page(i).decode("utf-8")}
+                )
+                pages.append((await indexer.index(page), page))
+
+            last, page = pages[-1]
+            with indexer.Session() as session:
+                assert session.get(ArchivedPage, last.id).compression.startswith("zstd:")
+            assert indexer.read_content(last.id) == page.content
+            assert list(tmp_path.glob("content/**/*.html.zst"))
+        finally:
+            await indexer.close()
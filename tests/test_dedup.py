@@ -0,0 +1,116 @@
+"""Tests for deduplication module."""
+
+import pytest
+from chronos_archiver.dedup import ArchiveDedup, BloomFilter
+from chronos_archiver.indexing import ContentIndexer
+from chronos_archiver.models import ArchiveSnapshot, ArchiveStatus
+
+
+@pytest.fixture
+def indexer(test_config, tmp_path):
+    """Indexer backed by a temporary database."""
+    test_config["archive"]["output_dir"] = str(tmp_path)
+    test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+    return ContentIndexer(test_config)
+
+
+def make_snapshot(original_url, timestamp, digest):
+    """Build a snapshot for an original URL."""
+    return ArchiveSnapshot(
+        url=f"https://web.archive.org/web/{timestamp}/{original_url}",
+        original_url=original_url,
+        timestamp=timestamp,
+        mime_type="text/html",
+        status_code=200,
+        digest=digest,
+    )
+
+
+class TestBloomFilter:
+    """Test BloomFilter class."""
+
+    def test_membership(self):
+        """Test that added keys are found and unseen keys mostly are not."""
+        bloom = BloomFilter(expected_items=1000, false_positive_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"key-{i}")
+
+        assert all(f"key-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        assert false_positives < 50
+
+
+class TestArchiveDedup:
+    """Test ArchiveDedup class."""
+
+    @pytest.mark.asyncio
+    async def test_filter_drops_archived_captures(
+        self, test_config, indexer, sample_transformed_content
+    ):
+        """Test that captures already in the index are dropped."""
+        await indexer.index(sample_transformed_content)
+        archived = sample_transformed_content.snapshot
+        dedup = ArchiveDedup(indexer, test_config)
+
+        same_capture = make_snapshot(archived.original_url, archived.timestamp, "OTHERDIGEST")
+        unchanged = make_snapshot(archived.original_url, "20100101000000", archived.digest)
+        new = make_snapshot("http://www.dar.org.br/new", "20100101000000", "NEWDIGEST")
+
+        fresh = await dedup.filter([same_capture, unchanged, new])
+
+        assert fresh == [new]
+        assert same_capture.status == ArchiveStatus.SKIPPED
+        assert unchanged.status == ArchiveStatus.SKIPPED
+        await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_same_digest_under_other_url_is_kept(
+        self, test_config, indexer, sample_transformed_content
+    ):
+        """Test that identical content under another URL is still archived."""
+        await indexer.index(sample_transformed_content)
+        dedup = ArchiveDedup(indexer, test_config)
+
+        other_page = make_snapshot(
+            "http://www.dar.org.br/other-page",
+            "20100101000000",
+            sample_transformed_content.snapshot.digest,
+        )
+
+        assert await dedup.filter([other_page]) == [other_page]
+        assert other_page.status != ArchiveStatus.SKIPPED
+        await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_digest_matching_can_be_disabled(
+        self, test_config, indexer, sample_transformed_content
+    ):
+        """Test that match_digest: false only dedups by URL and timestamp."""
+        await indexer.index(sample_transformed_content)
+        test_config["dedup"] = {"match_digest": False}
+        dedup = ArchiveDedup(indexer, test_config)
+
+        same_digest = make_snapshot(
+            sample_transformed_content.snapshot.original_url,
+            "20100101000000",
+            sample_transformed_content.snapshot.digest,
+        )
+
+        assert await dedup.filter([same_digest]) == [same_digest]
+        await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_bloom_miss_skips_database(self, test_config, indexer):
+        """Test that unseen captures never reach the database lookup."""
+        dedup = ArchiveDedup(indexer, test_config)
+        calls = []
+        indexer.find_archived = lambda *args: calls.append(args) or (set(), set())
+
+        snapshot = make_snapshot("http://www.dar.org.br/", "20090430060114", "ABC")
+        assert await dedup.filter([snapshot]) == [snapshot]
+        assert calls == []
+
+        dedup.add(snapshot)
+        await dedup.filter([snapshot])
+        assert len(calls) == 1
+        await indexer.close()
@@ -1,11 +1,26 @@
 """Tests for discovery module."""
 
+import aiohttp
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from chronos_archiver.discovery import WaybackDiscovery
 from chronos_archiver.models import ArchiveStatus
 
 
+class FakeStream:
+    """Minimal stand-in for an aiohttp response body iterated by lines."""
+
+    def __init__(self, body):
+        self.lines = body.splitlines(keepends=True)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for line in self.lines:
+            yield line
+
+
 class TestWaybackDiscovery:
     """Test WaybackDiscovery class."""
 
@@ -26,6 +41,10 @@ class TestWaybackDiscovery:
     @pytest.mark.asyncio
     async def test_find_snapshots_via_cdx_api(self, test_config, cdx_api_response):
         """Test finding snapshots via CDX API."""
+        test_config["discovery"]["cdx_params"] = {
+            "output": "json",
+            "fl": "timestamp,original,mimetype,statuscode,digest,length",
+        }
         discovery = WaybackDiscovery(test_config)
         
         with patch('aiohttp.ClientSession.get') as mock_get:
@@ -114,4 +133,264 @@ class TestWaybackDiscovery:
             
             snapshots = await discovery.find_snapshots("http://www.dar.org.br/")
         
-        assert len(snapshots) == 0
\ No newline at end of file
+        assert len(snapshots) == 0
+
+    @pytest.mark.asyncio
+    async def test_iter_snapshots_numbered_pages(self, test_config, cdx_api_response):
+        """Test that paginated CDX queries fetch every page."""
+        discovery = WaybackDiscovery(test_config)
+        header, *rows = cdx_api_response
+        pages = {str(i): discovery._parse_cdx_response([row]) for i, row in enumerate(rows)}
+        requested = []
+
+        async def collect_page(params, seen_digests):
+            requested.append(params["page"])
+            return pages[params["page"]]
+
+        with patch.object(discovery, "_query_num_pages", AsyncMock(return_value=3)), \
+                patch.object(discovery, "_collect_cdx_page", side_effect=collect_page):
+            snapshots = [s async for s in discovery.iter_snapshots("http://www.dar.org.br/")]
+
+        assert sorted(requested) == ["0", "1", "2"]
+        assert sorted(s.timestamp for s in snapshots) == [
+            "20090430060114", "20120302052501", "20150406103050"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_iter_snapshots_resume_key(self, test_config, cdx_api_response):
+        """Test that resume keys are followed until exhausted."""
+        test_config["discovery"]["pagination"] = "resume_key"
+        discovery = WaybackDiscovery(test_config)
+        bodies = [
+            b"20090430060114 http://www.dar.org.br/ text/html 200 ABC123 5000\n"
+            b"20120302052501 http://www.dar.org.br/ text/html 200 GHI789 6500\n"
+            b"\n"
+            b"key-1\n",
+            b"20150406103050 http://dar.org.br/ text/html 200 MNO345 7200\n",
+        ]
+        seen_params = []
+
+        def get(url, params=None, timeout=None):
+            seen_params.append(dict(params))
+            response = MagicMock()
+            response.raise_for_status = MagicMock()
+            response.content = FakeStream(bodies[len(seen_params) - 1])
+            context = MagicMock()
+            context.__aenter__ = AsyncMock(return_value=response)
+            context.__aexit__ = AsyncMock(return_value=False)
+            return context
+
+        with patch("aiohttp.ClientSession.get", side_effect=get):
+            snapshots = await discovery.find_snapshots("http://www.dar.org.br/")
+        await discovery.close()
+
+        assert len(snapshots) == 3
+        assert "resumeKey" not in seen_params[0]
+        assert seen_params[1]["resumeKey"] == "key-1"
+        assert seen_params[0]["showResumeKey"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_resume_key_batch_is_retried(self, test_config):
+        """Test that a transient error retries the current resume-key batch only."""
+        test_config["discovery"]["pagination"] = "resume_key"
+        test_config["processing"]["retry_delay"] = 0
+        test_config["processing"]["retry_max_delay"] = 0
+        discovery = WaybackDiscovery(test_config)
+        outcomes = [
+            b"20090430060114 http://www.dar.org.br/ text/html 200 ABC123 5000\n"
+            b"\n"
+            b"key-1\n",
+            aiohttp.ClientConnectionError(),
+            b"20150406103050 http://dar.org.br/ text/html 200 MNO345 7200\n",
+        ]
+        seen_params = []
+
+        def get(url, params=None, timeout=None):
+            seen_params.append(dict(params))
+            outcome = outcomes[len(seen_params) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            response = MagicMock()
+            response.raise_for_status = MagicMock()
+            response.content = FakeStream(outcome)
+            context = MagicMock()
+            context.__aenter__ = AsyncMock(return_value=response)
+            context.__aexit__ = AsyncMock(return_value=False)
+            return context
+
+        with patch("aiohttp.ClientSession.get", side_effect=get):
+            snapshots = await discovery.find_snapshots("http://www.dar.org.br/")
+        await discovery.close()
+
+        assert [s.timestamp for s in snapshots] == ["20090430060114", "20150406103050"]
+        assert len(seen_params) == 3
+        assert seen_params[1]["resumeKey"] == seen_params[2]["resumeKey"] == "key-1"
+
+    @pytest.mark.asyncio
+    async def test_parse_cdx_stream_filters_raw_rows(self, test_config):
+        """Test that the text parser filters status and digest before building models."""
+        discovery = WaybackDiscovery(test_config)
+        body = (
+            b"20090430060114 http://www.dar.org.br/ text/html 200 ABC123 5000\n"
+            b"20100430060114 http://www.dar.org.br/ text/html 404 DEF456 1000\n"
+            b"20110430060114 http://www.dar.org.br/ warc/revisit - ABC123 0\n"
+            b"20120430060114 http://www.dar.org.br/ text/html 200 ABC123 5000\n"
+            b"20130430060114 http://www.dar.org.br/sobre text/html 200 GHI789 -\n"
+        )
+        fields = ["timestamp", "original", "mimetype", "statuscode", "digest", "length"]
+
+        snapshots = [
+            s async for s in discovery._parse_cdx_stream(FakeStream(body), fields, set())
+        ]
+
+        assert [s.timestamp for s in snapshots] == ["20090430060114", "20130430060114"]
+        assert snapshots[0].length == 5000
+        assert snapshots[1].length is None
+        assert snapshots[1].original_url == "http://www.dar.org.br/sobre"
+
+    @pytest.mark.asyncio
+    async def test_parse_cdx_stream_custom_field_order(self, test_config):
+        """Test that text rows follow the order given in ``fl``."""
+        discovery = WaybackDiscovery(test_config)
+        body = b"ABC123 200 20090430060114 text/html 5000 http://www.dar.org.br/\n"
+        fields = ["digest", "statuscode", "timestamp", "mimetype", "length", "original"]
+
+        snapshots = [
+            s async for s in discovery._parse_cdx_stream(FakeStream(body), fields, set())
+        ]
+
+        assert len(snapshots) == 1
+        assert snapshots[0].digest == "ABC123"
+        assert snapshots[0].original_url == "http://www.dar.org.br/"
+
+    @pytest.mark.asyncio
+    async def test_deduplicate_across_pages(self, test_config, cdx_api_response):
+        """Test that digest deduplication spans pages of one query."""
+        discovery = WaybackDiscovery(test_config)
+        header, first, *_ = cdx_api_response
+
+        async def collect_page(params, seen_digests):
+            return discovery._parse_cdx_response([header, first], seen_digests)
+
+        with patch.object(discovery, "_query_num_pages", AsyncMock(return_value=2)), \
+                patch.object(discovery, "_collect_cdx_page", side_effect=collect_page):
+            snapshots = await discovery.find_snapshots("http://www.dar.org.br/")
+
+        assert len(snapshots) == 1
+
+    def test_build_cdx_params_pushdown(self, test_config):
+        """Test that filters and deduplication are sent to the CDX server."""
+        test_config["archive"]["allowed_mime_types"] = ["text/html", "image/svg+xml"]
+        test_config["discovery"]["from_timestamp"] = "2005"
+        test_config["discovery"]["to_timestamp"] = "2015"
+        discovery = WaybackDiscovery(test_config)
+
+        params = discovery._build_cdx_params("http://www.dar.org.br/")
+
+        assert params["matchType"] == "prefix"
+        assert params["from"] == "2005"
+        assert params["to"] == "2015"
+        assert params["filter"] == [
+            "statuscode:(200)",
+            "mimetype:(text/html|image/svg\\+xml)",
+        ]
+        assert params["collapse"] == ["digest"]
+
+    def test_build_cdx_params_sampling(self, test_config):
+        """Test one-capture-per-period sampling via timestamp collapse."""
+        test_config["discovery"]["sample_period"] = "month"
+        test_config["discovery"]["deduplicate_snapshots"] = False
+        discovery = WaybackDiscovery(test_config)
+
+        params = discovery._build_cdx_params("http://www.dar.org.br/sobre")
+
+        assert params["collapse"] == ["timestamp:6"]
+        assert "matchType" not in params
+
+    def test_build_cdx_params_without_pushdown(self, test_config):
+        """Test that server-side filtering can be disabled."""
+        test_config["discovery"]["server_side_filters"] = False
+        discovery = WaybackDiscovery(test_config)
+
+        params = discovery._build_cdx_params("http://www.dar.org.br/")
+
+        assert "filter" not in params
+        assert "collapse" not in params
+
+    def test_invalid_sample_period(self, test_config):
+        """Test that an unknown sampling period is rejected."""
+        test_config["discovery"]["sample_period"] = "week"
+
+        with pytest.raises(ValueError):
+            WaybackDiscovery(test_config)
+
+    @pytest.mark.asyncio
+    async def test_discover_site_follows_links(self, test_config, sample_transformed_content):
+        """Test that the crawler follows in-scope links breadth-first."""
+        discovery = WaybackDiscovery(test_config)
+        crawled = []
+
+        async def find_snapshots(url, match_type=None):
+            crawled.append(url)
+            snapshot = await discovery._create_snapshot_from_wayback_url(
+                f"https://web.archive.org/web/20090430060114/{url}"
+            )
+            return [snapshot]
+
+        ingestion = MagicMock()
+        ingestion.download = AsyncMock(return_value=MagicMock())
+        transformation = MagicMock()
+        transformation.transform = AsyncMock(return_value=sample_transformed_content)
+
+        with patch.object(discovery, "find_snapshots", side_effect=find_snapshots):
+            snapshots = await discovery.discover_site(
+                "http://www.dar.org.br/",
+                max_depth=1,
+                ingestion=ingestion,
+                transformation=transformation,
+            )
+
+        # Base page plus its three same-host links; ieab.org.br is out of scope
+        assert crawled[0] == "http://www.dar.org.br/"
+        assert sorted(crawled[1:]) == [
+            "http://www.dar.org.br/css/style.css",
+            "http://www.dar.org.br/images/logo.png",
+            "http://www.dar.org.br/noticias",
+            "http://www.dar.org.br/sobre",
+        ]
+        assert len(snapshots) == 5
+        assert all(s.status == ArchiveStatus.DISCOVERED for s in snapshots)
+        # Links are only extracted above max_depth
+        assert transformation.transform.await_count == 1
+
+    def test_crawl_scope(self, test_config):
+        """Test host, domain and prefix crawl scopes."""
+        discovery = WaybackDiscovery(test_config)
+        base = "http://www.dar.org.br/paroquias/"
+
+        assert discovery._in_crawl_scope("http://dar.org.br/sobre", base)
+        assert not discovery._in_crawl_scope("http://blog.dar.org.br/", base)
+
+        discovery.crawl_scope = "domain"
+        assert discovery._in_crawl_scope("http://blog.dar.org.br/", base)
+        assert not discovery._in_crawl_scope("http://www.ieab.org.br/", base)
+
+        discovery.crawl_scope = "prefix"
+        assert discovery._in_crawl_scope("http://www.dar.org.br/paroquias/recife", base)
+        assert not discovery._in_crawl_scope("http://www.dar.org.br/sobre", base)
+
+    def test_original_link(self, test_config):
+        """Test mapping rewritten links back to original URLs."""
+        discovery = WaybackDiscovery(test_config)
+        page = "http://www.dar.org.br/sobre/"
+
+        assert discovery._original_link(
+            "/20090430060114/http://www.dar.org.br/noticias", page
+        ) == "http://www.dar.org.br/noticias"
+        assert discovery._original_link(
+            "https://web.archive.org/web/20090430060114im_/http://www.dar.org.br/a.png", page
+        ) == "http://www.dar.org.br/a.png"
+        assert discovery._original_link("historia#topo", page) == (
+            "http://www.dar.org.br/sobre/historia"
+        )
+        assert discovery._original_link("mailto:contato@dar.org.br", page) is None
@@ -1,9 +1,16 @@
 """Tests for indexing module."""
 
+import asyncio
+import threading
 import pytest
 import shutil
 from pathlib import Path
-from chronos_archiver.indexing import ContentIndexer
+from chronos_archiver.indexing import (
+    ArchivedPage,
+    BatchWriter,
+    ContentIndexer,
+    DuplicateCapturesError,
+)
 from chronos_archiver.models import ArchiveStatus
 
 
@@ -112,4 +119,303 @@ class TestContentIndexer:
         finally:
             await indexer.close()
             if Path(test_config["archive"]["output_dir"]).exists():
-                shutil.rmtree(test_config["archive"]["output_dir"])
\ No newline at end of file
+                shutil.rmtree(test_config["archive"]["output_dir"])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_pages_share_transactions(
+        self, test_config, sample_transformed_content, tmp_path
+    ):
+        """Test that concurrently indexed pages are inserted in batches."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["write_batch_size"] = 5
+        indexer = ContentIndexer(test_config)
+
+        batches = []
+        insert_rows = indexer._insert_rows
+
+        def record_batch(rows):
+            batches.append(len(rows))
+            return insert_rows(rows)
+
+        indexer.writer.write_rows = record_batch
+
+        try:
+            pages = [
+                sample_transformed_content.model_copy(
+                    update={
+                        "snapshot": sample_transformed_content.snapshot.model_copy(
+                            update={"timestamp": f"2009043006{i:04d}"}
+                        )
+                    }
+                )
+                for i in range(10)
+            ]
+            indexed = await asyncio.gather(*(indexer.index(page) for page in pages))
+
+            assert batches == [5, 5]
+            assert len({page.id for page in indexed}) == 10
+            assert [page.snapshot.timestamp for page in indexed] == [
+                page.snapshot.timestamp for page in pages
+            ]
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_storage_writes_run_off_event_loop(
+        self, test_config, sample_transformed_content, tmp_path
+    ):
+        """Test that compression and file writes do not run on the loop thread."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        indexer = ContentIndexer(test_config)
+
+        threads = []
+        write = indexer.storage.write
+
+        def record_thread(transformed, content):
+            threads.append(threading.get_ident())
+            return write(transformed, content)
+
+        indexer.storage.write = record_thread
+
+        try:
+            indexed = await indexer.index(sample_transformed_content)
+
+            assert indexed is not None
+            assert threads and threads[0] != threading.get_ident()
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_performance_profile(self, test_config, tmp_path):
+        """Test that SQLite connections use WAL and the tuned pragmas."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["database"]["pool_size"] = 3
+        indexer = ContentIndexer(test_config)
+
+        try:
+            with indexer.engine.connect() as conn:
+                pragmas = {
+                    name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                    for name in ("journal_mode", "synchronous", "temp_store", "busy_timeout")
+                }
+            assert pragmas == {
+                "journal_mode": "wal",
+                "synchronous": 1,  # NORMAL
+                "temp_store": 2,  # MEMORY
+                "busy_timeout": 5000,
+            }
+            assert indexer.engine.pool.size() == 3
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_full_text_search_ranked(self, test_config, sample_transformed_content, tmp_path):
+        """Test FTS5 search: accent-insensitive, ranked, with snippets."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        indexer = ContentIndexer(test_config)
+
+        other = sample_transformed_content.model_copy(
+            update={
+                "snapshot": sample_transformed_content.snapshot.model_copy(
+                    update={"timestamp": "20100101000000"}
+                ),
+                "text_content": "Catedral de São Tomé. Recife.",
+                "metadata": {"title": "Catedral", "has_videos": True},
+            }
+        )
+
+        try:
+            assert indexer.full_text_backend == "fts5"
+            await indexer.index(other)
+            await indexer.index(sample_transformed_content)
+
+            results = await indexer.search("catedral sao tome")
+            assert [r.snapshot.timestamp for r in results] == ["20100101000000"]
+            assert "<mark>" in results[0].snippet
+
+            results = await indexer.search("Recife")
+            assert len(results) == 2
+            assert results[0].score >= results[1].score
+
+            results = await indexer.search("Recife", has_videos=True)
+            assert [r.snapshot.timestamp for r in results] == ["20100101000000"]
+            assert len(await indexer.search("Recife", has_videos=False)) == 1
+
+            assert await indexer.search('"unbalanced AND (') == []
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_full_text_index_backfills_existing_rows(
+        self, test_config, sample_transformed_content, tmp_path
+    ):
+        """Test that enabling full-text search indexes rows stored earlier."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["enable_full_text_search"] = False
+
+        indexer = ContentIndexer(test_config)
+        await indexer.index(sample_transformed_content)
+        await indexer.close()
+
+        test_config["indexing"]["enable_full_text_search"] = True
+        indexer = ContentIndexer(test_config)
+        try:
+            assert len(await indexer.search("Anglicana")) == 1
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("profile", ["full", "lean"])
+    async def test_schema_profiles(
+        self, profile, test_config, sample_transformed_content, tmp_path
+    ):
+        """Test typed columns, and that the lean profile keeps bulk text out of the DB."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["schema_profile"] = profile
+        sample_transformed_content.metadata.update({"language": "pt-BR", "has_videos": True})
+        indexer = ContentIndexer(test_config)
+
+        try:
+            indexed = await indexer.index(sample_transformed_content)
+
+            with indexer.Session() as session:
+                page = session.get(ArchivedPage, indexed.id)
+                assert page.host == "www.dar.org.br"
+                assert page.language == "pt-br"
+                assert page.word_count == len(sample_transformed_content.text_content.split())
+                assert page.has_videos is True
+                assert (page.text_content is None) == (profile == "lean")
+                assert (page.metadata_json is None) == (profile == "lean")
+
+            results = await indexer.search("Anglicana")
+            assert len(results) == 1
+            assert results[0].metadata["title"] == "DAR - Diocese Anglicana do Recife"
+            assert indexer.read_content(indexed.id) == sample_transformed_content.content
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_reindexing_capture_updates_row(
+        self, test_config, sample_transformed_content, tmp_path
+    ):
+        """Test that indexing a capture again upserts its row, also within one batch."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        indexer = ContentIndexer(test_config)
+
+        updated = sample_transformed_content.model_copy(
+            update={"metadata": {"title": "Atualizada"}}
+        )
+
+        try:
+            first = await indexer.index(sample_transformed_content)
+            # Submit straight to the writer so both rows land in one batch in order
+            location = await indexer._store_content(updated)
+            second, third = await asyncio.gather(
+                indexer._save_to_database(sample_transformed_content, location),
+                indexer._save_to_database(updated, location),
+            )
+
+            assert first.id == second == third
+            with indexer.Session() as session:
+                assert session.query(ArchivedPage).count() == 1
+                assert session.get(ArchivedPage, first.id).title == "Atualizada"
+            assert [r.id for r in await indexer.search("Atualizada")] == [first.id]
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_existing_duplicates_block_upgrade(
+        self, test_config, sample_transformed_content, tmp_path
+    ):
+        """Test that duplicates from before the unique capture key are only removed on request."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        indexer = ContentIndexer(test_config)
+        await indexer.index(sample_transformed_content)
+        with indexer.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ux_archived_pages_capture")
+            conn.exec_driver_sql(
+                "INSERT INTO archived_pages (url, original_url, timestamp, indexed_at) "
+                "SELECT url, original_url, timestamp, indexed_at FROM archived_pages"
+            )
+        await indexer.close()
+
+        with pytest.raises(DuplicateCapturesError):
+            ContentIndexer(test_config)
+
+        indexer = ContentIndexer(test_config, allow_duplicate_captures=True)
+        try:
+            assert indexer.dedupe_captures(dry_run=True)["duplicates"] == 1
+            with indexer.Session() as session:
+                assert session.query(ArchivedPage).count() == 2
+
+            assert indexer.dedupe_captures()["duplicates"] == 1
+            with indexer.Session() as session:
+                assert session.query(ArchivedPage).count() == 1
+        finally:
+            await indexer.close()
+
+        indexer = ContentIndexer(test_config)
+        try:
+            assert (await indexer.index(sample_transformed_content)).id == 2
+        finally:
+            await indexer.close()
+
+
+class TestBatchWriter:
+    """Test BatchWriter class."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_interval(self):
+        """Test that a partial batch is written after flush_interval."""
+        batches = []
+
+        def write_rows(rows):
+            batches.append(rows)
+            return [row["n"] * 10 for row in rows]
+
+        writer = BatchWriter(write_rows, batch_size=100, flush_interval=0.01)
+
+        ids = await asyncio.gather(writer.submit({"n": 1}), writer.submit({"n": 2}))
+
+        assert ids == [10, 20]
+        assert batches == [[{"n": 1}, {"n": 2}]]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_isolates_bad_row(self):
+        """Test that one bad row does not fail the rest of its batch."""
+
+        def write_rows(rows):
+            if any(row["n"] < 0 for row in rows):
+                raise ValueError("bad row")
+            return [row["n"] for row in rows]
+
+        writer = BatchWriter(write_rows, batch_size=3)
+
+        results = await asyncio.gather(
+            writer.submit({"n": 1}),
+            writer.submit({"n": -1}),
+            writer.submit({"n": 3}),
+            return_exceptions=True,
+        )
+
+        assert results[0] == 1 and results[2] == 3
+        assert isinstance(results[1], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_flush_drains_pending_rows(self):
+        """Test that flush writes rows without waiting for the timer."""
+        writer = BatchWriter(lambda rows: list(range(len(rows))), flush_interval=60)
+
+        pending = asyncio.create_task(writer.submit({"n": 1}))
+        await asyncio.sleep(0)
+        await writer.flush()
+
+        assert await pending == 0
@@ -1,9 +1,26 @@
 """Tests for ingestion module."""
 
+import asyncio
+import gzip
+import hashlib
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from chronos_archiver.ingestion import ContentIngestion
-from chronos_archiver.models import ArchiveStatus
+from chronos_archiver.models import ArchiveStatus, DownloadedContent
+from chronos_archiver.utils import cdx_digest
+
+
+def mock_body(response, content, chunk_size=1024, charset="utf-8"):
+    """Serve content through a mocked response.content.iter_chunked."""
+
+    async def iter_chunked(size):
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
+
+    response.content = MagicMock()
+    response.content.iter_chunked = iter_chunked
+    response.charset = charset
 
 
 class TestContentIngestion:
@@ -16,9 +33,8 @@ class TestContentIngestion:
         
         with patch('aiohttp.ClientSession.get') as mock_get:
             mock_response = AsyncMock()
-            mock_response.read = AsyncMock(return_value=sample_html_content)
+            mock_body(mock_response, sample_html_content)
             mock_response.headers = {"Content-Type": "text/html", "Content-Length": str(len(sample_html_content))}
-            mock_response.get_encoding = MagicMock(return_value="utf-8")
             mock_response.raise_for_status = MagicMock()
             mock_get.return_value.__aenter__.return_value = mock_response
             
@@ -54,9 +70,8 @@ class TestContentIngestion:
         with patch('aiohttp.ClientSession.get') as mock_get:
             # First call fails, second succeeds
             mock_response = AsyncMock()
-            mock_response.read = AsyncMock(return_value=sample_html_content)
+            mock_body(mock_response, sample_html_content)
             mock_response.headers = {"Content-Type": "text/html"}
-            mock_response.get_encoding = MagicMock(return_value="utf-8")
             mock_response.raise_for_status = MagicMock(side_effect=[Exception("Network error"), None])
             mock_get.return_value.__aenter__.return_value = mock_response
             
@@ -73,9 +88,8 @@ class TestContentIngestion:
         
         with patch('aiohttp.ClientSession.get') as mock_get:
             mock_response = AsyncMock()
-            mock_response.read = AsyncMock(return_value=sample_html_content)
+            mock_body(mock_response, sample_html_content)
             mock_response.headers = {"Content-Type": "text/html"}
-            mock_response.get_encoding = MagicMock(return_value="utf-8")
             mock_response.raise_for_status = MagicMock()
             mock_get.return_value.__aenter__.return_value = mock_response
             
@@ -106,4 +120,293 @@ class TestContentIngestion:
             content = await ingestion.download(sample_snapshot)
         
         assert content is None
-        assert sample_snapshot.status == ArchiveStatus.FAILED
\ No newline at end of file
+        assert sample_snapshot.status == ArchiveStatus.FAILED
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("spool_threshold", [1024 * 1024, 4096])
+    async def test_streaming_detects_missing_charset(
+        self, test_config, sample_snapshot, spool_threshold
+    ):
+        """Test that the encoding is detected when Content-Type has no charset."""
+        test_config["ingestion"].update(
+            spool_threshold=spool_threshold, validate_content_hash=False
+        )
+        ingestion = ContentIngestion(test_config)
+        text = "<html><body>" + "<p>Notícias da Diocese Anglicana: café, música e fé.</p>" * 200
+        body = text.encode("cp1252")
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, body, charset=None)
+            mock_response.headers = {"Content-Type": "text/html"}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        try:
+            assert content.encoding not in (None, "utf_8")
+            assert body.decode(content.encoding) == text
+        finally:
+            content.release()
+
+    @pytest.mark.asyncio
+    async def test_streaming_spools_large_body(self, test_config, sample_snapshot):
+        """Test that bodies above the spool threshold are written to disk."""
+        test_config["ingestion"].update(spool_threshold=4096, validate_content_hash=False)
+        ingestion = ContentIngestion(test_config)
+        body = b"%PDF" + b"x" * 10000
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, body)
+            mock_response.headers = {"Content-Type": "application/pdf"}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        assert content.content == b""
+        assert content.content_path is not None
+        assert content.size == len(body)
+        assert content.read_bytes() == body
+        assert content.digest == cdx_digest(hashlib.sha1(body).digest())
+
+        content.release()
+        assert content.content_path is None
+
+    @pytest.mark.asyncio
+    async def test_streaming_aborts_over_size_cap(self, test_config, sample_snapshot, tmp_path):
+        """Test that a body without Content-Length is cut off at max_file_size."""
+        test_config["archive"]["max_file_size"] = 1
+        test_config["ingestion"].update(spool_threshold=1024, spool_dir=str(tmp_path))
+        ingestion = ContentIngestion(test_config)
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, b"x" * (2 * 1024 * 1024), chunk_size=64 * 1024)
+            mock_response.headers = {}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        assert content is None
+        assert sample_snapshot.status == ArchiveStatus.SKIPPED
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_digest_validation_uses_raw_capture(self, test_config, sample_snapshot):
+        """Test that the raw id_ capture is fetched and its base32 SHA-1 checked."""
+        body = b"<html>raw capture</html>"
+        sample_snapshot.digest = cdx_digest(hashlib.sha1(body).digest())
+        ingestion = ContentIngestion(test_config)
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, body)
+            mock_response.headers = {"Content-Type": "text/html"}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        requested_url = mock_get.call_args[0][0]
+        assert requested_url == (
+            f"https://web.archive.org/web/{sample_snapshot.timestamp}id_/"
+            f"{sample_snapshot.original_url}"
+        )
+        assert content.digest_valid is True
+        assert ingestion.digests_checked == 1
+        assert ingestion.digest_mismatches == 0
+
+    @pytest.mark.asyncio
+    async def test_digest_validation_of_gzip_encoded_capture(self, test_config, sample_snapshot):
+        """Test that the digest covers the stored gzip payload and the body is decoded."""
+        html = b"<html>" + b"<p>raw capture</p>" * 500 + b"</html>"
+        stored = gzip.compress(html)
+        sample_snapshot.digest = cdx_digest(hashlib.sha1(stored).digest())
+        ingestion = ContentIngestion(test_config)
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, stored, chunk_size=100)
+            mock_response.headers = {"Content-Type": "text/html", "Content-Encoding": "gzip"}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        assert mock_get.call_args.kwargs["auto_decompress"] is False
+        assert content.content == html
+        assert content.digest_valid is True
+        assert ingestion.digest_mismatches == 0
+
+    @pytest.mark.asyncio
+    async def test_digest_mismatch_is_counted(
+        self, test_config, sample_snapshot, sample_html_content
+    ):
+        """Test that a digest mismatch is flagged and counted."""
+        ingestion = ContentIngestion(test_config)
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, sample_html_content)
+            mock_response.headers = {"Content-Type": "text/html"}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        assert content is not None
+        assert content.digest_valid is False
+        assert ingestion.digest_mismatches == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_fetch_mode(self, test_config, sample_snapshot, sample_html_content):
+        """Test that replay mode downloads the snapshot URL without validation."""
+        test_config["ingestion"]["fetch_mode"] = "replay"
+        ingestion = ContentIngestion(test_config)
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            mock_response = AsyncMock()
+            mock_body(mock_response, sample_html_content)
+            mock_response.headers = {"Content-Type": "text/html"}
+            mock_response.raise_for_status = MagicMock()
+            mock_get.return_value.__aenter__.return_value = mock_response
+
+            content = await ingestion.download(sample_snapshot)
+
+        assert mock_get.call_args[0][0] == sample_snapshot.url
+        assert content.raw_capture is False
+        assert content.digest_valid is None
+        assert ingestion.digests_checked == 0
+
+    def test_invalid_fetch_mode(self, test_config):
+        """Test that an unknown fetch mode is rejected."""
+        test_config["ingestion"]["fetch_mode"] = "archive"
+
+        with pytest.raises(ValueError):
+            ContentIngestion(test_config)
+
+    @pytest.mark.asyncio
+    async def test_iter_downloads_bounds_in_flight(self, test_config, sample_snapshot):
+        """Test that iter_downloads keeps at most `concurrency` downloads running."""
+        ingestion = ContentIngestion(test_config)
+        in_flight = 0
+        peak = 0
+
+        async def download(snapshot):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 * int(snapshot.timestamp[-1]))
+            in_flight -= 1
+            if snapshot.timestamp.endswith("3"):
+                return None
+            return DownloadedContent(snapshot=snapshot, content=b"x")
+
+        ingestion.download = download
+        snapshots = [
+            sample_snapshot.model_copy(update={"timestamp": f"2009043006011{i}"})
+            for i in (5, 1, 3, 2, 4)
+        ]
+
+        timestamps = [
+            content.snapshot.timestamp
+            async for content in ingestion.iter_downloads(snapshots, concurrency=2)
+        ]
+
+        assert peak == 2
+        assert sorted(timestamps) == [
+            "20090430060111", "20090430060112", "20090430060114", "20090430060115"
+        ]
+        assert timestamps[0] == "20090430060111"
+
+    @pytest.mark.asyncio
+    async def test_iter_downloads_cancels_on_early_exit(self, test_config, sample_snapshot):
+        """Test that breaking out of iter_downloads cancels pending downloads."""
+        ingestion = ContentIngestion(test_config)
+        cancelled = []
+
+        async def download(snapshot):
+            try:
+                await asyncio.sleep(0 if snapshot.timestamp.endswith("0") else 10)
+            except asyncio.CancelledError:
+                cancelled.append(snapshot.timestamp)
+                raise
+            return DownloadedContent(snapshot=snapshot, content=b"x")
+
+        ingestion.download = download
+        snapshots = [
+            sample_snapshot.model_copy(update={"timestamp": f"2009043006011{i}"})
+            for i in range(3)
+        ]
+
+        downloads = ingestion.iter_downloads(snapshots, concurrency=3)
+        async for content in downloads:
+            break
+        await downloads.aclose()
+
+        assert content.snapshot.timestamp == "20090430060110"
+        assert sorted(cancelled) == ["20090430060111", "20090430060112"]
+
+    @pytest.mark.asyncio
+    async def test_iter_downloads_releases_unconsumed_spools(
+        self, test_config, sample_snapshot, tmp_path
+    ):
+        """Test that results the consumer never sees do not leave spool files behind."""
+        ingestion = ContentIngestion(test_config)
+
+        async def download(snapshot):
+            spool = tmp_path / f"{snapshot.timestamp}.part"
+            spool.write_bytes(b"x")
+            try:
+                await asyncio.sleep(0 if int(snapshot.timestamp[-1]) < 3 else 10)
+            except asyncio.CancelledError:
+                spool.unlink()
+                raise
+            return DownloadedContent(snapshot=snapshot, content=b"", content_path=str(spool))
+
+        ingestion.download = download
+        snapshots = [
+            sample_snapshot.model_copy(update={"timestamp": f"2009043006011{i}"})
+            for i in range(5)
+        ]
+
+        downloads = ingestion.iter_downloads(snapshots, concurrency=5)
+        async for content in downloads:
+            content.release()
+            break
+        await downloads.aclose()
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, test_config, sample_snapshot):
+        """Test that no request is sent while the Wayback circuit is open."""
+        ingestion = ContentIngestion(test_config)
+        for _ in range(ingestion.breaker.failure_threshold):
+            ingestion.breaker.record_failure()
+
+        with patch('aiohttp.ClientSession.get') as mock_get:
+            content = await ingestion.download(sample_snapshot)
+
+        assert content is None
+        assert sample_snapshot.status == ArchiveStatus.FAILED
+        mock_get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_settles_probe(self, test_config, sample_snapshot):
+        """Test that a probe failing with an unclassified error re-opens the circuit."""
+        ingestion = ContentIngestion(test_config)
+        ingestion.breaker.recovery_timeout = 0
+        for _ in range(ingestion.breaker.failure_threshold):
+            ingestion.breaker.record_failure()
+
+        with patch.object(ingestion, "_perform_download", AsyncMock(side_effect=OSError())):
+            with pytest.raises(OSError):
+                await ingestion._attempt_download(sample_snapshot)
+
+        assert ingestion.breaker.state == ingestion.breaker.OPEN
+        assert not ingestion.breaker._probe_in_flight
@@ -0,0 +1,121 @@
+"""Tests for streaming pipeline module."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from chronos_archiver.models import ArchiveStatus, DownloadedContent
+from chronos_archiver.pipeline import StreamingPipeline
+
+
+def stream_snapshots(*results):
+    """Build an iter_snapshots replacement yielding one result per call."""
+    calls = iter(results)
+
+    async def iter_snapshots(url):
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        for snapshot in result:
+            yield snapshot
+
+    return iter_snapshots
+
+
+def make_archiver(snapshots, transformed, calls=2):
+    """Build a mock archiver whose stages return the given objects."""
+    archiver = MagicMock()
+    archiver.discovery.iter_snapshots = stream_snapshots(*[snapshots] * calls)
+    archiver.scheduler.download = AsyncMock(
+        side_effect=lambda s, priority: DownloadedContent(snapshot=s, content=b"<html></html>")
+    )
+    archiver.tika.enabled = False
+    archiver.transformation.transform = AsyncMock(return_value=transformed)
+    archiver.intelligence.analyze = AsyncMock(return_value=MagicMock())
+    archiver.search.index_content = AsyncMock(return_value=True)
+    archiver.indexer.index = AsyncMock(return_value=MagicMock())
+    archiver.dedup.batch_size = 100
+    archiver.dedup.filter = AsyncMock(side_effect=lambda batch: batch)
+    return archiver
+
+
+class TestStreamingPipeline:
+    """Test StreamingPipeline class."""
+
+    @pytest.mark.asyncio
+    async def test_run_processes_all_snapshots(
+        self, test_config, sample_snapshots, sample_transformed_content
+    ):
+        """Test that every discovered snapshot reaches the indexer."""
+        archiver = make_archiver(sample_snapshots, sample_transformed_content)
+        pipeline = StreamingPipeline(archiver, test_config)
+
+        stats = await pipeline.run(["http://www.dar.org.br/", "http://www.ieab.org.br/"])
+
+        assert stats.total_snapshots == 4
+        assert stats.downloaded == 4
+        assert stats.indexed == 4
+        assert stats.analyzed == 4
+        assert stats.end_time is not None
+        assert archiver.indexer.index.await_count == 4
+        assert pipeline.workers == []
+
+    @pytest.mark.asyncio
+    async def test_run_without_intelligence(
+        self, test_config, sample_snapshots, sample_transformed_content
+    ):
+        """Test that the intelligence stage is bypassed when disabled."""
+        archiver = make_archiver(sample_snapshots, sample_transformed_content)
+        pipeline = StreamingPipeline(archiver, test_config)
+
+        stats = await pipeline.run(["http://www.dar.org.br/"], enable_intelligence=False)
+
+        assert stats.indexed == 2
+        archiver.intelligence.analyze.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_bounded_queues(self, test_config, sample_snapshots, sample_transformed_content):
+        """Test that stage queues respect the configured size."""
+        test_config["pipeline"] = {"queue_size": 1, "ingestion_workers": 1}
+        archiver = make_archiver(sample_snapshots * 5, sample_transformed_content, calls=3)
+        pipeline = StreamingPipeline(archiver, test_config)
+
+        stats = await pipeline.run(f"http://example.com/{i}" for i in range(3))
+
+        assert all(q.maxsize == 1 for q in pipeline.queues.values())
+        assert stats.indexed == 30
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self, test_config, sample_snapshots):
+        """Test that failed and skipped snapshots are counted, not raised."""
+        archiver = make_archiver(sample_snapshots, None)
+
+        async def download(snapshot, priority):
+            snapshot.status = ArchiveStatus.SKIPPED
+            return None
+
+        archiver.scheduler.download = AsyncMock(side_effect=download)
+        archiver.discovery.iter_snapshots = stream_snapshots(
+            sample_snapshots, Exception("CDX down")
+        )
+        pipeline = StreamingPipeline(archiver, test_config)
+
+        stats = await pipeline.run(["http://www.dar.org.br/", "http://www.ieab.org.br/"])
+
+        assert stats.skipped == 2
+        assert stats.failed == 1
+        assert stats.indexed == 0
+
+    @pytest.mark.asyncio
+    async def test_already_archived_snapshots_are_skipped(
+        self, test_config, sample_snapshots, sample_transformed_content
+    ):
+        """Test that the dedup gate keeps archived captures out of ingestion."""
+        archiver = make_archiver(sample_snapshots, sample_transformed_content, calls=1)
+        archiver.dedup.filter = AsyncMock(side_effect=lambda batch: batch[1:])
+        pipeline = StreamingPipeline(archiver, test_config)
+
+        stats = await pipeline.run(["http://www.dar.org.br/"])
+
+        assert stats.discovered == 2
+        assert stats.skipped == 1
+        assert archiver.scheduler.download.await_count == 1
+        archiver.dedup.add.assert_called_once()
@@ -0,0 +1,110 @@
+"""Tests for adaptive rate limiter module."""
+
+import time
+
+import pytest
+from chronos_archiver.discovery import WaybackDiscovery
+from chronos_archiver.ingestion import ContentIngestion
+from chronos_archiver.ratelimit import AdaptiveRateLimiter, parse_retry_after
+
+
+class TestAdaptiveRateLimiter:
+    """Test AdaptiveRateLimiter class."""
+
+    def test_starts_at_configured_rate(self, test_config):
+        """Test that requests_per_second is the starting rate."""
+        limiter = AdaptiveRateLimiter(test_config)
+
+        assert limiter.rate == 10
+
+    def test_additive_increase(self, test_config):
+        """Test that healthy responses raise the rate up to the maximum."""
+        test_config["processing"]["max_requests_per_second"] = 11
+        limiter = AdaptiveRateLimiter(test_config)
+
+        limiter.record_success(0.2)
+        assert limiter.rate > 10
+
+        for _ in range(100):
+            limiter.record_success(0.2)
+        assert limiter.rate == 11
+
+    def test_multiplicative_decrease_on_throttle(self, test_config):
+        """Test that 429 halves the rate."""
+        limiter = AdaptiveRateLimiter(test_config)
+
+        limiter.record_failure(429)
+
+        assert limiter.rate == 5
+
+    def test_decrease_respects_minimum_and_cooldown(self, test_config):
+        """Test that a burst of failures only cuts the rate once."""
+        limiter = AdaptiveRateLimiter(test_config)
+
+        for _ in range(10):
+            limiter.record_failure(503)
+        assert limiter.rate == 5
+
+        limiter._last_decrease = 0.0
+        limiter.rate = 0.6
+        limiter.record_failure(None)
+        assert limiter.rate == 0.5
+
+    def test_client_errors_are_ignored(self, test_config):
+        """Test that 404 does not slow down requests."""
+        limiter = AdaptiveRateLimiter(test_config)
+
+        limiter.record_failure(404)
+
+        assert limiter.rate == 10
+
+    def test_latency_spike_decreases_rate(self, test_config):
+        """Test that latency far above the baseline counts as congestion."""
+        limiter = AdaptiveRateLimiter(test_config)
+
+        limiter.record_success(0.1)
+        limiter.record_success(1.0)
+
+        assert limiter.rate < 10
+        assert limiter.latency_baseline == pytest.approx(0.1)
+
+    def test_retry_after_blocks_requests(self, test_config):
+        """Test that Retry-After pauses the limiter."""
+        limiter = AdaptiveRateLimiter(test_config)
+
+        limiter.record_failure(429, retry_after="30")
+
+        assert limiter._blocked_until > time.monotonic() + 29
+
+    @pytest.mark.asyncio
+    async def test_acquire_paces_requests(self, test_config):
+        """Test that acquire spaces requests by the current rate."""
+        test_config["processing"]["requests_per_second"] = 20
+        limiter = AdaptiveRateLimiter(test_config)
+
+        started = time.monotonic()
+        for _ in range(3):
+            async with limiter:
+                pass
+
+        assert time.monotonic() - started >= 0.09
+
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for seconds, dates and junk."""
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    @pytest.mark.asyncio
+    async def test_limiter_is_shared(self, test_config):
+        """Test that discovery and ingestion can share one limiter."""
+        limiter = AdaptiveRateLimiter(test_config)
+        discovery = WaybackDiscovery(test_config, rate_limiter=limiter)
+        ingestion = ContentIngestion(test_config, rate_limiter=limiter)
+
+        try:
+            assert discovery.rate_limiter is ingestion.rate_limiter
+        finally:
+            await discovery.close()
+            await ingestion.close()
@@ -0,0 +1,167 @@
+"""Tests for resilience module."""
+
+import asyncio
+
+import aiohttp
+import pytest
+from unittest.mock import MagicMock
+from chronos_archiver.config import ProcessingConfig
+from chronos_archiver.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    is_retryable,
+)
+
+
+def response_error(status):
+    """Build a ClientResponseError with the given status."""
+    return aiohttp.ClientResponseError(MagicMock(), (), status=status)
+
+
+def make_policy(test_config, **processing):
+    """Build a retry policy without real sleeps."""
+    test_config["processing"].update(
+        {"retry_attempts": 3, "retry_delay": 0, "retry_max_delay": 0, **processing}
+    )
+    return RetryPolicy(test_config)
+
+
+class TestClassification:
+    """Test error classification."""
+
+    def test_transient_errors_are_retryable(self):
+        """Test that timeouts, connection errors and 429/5xx are retried."""
+        assert is_retryable(asyncio.TimeoutError())
+        assert is_retryable(aiohttp.ClientConnectionError())
+        assert is_retryable(response_error(429))
+        assert is_retryable(response_error(503))
+
+    def test_permanent_errors_are_not_retryable(self):
+        """Test that 404/403 and unknown errors fail immediately."""
+        assert not is_retryable(response_error(404))
+        assert not is_retryable(response_error(403))
+        assert not is_retryable(ValueError("bad row"))
+        assert not is_retryable(CircuitOpenError("open"))
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker class."""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker("wayback", failure_threshold=2, recovery_timeout=30)
+
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe passes and its success closes the circuit."""
+        breaker = CircuitBreaker("wayback", failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        breaker.recovery_timeout = 30
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe re-opens the circuit."""
+        breaker = CircuitBreaker("cdx", failure_threshold=3, recovery_timeout=0)
+        for _ in range(3):
+            breaker.record_failure()
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy class."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, test_config):
+        """Test that transient errors are retried until success."""
+        policy = make_policy(test_config)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise asyncio.TimeoutError()
+            return "ok"
+
+        assert await policy.call(flaky) == "ok"
+        assert len(attempts) == 3
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_fail_immediately(self, test_config):
+        """Test that a 404 is not retried."""
+        policy = make_policy(test_config)
+        attempts = []
+
+        async def missing():
+            attempts.append(1)
+            raise response_error(404)
+
+        with pytest.raises(aiohttp.ClientResponseError):
+            await policy.call(missing)
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_budget_limits_retries(self, test_config):
+        """Test that retries stop once the shared budget is spent."""
+        policy = make_policy(test_config, retry_budget_ratio=0.0, retry_budget_reserve=1)
+        attempts = []
+
+        async def down():
+            attempts.append(1)
+            raise aiohttp.ClientConnectionError()
+
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await policy.call(down)
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await policy.call(down)
+
+        # One banked retry for the first call, none left for the second
+        assert len(attempts) == 3
+
+    def test_budget_refills_with_requests(self):
+        """Test that requests deposit retry tokens up to the reserve."""
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_spend()
+
+    def test_breakers_are_per_endpoint(self, test_config):
+        """Test that each endpoint gets its own shared breaker."""
+        policy = RetryPolicy(test_config)
+
+        assert policy.breaker("cdx") is policy.breaker("cdx")
+        assert policy.breaker("cdx") is not policy.breaker("wayback")
+
+    def test_defaults_match_validated_config(self):
+        """Test that a config without retry keys behaves like a validated one."""
+        defaults = ProcessingConfig()
+        policy = RetryPolicy({})
+
+        assert policy.max_attempts == defaults.retry_attempts
+        assert policy.base_delay == defaults.retry_delay
+        assert policy.backoff == defaults.retry_backoff
+        assert policy.max_delay == defaults.retry_max_delay
@@ -0,0 +1,100 @@
+"""Tests for download scheduler module."""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+from chronos_archiver.models import ArchiveSnapshot
+from chronos_archiver.scheduler import DownloadScheduler
+
+
+def make_snapshot(original_url):
+    """Build a snapshot for an original URL."""
+    return ArchiveSnapshot(
+        url=f"https://web.archive.org/web/20090430060114/{original_url}",
+        original_url=original_url,
+        timestamp="20090430060114",
+    )
+
+
+def make_scheduler(test_config, concurrent, per_host):
+    """Build a scheduler whose downloads block until released."""
+    test_config["processing"]["concurrent_requests"] = concurrent
+    test_config["processing"]["max_requests_per_host"] = per_host
+
+    started = []
+    release = asyncio.Event()
+
+    async def download(snapshot):
+        started.append(snapshot.original_url)
+        await release.wait()
+        return snapshot
+
+    ingestion = MagicMock()
+    ingestion.download = download
+    return DownloadScheduler(ingestion, test_config), started, release
+
+
+class TestDownloadScheduler:
+    """Test DownloadScheduler class."""
+
+    @pytest.mark.asyncio
+    async def test_per_host_cap_and_round_robin(self, test_config):
+        """Test that a busy host cannot take every slot."""
+        scheduler, started, release = make_scheduler(test_config, concurrent=3, per_host=2)
+
+        urls = [f"http://big.org/{i}" for i in range(5)] + ["http://small.org/1"]
+        tasks = [asyncio.create_task(scheduler.download(make_snapshot(u))) for u in urls]
+        await asyncio.sleep(0)
+
+        assert sorted(started) == ["http://big.org/0", "http://big.org/1", "http://small.org/1"]
+        assert scheduler.pending == 3
+
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert len(results) == 6
+        assert scheduler._active == 0
+
+    @pytest.mark.asyncio
+    async def test_high_priority_goes_first(self, test_config):
+        """Test that waiting high priority work is served before bulk work."""
+        scheduler, started, release = make_scheduler(test_config, concurrent=1, per_host=1)
+
+        first = asyncio.create_task(scheduler.download(make_snapshot("http://a.org/"), "low"))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(scheduler.download(make_snapshot("http://b.org/"), "low"))
+        interactive = asyncio.create_task(
+            scheduler.download(make_snapshot("http://c.org/"), "high")
+        )
+        await asyncio.sleep(0)
+
+        release.set()
+        await asyncio.gather(first, bulk, interactive)
+
+        assert started == ["http://a.org/", "http://c.org/", "http://b.org/"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_nothing(self, test_config):
+        """Test that cancelling a queued download does not leak a slot."""
+        scheduler, started, release = make_scheduler(test_config, concurrent=1, per_host=1)
+
+        running = asyncio.create_task(scheduler.download(make_snapshot("http://a.org/")))
+        waiting = asyncio.create_task(scheduler.download(make_snapshot("http://b.org/")))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        release.set()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert started == ["http://a.org/"]
+        assert scheduler._active == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_priority(self, test_config):
+        """Test that unknown priority classes are rejected."""
+        scheduler, _, _ = make_scheduler(test_config, concurrent=1, per_host=1)
+
+        with pytest.raises(ValueError):
+            await scheduler.download(make_snapshot("http://a.org/"), "urgent")
@@ -0,0 +1,65 @@
+"""Tests for shared HTTP session module."""
+
+import pytest
+from chronos_archiver.discovery import WaybackDiscovery
+from chronos_archiver.ingestion import ContentIngestion
+from chronos_archiver.session import SharedSession
+
+
+class TestSharedSession:
+    """Test SharedSession class."""
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused(self, test_config):
+        """Test that the same session is returned on every call."""
+        http = SharedSession(test_config)
+
+        try:
+            session = http.get()
+            assert http.get() is session
+            assert session.headers["User-Agent"] == "ChronosArchiver-Test/1.0"
+        finally:
+            await http.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_pool_settings(self, test_config):
+        """Test that pool settings are applied to the connector."""
+        test_config["processing"]["connection_pool_size"] = 50
+        test_config["processing"]["connections_per_host"] = 7
+        http = SharedSession(test_config)
+
+        try:
+            connector = http.get().connector
+            assert connector.limit == 50
+            assert connector.limit_per_host == 7
+        finally:
+            await http.close()
+
+    @pytest.mark.asyncio
+    async def test_close_and_recreate(self, test_config):
+        """Test that a closed session is recreated on next use."""
+        http = SharedSession(test_config)
+
+        session = http.get()
+        await http.close()
+        assert session.closed
+
+        new_session = http.get()
+        assert new_session is not session
+        await http.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_between_stages(self, test_config):
+        """Test that discovery and ingestion share one session."""
+        http = SharedSession(test_config)
+        discovery = WaybackDiscovery(test_config, http=http)
+        ingestion = ContentIngestion(test_config, http=http)
+
+        try:
+            assert discovery.http.get() is ingestion.http.get()
+
+            # Stages must not close a session they do not own
+            await discovery.close()
+            assert not http.get().closed
+        finally:
+            await http.close()
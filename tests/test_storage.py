@@ -0,0 +1,301 @@
+"""Tests for content storage backends."""
+
+import os
+
+import pytest
+from chronos_archiver import indexing
+from chronos_archiver.indexing import GC_SUFFIX, ArchivedPage, ContentBlob, ContentIndexer
+from chronos_archiver.storage import BlobStorage, PackStorage, read_stored
+
+
+def capture(transformed, timestamp, content=None):
+    """Copy transformed content as another capture of the same page."""
+    update = {
+        "snapshot": transformed.snapshot.model_copy(update={"timestamp": timestamp})
+    }
+    if content is not None:
+        update["content"] = content
+    return transformed.model_copy(update=update)
+
+
+class TestBlobStorage:
+    """Test BlobStorage class."""
+
+    def test_identical_content_is_stored_once(self, tmp_path, sample_transformed_content):
+        """Test that byte-identical pages share one blob."""
+        storage = BlobStorage(tmp_path)
+
+        first = storage.write(sample_transformed_content, b"<html>same</html>")
+        second = storage.write(
+            capture(sample_transformed_content, "20100101000000"), b"<html>same</html>"
+        )
+        third = storage.write(sample_transformed_content, b"<html>other</html>")
+
+        assert first == second
+        assert first != third
+        assert len([p for p in tmp_path.glob("blobs/**/*") if p.is_file()]) == 2
+        assert read_stored(tmp_path, first) == b"<html>same</html>"
+
+
+class TestPackStorage:
+    """Test PackStorage class."""
+
+    def test_appends_and_reads_by_offset(self, tmp_path):
+        """Test that pages are appended to one segment and read back."""
+        storage = PackStorage(tmp_path)
+
+        first = storage.append(b"<html>one</html>", "example.com")
+        second = storage.append(b"<html>two</html>", "example.com")
+        storage.sync()
+
+        assert first.file_path == second.file_path
+        assert second.record_offset == len(b"<html>one</html>")
+        assert read_stored(tmp_path, second) == b"<html>two</html>"
+
+        # Reads see pages appended after the segment was first mapped
+        third = storage.append(b"<html>three</html>", "example.com")
+        storage.close()
+        assert read_stored(tmp_path, third) == b"<html>three</html>"
+
+    def test_rolls_segments(self, tmp_path):
+        """Test that a new segment starts at segment_size."""
+        storage = PackStorage(tmp_path, segment_size=100)
+
+        locations = [storage.append(bytes([i]) * 60, "example.com") for i in range(3)]
+        storage.close()
+
+        assert len({location.file_path for location in locations}) == 3
+        assert read_stored(tmp_path, locations[2]) == bytes([2]) * 60
+
+        # A new writer never appends to existing segments
+        reopened = PackStorage(tmp_path, segment_size=100)
+        assert reopened.append(b"x", "example.com").file_path not in {
+            location.file_path for location in locations
+        }
+        reopened.close()
+
+
+class TestBlobIndexer:
+    """Test ContentIndexer reference counting and gc with blob storage."""
+
+    @pytest.fixture
+    def indexer(self, test_config, tmp_path):
+        """Indexer storing pages as content-addressed blobs."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["storage_backend"] = "blobs"
+        return ContentIndexer(test_config)
+
+    def ref_count(self, indexer, file_path):
+        """Read a blob's reference count."""
+        with indexer.Session() as session:
+            blob = session.get(ContentBlob, file_path)
+            return blob.ref_count if blob else None
+
+    @pytest.mark.asyncio
+    async def test_duplicate_captures_share_blob(self, indexer, sample_transformed_content):
+        """Test that duplicate captures point at one blob with a reference each."""
+        try:
+            first = await indexer.index(sample_transformed_content)
+            second = await indexer.index(capture(sample_transformed_content, "20100101000000"))
+
+            with indexer.Session() as session:
+                paths = {session.get(ArchivedPage, i).file_path for i in (first.id, second.id)}
+            assert len(paths) == 1
+            assert self.ref_count(indexer, paths.pop()) == 2
+            assert indexer.read_content(second.id) == sample_transformed_content.content
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_reindexing_moves_reference(self, indexer, sample_transformed_content):
+        """Test that re-indexing a capture with new content moves its reference."""
+        try:
+            first = await indexer.index(sample_transformed_content)
+            await indexer.index(sample_transformed_content)
+            with indexer.Session() as session:
+                old_path = session.get(ArchivedPage, first.id).file_path
+            assert self.ref_count(indexer, old_path) == 1
+
+            second = await indexer.index(
+                capture(sample_transformed_content, first.snapshot.timestamp, "<html>new</html>")
+            )
+
+            with indexer.Session() as session:
+                new_path = session.get(ArchivedPage, second.id).file_path
+            assert second.id == first.id
+            assert self.ref_count(indexer, old_path) == 0
+            assert self.ref_count(indexer, new_path) == 1
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_gc_deletes_unreferenced_blobs(
+        self, indexer, sample_transformed_content, tmp_path
+    ):
+        """Test that gc only removes blobs without references."""
+        try:
+            kept = await indexer.index(sample_transformed_content)
+            dropped = await indexer.index(
+                capture(sample_transformed_content, "20100101000000", "<html>gone</html>")
+            )
+            shared = await indexer.index(capture(sample_transformed_content, "20110101000000"))
+
+            assert indexer.delete_page(dropped.id)
+            assert indexer.delete_page(shared.id)
+
+            blobs = [p for p in tmp_path.glob("blobs/**/*") if p.is_file()]
+            for blob in blobs:
+                os.utime(blob, (0, 0))
+
+            assert indexer.gc(min_age=60, dry_run=True)["deleted"] == 1
+            assert len([p for p in tmp_path.glob("blobs/**/*") if p.is_file()]) == 2
+
+            result = indexer.gc(min_age=60)
+
+            assert result["deleted"] == 1
+            assert indexer.read_content(kept.id) == sample_transformed_content.content
+            assert indexer.read_content(dropped.id) is None
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_gc_keeps_blob_reused_during_gc(
+        self, indexer, sample_transformed_content, tmp_path, monkeypatch
+    ):
+        """Test that a blob re-referenced after gc's first check is restored."""
+        try:
+            indexed = await indexer.index(sample_transformed_content)
+            with indexer.Session() as session:
+                blob_path = session.get(ArchivedPage, indexed.id).file_path
+            indexer.delete_page(indexed.id)
+            os.utime(tmp_path / blob_path, (0, 0))
+
+            replace = os.replace
+
+            def reuse_then_replace(src, dst):
+                replace(src, dst)
+                if str(dst).endswith(GC_SUFFIX):
+                    # A running archive job commits a new reference meanwhile
+                    with indexer.Session.begin() as session:
+                        indexer._add_blob_refs(session, {blob_path: 1})
+
+            monkeypatch.setattr(indexing.os, "replace", reuse_then_replace)
+
+            assert indexer.gc(min_age=60)["deleted"] == 0
+            assert (tmp_path / blob_path).exists()
+            assert not list(tmp_path.glob(f"blobs/**/*{GC_SUFFIX}"))
+            assert self.ref_count(indexer, blob_path) == 1
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_gc_restores_blobs_left_aside(
+        self, indexer, sample_transformed_content, tmp_path
+    ):
+        """Test that a blob renamed aside by a crashed gc is put back."""
+        try:
+            indexed = await indexer.index(sample_transformed_content)
+            with indexer.Session() as session:
+                blob = tmp_path / session.get(ArchivedPage, indexed.id).file_path
+            os.replace(blob, blob.with_name(blob.name + GC_SUFFIX))
+
+            assert indexer.gc(min_age=0)["deleted"] == 0
+            assert indexer.read_content(indexed.id) == sample_transformed_content.content
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_gc_keeps_recent_blobs(self, indexer, sample_transformed_content):
+        """Test that recently written unreferenced blobs survive gc."""
+        try:
+            indexed = await indexer.index(sample_transformed_content)
+            indexer.delete_page(indexed.id)
+
+            assert indexer.gc(min_age=3600)["deleted"] == 0
+        finally:
+            await indexer.close()
+
+
+class TestRepack:
+    """Test migrating per-file archives into packs."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["files", "blobs"])
+    async def test_repack(self, backend, test_config, sample_transformed_content, tmp_path):
+        """Test that repack moves every page into packs and removes old files."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"].update({"storage_backend": backend, "compress_content": True})
+
+        indexer = ContentIndexer(test_config)
+        try:
+            ids = [
+                (await indexer.index(capture(sample_transformed_content, ts))).id
+                for ts in ("20090430060114", "20100101000000")
+            ]
+            other = await indexer.index(
+                capture(sample_transformed_content, "20110101000000", "<html>other</html>")
+            )
+
+            result = indexer.repack(batch_size=2)
+
+            assert result["pages"] == 3
+            assert result["failed"] == 0
+            old_root = "content" if backend == "files" else "blobs"
+            assert not [p for p in tmp_path.glob(f"{old_root}/**/*") if p.is_file()]
+            assert len(list(tmp_path.glob("packs/*.pack"))) == 1
+            for page_id in ids:
+                assert indexer.read_content(page_id) == sample_transformed_content.content
+            assert indexer.read_content(other.id) == "<html>other</html>"
+            assert indexer.repack()["pages"] == 0
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_interrupted_repack_keeps_shared_blob(
+        self, test_config, sample_transformed_content, tmp_path, monkeypatch
+    ):
+        """Test that a blob stays referenced while unmigrated rows still use it."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["storage_backend"] = "blobs"
+
+        indexer = ContentIndexer(test_config)
+        try:
+            ids = [
+                (await indexer.index(capture(sample_transformed_content, ts))).id
+                for ts in ("20090430060114", "20100101000000", "20110101000000")
+            ]
+            with indexer.Session() as session:
+                blob_path = session.get(ArchivedPage, ids[0]).file_path
+
+            syncs = []
+            original_sync = PackStorage.sync
+
+            def failing_sync(self):
+                syncs.append(1)
+                if len(syncs) > 1:
+                    raise OSError("disk full")
+                original_sync(self)
+
+            monkeypatch.setattr(PackStorage, "sync", failing_sync)
+            with pytest.raises(OSError):
+                indexer.repack(batch_size=1)
+            monkeypatch.setattr(PackStorage, "sync", original_sync)
+
+            with indexer.Session() as session:
+                assert session.get(ContentBlob, blob_path).ref_count == 2
+            for blob in tmp_path.glob("blobs/**/*"):
+                os.utime(blob, (0, 0))
+            assert indexer.gc(min_age=0)["deleted"] == 0
+            assert indexer.read_content(ids[2]) == sample_transformed_content.content
+
+            assert indexer.repack()["pages"] == 2
+            with indexer.Session() as session:
+                assert session.get(ContentBlob, blob_path) is None
+            assert not (tmp_path / blob_path).exists()
+            for page_id in ids:
+                assert indexer.read_content(page_id) == sample_transformed_content.content
+        finally:
+            await indexer.close()
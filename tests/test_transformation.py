@@ -119,4 +119,59 @@ class TestContentTransformation:
         assert transformation._rewrite_url("#anchor", snapshot) is None
         assert transformation._rewrite_url("javascript:void(0)", snapshot) is None
         assert transformation._rewrite_url("mailto:test@example.com", snapshot) is None
-        assert transformation._rewrite_url("data:image/png;base64,ABC", snapshot) is None
\ No newline at end of file
+        assert transformation._rewrite_url("data:image/png;base64,ABC", snapshot) is None
+
+    @pytest.mark.asyncio
+    async def test_replay_toolbar_is_stripped(self, test_config, sample_snapshot):
+        """Test that Wayback replay markup is removed and replay links unwrapped."""
+        from chronos_archiver.models import DownloadedContent
+
+        html = """<html><head>
+<script src="//archive.org/includes/analytics.js?v=cf34f82" type="text/javascript"></script>
+<script type="text/javascript" src="/_static/js/wombat.js?v=1" charset="utf-8"></script>
+<link rel="stylesheet" type="text/css" href="/_static/css/banner-styles.css?v=1" />
+<!-- End Wayback Rewrite JS Include -->
+<title>DAR</title></head><body>
+<!-- BEGIN WAYBACK TOOLBAR INSERT -->
+<div id="wm-ipp">toolbar</div>
+<!-- END WAYBACK TOOLBAR INSERT -->
+<a href="/web/20090430060114/http://www.dar.org.br/sobre">Sobre</a>
+<img src="https://web.archive.org/web/20090430060114im_/http://www.dar.org.br/logo.png">
+</body></html>
+<!--
+     FILE ARCHIVED ON 06:01:14 Apr 30, 2009 AND RETRIEVED FROM THE
+     INTERNET ARCHIVE ON 12:00:00 Jan 01, 2024.
+-->"""
+        downloaded = DownloadedContent(
+            snapshot=sample_snapshot, content=html.encode("utf-8"), encoding="utf-8"
+        )
+
+        transformation = ContentTransformation(test_config)
+        transformed = await transformation.transform(downloaded)
+
+        assert "wm-ipp" not in transformed.content
+        assert "_static" not in transformed.content
+        assert "FILE ARCHIVED ON" not in transformed.content
+        assert 'href="/20090430060114/http://www.dar.org.br/sobre"' in transformed.content
+        assert 'src="/20090430060114/http://www.dar.org.br/logo.png"' in transformed.content
+
+    @pytest.mark.asyncio
+    async def test_raw_capture_skips_stripping(self, test_config, sample_snapshot):
+        """Test that raw captures are not scanned for Wayback markup."""
+        from chronos_archiver.models import DownloadedContent
+
+        html = (
+            "<html><body><!-- BEGIN WAYBACK TOOLBAR INSERT --><p>kept</p>"
+            "<!-- END WAYBACK TOOLBAR INSERT --></body></html>"
+        )
+        downloaded = DownloadedContent(
+            snapshot=sample_snapshot,
+            content=html.encode("utf-8"),
+            encoding="utf-8",
+            raw_capture=True,
+        )
+
+        transformation = ContentTransformation(test_config)
+        transformed = await transformation.transform(downloaded)
+
+        assert "kept" in transformed.content
@@ -1,5 +1,7 @@
 """Tests for utility functions."""
 
+import hashlib
+
 import pytest
 from datetime import datetime
 from pathlib import Path
@@ -10,9 +12,12 @@ from chronos_archiver.utils import (
     extract_domain,
     is_valid_url,
     calculate_hash,
+    cdx_digest,
     format_timestamp,
     sanitize_filename,
     format_bytes,
+    surt_key,
+    url_fingerprint,
 )
 
 
@@ -70,6 +75,13 @@ class TestUtils:
         assert len(hash_sha256) == 64  # SHA-256 produces 64 hex characters
         assert len(hash_md5) == 32  # MD5 produces 32 hex characters
 
+    def test_cdx_digest(self):
+        """Test base32 SHA-1 encoding used by CDX digests."""
+        digest = cdx_digest(hashlib.sha1(b"").digest())
+
+        assert digest == "3I42H3S6NNFQ2MSVX7XZKYAYSCX5QBYJ"
+        assert len(digest) == 32
+
     def test_format_timestamp(self):
         """Test timestamp formatting."""
         dt = format_timestamp("20090430060114")
@@ -98,4 +110,20 @@ class TestUtils:
         assert format_bytes(100) == "100.0 B"
         assert format_bytes(1024) == "1.0 KB"
         assert format_bytes(1024 * 1024) == "1.0 MB"
-        assert format_bytes(1024 * 1024 * 1024) == "1.0 GB"
\ No newline at end of file
+        assert format_bytes(1024 * 1024 * 1024) == "1.0 GB"
+
+    def test_surt_key(self):
+        """Test SURT key canonicalization."""
+        assert surt_key("http://www.dar.org.br/sobre/") == "br,org,dar)/sobre"
+        assert surt_key("https://DAR.org.br") == "br,org,dar)/"
+        assert surt_key("http://dar.org.br/busca?q=igreja") == "br,org,dar)/busca?q=igreja"
+
+    def test_url_fingerprint(self):
+        """Test that equivalent URLs share a fingerprint."""
+        assert url_fingerprint("http://www.dar.org.br/sobre/") == url_fingerprint(
+            "https://dar.org.br/sobre"
+        )
+        assert url_fingerprint("http://dar.org.br/sobre") != url_fingerprint(
+            "http://dar.org.br/noticias"
+        )
+        assert url_fingerprint("http://dar.org.br/").bit_length() <= 64
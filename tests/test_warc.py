@@ -0,0 +1,156 @@
+"""Tests for WARC storage and WACZ export."""
+
+import hashlib
+import json
+import zipfile
+from datetime import datetime
+
+import pytest
+from chronos_archiver import warc
+from chronos_archiver.indexing import ContentIndexer
+from chronos_archiver.utils import cdx_digest
+from chronos_archiver.warc import WARCWriter, read_record, write_wacz
+
+
+class TestWARCWriter:
+    """Test WARCWriter class."""
+
+    def test_records_are_readable_by_offset(self, tmp_path):
+        """Test that each record can be read back with one seek."""
+        writer = WARCWriter(tmp_path)
+        first = writer.write_resource(
+            "http://example.com/", b"<html>one</html>", "text/html", datetime(2009, 4, 30)
+        )
+        second = writer.write_resource(
+            "http://example.com/two", b"<html>two</html>", "text/html", datetime(2009, 5, 1)
+        )
+        writer.close()
+
+        headers, block = read_record(*second)
+        assert block == b"<html>two</html>"
+        assert headers["WARC-Type"] == "resource"
+        assert headers["WARC-Target-URI"] == "http://example.com/two"
+        assert headers["WARC-Date"] == "2009-05-01T00:00:00Z"
+        assert read_record(*first)[1] == b"<html>one</html>"
+        assert first[0] == second[0]
+        assert first[1] > 0  # warcinfo record comes first
+
+    def test_rolls_over_at_max_size(self, tmp_path):
+        """Test that a new file is started once max_size is reached."""
+        writer = WARCWriter(tmp_path, max_size=600, compress=False)
+
+        locations = [
+            writer.write_resource(
+                f"http://example.com/{i}", b"x" * 200, "text/html", datetime(2009, 4, 30)
+            )
+            for i in range(4)
+        ]
+        writer.close()
+
+        assert len({path for path, _, _ in locations}) > 1
+        assert all(path.suffix == ".warc" for path, _, _ in locations)
+        for i, location in enumerate(locations):
+            assert read_record(*location)[0]["WARC-Target-URI"] == f"http://example.com/{i}"
+
+    def test_rolled_files_are_synced(self, tmp_path, monkeypatch):
+        """Test that every file is fsynced before it is closed."""
+        synced = []
+        monkeypatch.setattr(warc.os, "fsync", synced.append)
+        writer = WARCWriter(tmp_path, max_size=600, compress=False)
+
+        locations = [
+            writer.write_resource(
+                f"http://example.com/{i}", b"x" * 200, "text/html", datetime(2009, 4, 30)
+            )
+            for i in range(4)
+        ]
+        writer.close()
+
+        assert len(synced) == len({path for path, _, _ in locations})
+
+    def test_write_wacz(self, tmp_path):
+        """Test WACZ layout, index and datapackage hashes."""
+        writer = WARCWriter(tmp_path / "warcs")
+        path, offset, length = writer.write_resource(
+            "http://example.com/", b"<html></html>", "text/html", datetime(2009, 4, 30)
+        )
+        writer.close()
+
+        wacz_path = write_wacz(
+            tmp_path / "out.wacz",
+            tmp_path,
+            [
+                {
+                    "url": "http://example.com/",
+                    "timestamp": "20090430000000",
+                    "filename": f"warcs/{path.name}",
+                    "offset": offset,
+                    "length": length,
+                    "title": "Example",
+                }
+            ],
+        )
+
+        with zipfile.ZipFile(wacz_path) as wacz:
+            names = set(wacz.namelist())
+            assert f"archive/{path.name}" in names
+            assert {"indexes/index.cdx", "pages/pages.jsonl", "datapackage.json"} <= names
+
+            key, timestamp, fields = wacz.read("indexes/index.cdx").decode().split(" ", 2)
+            assert (key, timestamp) == ("com,example)/", "20090430000000")
+            assert json.loads(fields)["offset"] == str(offset)
+            assert json.loads(fields)["digest"] == cdx_digest(
+                hashlib.sha1(b"<html></html>").digest()
+            )
+
+            datapackage = json.loads(wacz.read("datapackage.json"))
+            assert {r["path"] for r in datapackage["resources"]} == names - {
+                "datapackage.json",
+                "datapackage-digest.json",
+            }
+
+
+class TestWARCIndexer:
+    """Test ContentIndexer with the WARC storage backend."""
+
+    @pytest.fixture
+    def indexer(self, test_config, tmp_path):
+        """Indexer storing pages in WARC files."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["storage_backend"] = "warc"
+        return ContentIndexer(test_config)
+
+    @pytest.mark.asyncio
+    async def test_index_appends_to_warc(self, indexer, sample_transformed_content, tmp_path):
+        """Test that pages go to a WARC file and are read back by offset."""
+        try:
+            indexed = await indexer.index(sample_transformed_content)
+
+            assert indexed is not None
+            assert list(tmp_path.glob("warcs/*.warc*"))
+            assert not list(tmp_path.glob("content/**/*.html*"))
+            assert indexer.read_content(indexed.id) == sample_transformed_content.content
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_export_wacz(self, indexer, sample_transformed_content, tmp_path):
+        """Test exporting indexed pages as WACZ."""
+        try:
+            await indexer.index(sample_transformed_content)
+            wacz_path = indexer.export_wacz(tmp_path / "export.wacz")
+
+            with zipfile.ZipFile(wacz_path) as wacz:
+                assert any(name.startswith("archive/") for name in wacz.namelist())
+        finally:
+            await indexer.close()
+
+    def test_invalid_backend(self, test_config, tmp_path):
+        """Test that an unknown storage backend is rejected."""
+        test_config["archive"]["output_dir"] = str(tmp_path)
+        test_config["database"]["sqlite_path"] = str(tmp_path / "test.db")
+        test_config["indexing"]["storage_backend"] = "tape"
+
+        with pytest.raises(ValueError):
+            ContentIndexer(test_config)